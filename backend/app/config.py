@@ -25,7 +25,19 @@ class Settings(BaseSettings):
     # Model
     model_version: str = "auto"
     shap_cache_size: int = 100
+    scoring_workers: int = 1  # processes for full recalculation (0 = one per CPU core)
     
+    # Uploads
+    upload_chunk_rows: int = 50000  # CSV rows parsed / committed per chunk
+    upload_workers: int = 2  # threads for blocking upload / import work (caps concurrent uploads)
+
+    # Background jobs
+    job_workers: int = 2  # in-process worker threads for upload jobs
+    job_spool_dir: str = ""  # where uploads wait for their job ("" = system temp dir)
+
+    # Response cache
+    response_cache_size: int = 256  # cached dashboard responses (0 disables)
+
     # Logging
     log_level: str = "INFO"
     
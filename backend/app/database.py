@@ -2,10 +2,13 @@
 Database connection and session management.
 """
 
-from sqlalchemy import create_engine
+from sqlalchemy import and_, bindparam, create_engine, insert, or_, select, update
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
-from typing import Generator
+from typing import Any, Dict, Generator, Iterator, List
 from app.config import get_settings
 
 settings = get_settings()
@@ -40,6 +43,32 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
+def stream_rows(stmt: Any) -> Iterator[Any]:
+    """
+    Execute *stmt* on a session of its own and iterate its rows, closing
+    the session once the iterator is exhausted or closed.
+
+    For ``StreamingResponse`` bodies: the request's ``get_db`` session can
+    be torn down before the body streams (yield-dependency teardown runs
+    first on FastAPI 0.106-0.117).  The statement is executed immediately,
+    so query errors still raise in the route handler.
+    """
+    db = SessionLocal()
+    try:
+        result = db.execute(stmt)
+    except Exception:
+        db.close()
+        raise
+
+    def rows() -> Iterator[Any]:
+        try:
+            yield from result
+        finally:
+            db.close()
+
+    return rows()
+
+
 def init_db() -> None:
     """
     Initialize database by creating all tables.
@@ -47,3 +76,91 @@ def init_db() -> None:
     """
     from app import models  # Import to register models
     Base.metadata.create_all(bind=engine)
+
+
+def bulk_upsert(
+    db: Session,
+    model: Any,
+    rows: List[Dict[str, Any]],
+    index_elements: List[str],
+    chunk_size: int = 1000,
+) -> None:
+    """
+    Insert-or-update many rows with one statement per *chunk_size* rows.
+
+    Uses ON DUPLICATE KEY UPDATE on MySQL / MariaDB and ON CONFLICT DO UPDATE
+    on PostgreSQL / SQLite; any other dialect gets a portable select-then-
+    insert/update of each chunk (three statements instead of one).
+    *index_elements* must name a unique key; every other key present in the
+    row dicts is overwritten on conflict.
+
+    Args:
+        db: Active session (statements run in its transaction)
+        model: Mapped ORM class
+        rows: Row dicts, all with the same keys
+        index_elements: Columns of the unique key used for conflict detection
+        chunk_size: Rows per statement
+    """
+    if not rows:
+        return
+
+    table = model.__table__
+    dialect = db.get_bind().dialect.name
+    update_columns = [c for c in rows[0] if c not in index_elements]
+
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+        if dialect in ("mysql", "mariadb"):
+            stmt = mysql_insert(table).values(chunk)
+            stmt = stmt.on_duplicate_key_update(
+                {c: stmt.inserted[c] for c in update_columns}
+            )
+        elif dialect in ("postgresql", "sqlite"):
+            dialect_insert = postgresql_insert if dialect == "postgresql" else sqlite_insert
+            stmt = dialect_insert(table).values(chunk)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=index_elements,
+                set_={c: stmt.excluded[c] for c in update_columns},
+            )
+        else:
+            _upsert_portable(db, table, chunk, index_elements, update_columns)
+            continue
+        db.execute(stmt)
+
+
+def _upsert_portable(
+    db: Session,
+    table: Any,
+    rows: List[Dict[str, Any]],
+    index_elements: List[str],
+    update_columns: List[str],
+) -> None:
+    """``bulk_upsert`` for dialects without a native upsert: read which keys
+    exist, then one executemany UPDATE and one executemany INSERT."""
+    keys = [table.c[name] for name in index_elements]
+    by_key = {tuple(row[name] for name in index_elements): row for row in rows}  # last row wins
+
+    if len(keys) == 1:
+        condition = keys[0].in_([key[0] for key in by_key])
+    else:
+        condition = or_(*(and_(*(c == v for c, v in zip(keys, key))) for key in by_key))
+    existing = {tuple(row) for row in db.execute(select(*keys).where(condition))}
+
+    updates = [row for key, row in by_key.items() if key in existing]
+    if updates and update_columns:
+        stmt = (
+            update(table)
+            .where(and_(*(c == bindparam(f"key_{c.name}") for c in keys)))
+            .values({c: bindparam(f"new_{c}") for c in update_columns})
+        )
+        db.execute(stmt, [
+            {
+                **{f"key_{name}": row[name] for name in index_elements},
+                **{f"new_{c}": row[c] for c in update_columns},
+            }
+            for row in updates
+        ])
+
+    inserts = [row for key, row in by_key.items() if key not in existing]
+    if inserts:
+        db.execute(insert(table), inserts)
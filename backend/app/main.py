@@ -29,6 +29,7 @@ from app.routes import (
     engagement,
     faculty_dashboard,
     frontend,
+    jobs,
     performance,
     prediction,
     student_dashboard,
@@ -36,7 +37,12 @@ from app.routes import (
     upload,
 )
 from app.routes import settings as settings_routes
+from app.services.cohort_aggregates import rebuild_cohort_aggregates
+from app.services.ingestion import remove_spooled_uploads
+from app.services.jobs import fail_interrupted_jobs, shutdown_job_workers
+from app.services.offload import shutdown_upload_workers
 from app.services.realtime_prediction import init_prediction_service
+from app.services.response_cache import ResponseCacheMiddleware
 from app.services.risk_model import RiskModel
 from app.services.shap_explainer import SHAPExplainer
 
@@ -139,6 +145,19 @@ async def lifespan(app: FastAPI):
         logger.critical(f"Database init failed: {exc}")
         raise
 
+    db = SessionLocal()
+    try:
+        interrupted = fail_interrupted_jobs(db)
+        if interrupted:
+            logger.warning(f"Marked {interrupted} interrupted background job(s) as failed")
+        stale_uploads = remove_spooled_uploads()
+        if stale_uploads:
+            logger.warning(f"Removed {stale_uploads} spooled upload(s) left by interrupted jobs")
+        rebuild_cohort_aggregates(db)
+        db.commit()
+    finally:
+        db.close()
+
     # 2. Load ML model
     db = SessionLocal()
     try:
@@ -188,6 +207,8 @@ async def lifespan(app: FastAPI):
     yield
 
     logger.info("Application shutting down...")
+    shutdown_upload_workers()
+    shutdown_job_workers()
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -205,6 +226,16 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+# Dashboard response cache (added before CORS so CORS wraps cached responses)
+app.add_middleware(
+    ResponseCacheMiddleware,
+    paths=[
+        "/api/faculty/overview",
+        "/api/analytics/overview",
+        "/api/engagement/overview",
+    ],
+)
+
 # CORS
 app.add_middleware(
     CORSMiddleware,
@@ -226,6 +257,7 @@ app.include_router(faculty_dashboard.router)   # /api/faculty/*
 app.include_router(upload.router)              # /api/faculty/upload/*
 app.include_router(settings_routes.router, prefix="/api", tags=["Settings"])
 app.include_router(analysis.router)
+app.include_router(jobs.router, prefix="/api", tags=["Jobs"])
 app.include_router(frontend.router, tags=["Frontend"])
 
 
@@ -241,7 +273,8 @@ async def root():
 
 
 @app.get("/health", tags=["Health"])
-async def health_check():
+def health_check():
+    # Sync so its DB probe runs on the threadpool, not the event loop
     from app.models import ModelVersion
 
     db_status = "healthy"
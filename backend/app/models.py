@@ -103,11 +103,14 @@ class Student(Base):
     risk_history = relationship("RiskHistory", back_populates="student", cascade="all, delete-orphan")
     interventions = relationship("Intervention", back_populates="student", cascade="all, delete-orphan")
     coding_profile = relationship("StudentCodingProfile", back_populates="student", uselist=False, cascade="all, delete-orphan")
+    profile_document = relationship("StudentProfileDocument", uselist=False, cascade="all, delete-orphan", passive_deletes=True)
     
     # Indexes
     __table_args__ = (
         Index('idx_student_department', 'department'),
         Index('idx_student_section', 'section'),
+        Index('idx_student_department_section', 'department', 'section'),
+        Index('idx_student_advisor', 'advisor_id'),
     )
 
 
@@ -203,6 +206,9 @@ class RiskScore(Base):
     __table_args__ = (
         Index('idx_risk_scores_student_id', 'student_id'),
         Index('idx_risk_scores_risk_level', 'risk_level'),
+        # Keyset pagination on (risk_score, student_id), optionally per level
+        Index('idx_risk_scores_score_student', 'risk_score', 'student_id'),
+        Index('idx_risk_scores_level_score_student', 'risk_level', 'risk_score', 'student_id'),
     )
 
 
@@ -258,6 +264,9 @@ class Intervention(Base):
     __table_args__ = (
         Index('idx_interventions_student_id', 'student_id'),
         Index('idx_interventions_status', 'status'),
+        # Newest-first keyset listing, optionally filtered by status
+        Index('idx_interventions_created', 'created_at', 'id'),
+        Index('idx_interventions_status_created', 'status', 'created_at', 'id'),
     )
 
 
@@ -487,3 +496,135 @@ class StudentRawAssignments(Base):
     __table_args__ = (
         Index('idx_raw_assignments_student', 'student_id'),
     )
+
+
+class StudentFeatureAggregate(Base):
+    """
+    Running per-student aggregates over the raw upload tables.
+
+    Maintained by delta on each upload so StudentMetric can be refreshed
+    without rescanning a student's raw history.
+    """
+    __tablename__ = "student_feature_aggregates"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    student_id = Column(String(50), ForeignKey("students.id", ondelete="CASCADE"), unique=True, nullable=False)
+
+    # Attendance
+    attendance_total = Column(Integer, nullable=False, default=0)
+    attendance_present = Column(Integer, nullable=False, default=0)
+
+    # Marks (percentages only over rows with max_marks > 0)
+    marks_rows = Column(Integer, nullable=False, default=0)
+    marks_count = Column(Integer, nullable=False, default=0)
+    marks_pct_sum = Column(Float, nullable=False, default=0.0)
+    marks_fail_count = Column(Integer, nullable=False, default=0)
+    # Oldest floor(marks_count / 2) rows, for semester_performance_trend
+    marks_first_half_count = Column(Integer, nullable=False, default=0)
+    marks_first_half_sum = Column(Float, nullable=False, default=0.0)
+    marks_first_half_last_id = Column(Integer, nullable=False, default=0)
+
+    # Assignments
+    assignments_total = Column(Integer, nullable=False, default=0)
+    assignments_submitted = Column(Integer, nullable=False, default=0)
+    assignments_scored = Column(Integer, nullable=False, default=0)
+    assignments_score_pct_sum = Column(Float, nullable=False, default=0.0)
+
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+
+class JobStatus(str, enum.Enum):
+    """Background job status."""
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class Job(Base):
+    """
+    Background job (e.g. an upload and its risk recomputation).
+
+    Progress, per-stage timings and errors are written by the worker as
+    the job runs and served by GET /api/jobs/{id}.
+    """
+    __tablename__ = "jobs"
+
+    id = Column(String(36), primary_key=True)  # uuid4
+    job_type = Column(String(50), nullable=False)  # e.g. "upload_attendance"
+    status = Column(SQLEnum(JobStatus), nullable=False, default=JobStatus.QUEUED)
+    params = Column(JSON, nullable=True)  # e.g. {"data_type": ..., "filename": ...}
+
+    progress = Column(JSON, nullable=True)  # latest counters reported by the worker
+    stage_timings = Column(JSON, nullable=True)  # {"ingest": seconds, ...}
+    result = Column(JSON, nullable=True)
+    errors = Column(JSON, nullable=True)  # row / student level errors (capped)
+    error = Column(Text, nullable=True)  # fatal error that failed the job
+
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index('idx_jobs_status', 'status'),
+    )
+
+
+class CohortAggregate(Base):
+    """
+    Precomputed dashboard aggregates for one department, or the whole
+    cohort (scope "all").
+
+    Kept current by delta from the feature and risk writers so the
+    analytics dashboards read a handful of rows instead of scanning
+    students, metrics and risk scores.
+    """
+    __tablename__ = "cohort_aggregates"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    scope = Column(String(50), unique=True, nullable=False)  # Department value or "all"
+
+    student_count = Column(Integer, nullable=False, default=0)
+
+    # Sums over StudentMetric rows
+    metrics_count = Column(Integer, nullable=False, default=0)
+    attendance_sum = Column(Float, nullable=False, default=0.0)
+    engagement_sum = Column(Float, nullable=False, default=0.0)
+    performance_sum = Column(Float, nullable=False, default=0.0)
+    failure_ratio_sum = Column(Float, nullable=False, default=0.0)
+    trend_sum = Column(Float, nullable=False, default=0.0)
+
+    # RiskScore counts, sum and 10-point histogram ([0,10) ... [90,100))
+    scored_count = Column(Integer, nullable=False, default=0)
+    risk_score_sum = Column(Float, nullable=False, default=0.0)
+    high_count = Column(Integer, nullable=False, default=0)
+    moderate_count = Column(Integer, nullable=False, default=0)
+    stable_count = Column(Integer, nullable=False, default=0)
+    safe_count = Column(Integer, nullable=False, default=0)
+    risk_bucket_0 = Column(Integer, nullable=False, default=0)
+    risk_bucket_1 = Column(Integer, nullable=False, default=0)
+    risk_bucket_2 = Column(Integer, nullable=False, default=0)
+    risk_bucket_3 = Column(Integer, nullable=False, default=0)
+    risk_bucket_4 = Column(Integer, nullable=False, default=0)
+    risk_bucket_5 = Column(Integer, nullable=False, default=0)
+    risk_bucket_6 = Column(Integer, nullable=False, default=0)
+    risk_bucket_7 = Column(Integer, nullable=False, default=0)
+    risk_bucket_8 = Column(Integer, nullable=False, default=0)
+    risk_bucket_9 = Column(Integer, nullable=False, default=0)
+
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+
+class StudentProfileDocument(Base):
+    """
+    Denormalised faculty profile (FacultyStudentProfile as JSON) per student.
+
+    Rebuilt by the risk and intervention writers so the faculty profile
+    view is a single primary-key read.  Feature refreshes drop the row and
+    the next read rebuilds it.
+    """
+    __tablename__ = "student_profiles"
+
+    student_id = Column(String(50), ForeignKey("students.id", ondelete="CASCADE"), primary_key=True)
+    document = Column(JSON, nullable=False)
+    built_at = Column(DateTime, default=datetime.utcnow, nullable=False)
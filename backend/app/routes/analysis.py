@@ -9,7 +9,7 @@ from __future__ import annotations
 import io
 import json
 import math
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 import numpy as np
 import pandas as pd
@@ -20,7 +20,11 @@ from pydantic import BaseModel
 
 from app.database import get_db
 from app.models import Department, ModelVersion, RiskLevel, RiskScore, RiskTrend, Section, Student, StudentMetric
-from app.services.realtime_prediction import compute_risk_from_metrics_dict
+from app.services.cohort_aggregates import rebuild_cohort_aggregates
+from app.services.offload import run_blocking
+from app.services.realtime_prediction import BATCH_CHUNK_SIZE, compute_risks_from_metrics_frame
+from app.services.response_cache import bump_data_generation
+from app.services.student_profiles import invalidate_profiles
 
 router = APIRouter(prefix="/api/analysis", tags=["Analysis"])
 
@@ -183,6 +187,13 @@ def _check_relevance(col_map: Dict[str, Optional[str]], all_columns: List[str])
         )
 
 
+def _parse_flags(values: pd.Series) -> pd.Series:
+    """financial_risk_flag as bool: "0" / "false" / "no" / "" are False, other values truthy."""
+    if values.dtype == object or pd.api.types.is_string_dtype(values.dtype):
+        return ~values.astype(str).str.lower().isin(("0", "false", "no", ""))
+    return values.astype(bool)
+
+
 def _refine_dataframe(df: pd.DataFrame) -> pd.DataFrame:
     """
     Map raw columns to the refined schema, engineer missing features,
@@ -196,101 +207,131 @@ def _refine_dataframe(df: pd.DataFrame) -> pd.DataFrame:
 
     _check_relevance(col_map, cols)
 
-    rows_out: List[Dict[str, Any]] = []
-    records = df.to_dict("records")
+    n = len(df)
+    index = df.index
+
+    def text(refined: str, default: Any) -> pd.Series:
+        src = col_map.get(refined)
+        if src is None:
+            return pd.Series(default, index=index).astype(str)
+        return df[src].astype(str).fillna("nan")  # str(NaN), as the per-row mapping did
+
+    def coerce(src: Optional[str]) -> pd.Series:
+        """Column-wise _safe_float: NaN where missing, unparseable or infinite."""
+        if src is None:
+            return pd.Series(np.nan, index=index)
+        return pd.to_numeric(df[src], errors="coerce").replace([np.inf, -np.inf], np.nan)
 
-    # Pre-compute means for columns that exist (for imputation)
+    # Coerce each mapped metric column once; means of those that exist impute gaps
+    values: Dict[str, pd.Series] = {}
     means: Dict[str, float] = {}
-    for refined, src in col_map.items():
+    for refined in METRIC_KEYS:
+        if refined == "financial_risk_flag":
+            continue
+        src = col_map.get(refined)
         if src is None:
+            values[refined] = coerce(None)
             continue
-        vals = pd.to_numeric(df[src], errors="coerce").dropna()
-        if len(vals) > 0:
-            means[refined] = float(vals.mean())
-
-    for i, r in enumerate(records):
-        out: Dict[str, Any] = {}
-
-        out["id"] = str(r.get(col_map.get("id") or "id", i + 1))
-        out["name"] = str(r.get(col_map.get("name") or "name", "Unknown"))
-        out["department"] = str(r.get(col_map.get("department") or "department", "CSE"))
-
-        # attendance_rate
-        src = col_map.get("attendance_rate")
-        att = _safe_float(r.get(src) if src else None, float("nan"))
-        out["attendance_rate"] = _clamp(att if not math.isnan(att) else means.get("attendance_rate", 75), 0, 100)
-
-        # engagement_score — compute from MID exam scores if not directly available
-        src_eng = col_map.get("engagement_score")
-        if src_eng:
-            eng = _safe_float(r.get(src_eng), float("nan"))
-        else:
-            mid_cols = [c for c in cols if "mid" in c.lower() and "subject" in c.lower()]
-            mid_vals = [_safe_float(r.get(c), float("nan")) for c in mid_cols]
-            mid_vals = [v for v in mid_vals if not math.isnan(v)]
-            eng = (sum(mid_vals) / len(mid_vals) / 30) * 100 if mid_vals else float("nan")
-        out["engagement_score"] = _clamp(eng if not math.isnan(eng) else means.get("engagement_score", 70), 0, 100)
-
-        # academic_performance_index — from CGPA (0-10 scale)
-        src_gpa = col_map.get("academic_performance_index")
-        gpa = _safe_float(r.get(src_gpa) if src_gpa else None, float("nan"))
-        if math.isnan(gpa):
-            gpa = means.get("academic_performance_index", 6.5)
-        if gpa > 10:
-            gpa = gpa / 10
-        out["academic_performance_index"] = round(_clamp(gpa, 0, 10), 3)
-
-        # login_gap_days — synthetic from engagement if missing
-        src_lg = col_map.get("login_gap_days")
-        lg = _safe_float(r.get(src_lg) if src_lg else None, float("nan"))
-        if math.isnan(lg):
-            lg = max(0, round(15 - out["engagement_score"] / 10))
-        out["login_gap_days"] = max(0, round(lg))
-
-        # failure_ratio — estimate from CGPA & attendance if missing
-        src_fr = col_map.get("failure_ratio")
-        fr = _safe_float(r.get(src_fr) if src_fr else None, float("nan"))
-        if math.isnan(fr):
-            gpa_val = out["academic_performance_index"]
-            att_val = out["attendance_rate"]
-            fr = _clamp(1.0 - (gpa_val / 10 * 0.6 + att_val / 100 * 0.4), 0, 1)
-        out["failure_ratio"] = round(_clamp(fr, 0, 1), 3)
-
-        # financial_risk_flag — default to 0 if missing
-        src_ff = col_map.get("financial_risk_flag")
-        if src_ff:
-            raw_flag = r.get(src_ff, 0)
-            if isinstance(raw_flag, str):
-                out["financial_risk_flag"] = 0 if raw_flag.lower() in ("0", "false", "no", "") else 1
-            else:
-                out["financial_risk_flag"] = 1 if bool(raw_flag) else 0
+        parsed = pd.to_numeric(df[src], errors="coerce")
+        if parsed.notna().any():
+            means[refined] = float(parsed.mean())
+        values[refined] = parsed.replace([np.inf, -np.inf], np.nan)
+
+    out = pd.DataFrame(index=index)
+    out["id"] = text("id", "") if col_map.get("id") else pd.Series(np.arange(1, n + 1), index=index).astype(str)
+    out["name"] = text("name", "Unknown")
+    out["department"] = text("department", "CSE")
+
+    attendance = values["attendance_rate"].fillna(means.get("attendance_rate", 75)).clip(0, 100)
+    out["attendance_rate"] = attendance
+
+    # engagement_score — mean of the MID exam scores (out of 30) if not directly available
+    if col_map.get("engagement_score"):
+        engagement = values["engagement_score"]
+    else:
+        mid_cols = [c for c in cols if "mid" in c.lower() and "subject" in c.lower()]
+        if mid_cols:
+            mids = pd.concat([coerce(c) for c in mid_cols], axis=1)
+            engagement = mids.mean(axis=1, skipna=True) / 30 * 100
         else:
-            out["financial_risk_flag"] = 0
+            engagement = pd.Series(np.nan, index=index)
+    engagement = engagement.fillna(means.get("engagement_score", 70)).clip(0, 100)
+    out["engagement_score"] = engagement
+
+    # academic_performance_index — CGPA on a 0-10 scale (percentages divided down)
+    gpa = values["academic_performance_index"].fillna(means.get("academic_performance_index", 6.5))
+    gpa = pd.Series(np.where(gpa > 10, gpa / 10, gpa), index=index)
+    gpa = gpa.clip(0, 10).round(3)
+    out["academic_performance_index"] = gpa
+
+    # login_gap_days — synthetic from engagement if missing
+    login_gap = values["login_gap_days"].fillna((15 - engagement / 10).round().clip(lower=0))
+    out["login_gap_days"] = login_gap.round().clip(lower=0).astype(int)
+
+    # failure_ratio — estimate from CGPA & attendance if missing
+    estimate = (1.0 - (gpa / 10 * 0.6 + attendance / 100 * 0.4)).clip(0, 1)
+    out["failure_ratio"] = values["failure_ratio"].fillna(estimate).clip(0, 1).round(3)
+
+    # financial_risk_flag — default to 0 if missing
+    src_ff = col_map.get("financial_risk_flag")
+    out["financial_risk_flag"] = _parse_flags(df[src_ff]).astype(int) if src_ff else 0
+
+    # commute_risk_score — default to 1 if missing
+    out["commute_risk_score"] = values["commute_risk_score"].round().clip(1, 4).fillna(1).astype(int)
+
+    # semester_performance_trend — compute from Sem1/Sem2 GPA if available
+    sem1 = coerce(_find_column(cols, ["sem1_gpa"])).fillna(0)
+    sem2 = coerce(_find_column(cols, ["sem2_gpa"])).fillna(0)
+    sem_trend = pd.Series(
+        np.where(sem1 > 0, (sem2 - sem1) / sem1.where(sem1 > 0, 1) * 100, 0.0), index=index,
+    )
+    out["semester_performance_trend"] = (
+        values["semester_performance_trend"].fillna(sem_trend).clip(-100, 100).round(2)
+    )
+
+    return out[REQUIRED_COLUMNS].reset_index(drop=True)
+
 
-        # commute_risk_score — default to 1 if missing
-        src_cr = col_map.get("commute_risk_score")
-        cr = _safe_float(r.get(src_cr) if src_cr else None, float("nan"))
-        out["commute_risk_score"] = max(1, min(4, round(cr))) if not math.isnan(cr) else 1
+IMPORT_INT_METRICS = ("login_gap_days", "commute_risk_score")
+
+
+def _import_metrics(df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.Series]:
+    """
+    Coerce the metric columns of a refined frame in one pass per column.
 
-        # semester_performance_trend — compute from Sem1/Sem2 GPA if available
-        src_trend = col_map.get("semester_performance_trend")
-        trend = _safe_float(r.get(src_trend) if src_trend else None, float("nan"))
-        if math.isnan(trend):
-            sem1_col = _find_column(cols, ["sem1_gpa"])
-            sem2_col = _find_column(cols, ["sem2_gpa"])
-            sem1 = _safe_float(r.get(sem1_col) if sem1_col else None, 0)
-            sem2 = _safe_float(r.get(sem2_col) if sem2_col else None, 0)
-            trend = ((sem2 - sem1) / sem1 * 100) if sem1 > 0 else 0.0
-        out["semester_performance_trend"] = round(_clamp(trend, -100, 100), 2)
+    Returns the metrics frame and, per row, the first metric column whose
+    value could not be read (None for valid rows).  Missing floats are left
+    as NaN for the model's defaults; integer columns must be finite.
+    """
+    metrics: Dict[str, pd.Series] = {}
+    invalid = pd.Series(None, index=df.index, dtype=object)
+    for column in METRIC_KEYS:
+        raw = df[column]
+        if column == "financial_risk_flag":
+            metrics[column] = _parse_flags(raw)
+            continue
+        values = pd.to_numeric(raw, errors="coerce")
+        bad = values.isna() & raw.notna()
+        if column in IMPORT_INT_METRICS:
+            bad |= ~np.isfinite(values)
+            values = values.where(~bad, 0).astype(int)
+        invalid = invalid.where(invalid.notna() | ~bad, column)
+        metrics[column] = values
+    return pd.DataFrame(metrics, index=df.index), invalid
 
-        rows_out.append(out)
 
-    return pd.DataFrame(rows_out, columns=REQUIRED_COLUMNS)
+def _avatar(name: str) -> str:
+    return "".join([w[0].upper() for w in name.split()[:2]]) if name else "??"
 
 
-def _stream_progress(rows: List[Dict], total: int, columns: List[str], was_refined: bool):
-    """Yield progress events as JSON lines."""
+def _stream_progress(df: pd.DataFrame, columns: List[str], was_refined: bool):
+    """
+    Yield progress events as JSON lines.
 
+    *df* must have a RangeIndex.  Rows are scored BATCH_CHUNK_SIZE at a time
+    with one predict_proba call per chunk; a progress event follows each chunk.
+    """
+    total = len(df)
     label = "refined" if was_refined else "auto-mapped from raw"
     yield json.dumps({
         "type": "progress",
@@ -317,78 +358,66 @@ def _stream_progress(rows: List[Dict], total: int, columns: List[str], was_refin
     }) + "\n"
 
     results = []
-    high_risk = 0
-    moderate = 0
-    stable = 0
-    safe = 0
+    levels: Dict[str, int] = {"High Risk": 0, "Moderate Risk": 0, "Stable": 0, "Safe": 0}
 
-    for i, row in enumerate(rows):
-        try:
-            raw_flag = row.get("financial_risk_flag", 0)
-            if isinstance(raw_flag, str):
-                financial_flag = raw_flag.lower() not in ("0", "false", "no", "")
-            else:
-                financial_flag = bool(raw_flag)
-
-            metrics = {
-                "attendance_rate": float(row.get("attendance_rate", 75)),
-                "engagement_score": float(row.get("engagement_score", 70)),
-                "academic_performance_index": float(row.get("academic_performance_index", 6.5)),
-                "login_gap_days": int(float(row.get("login_gap_days", 3))),
-                "failure_ratio": float(row.get("failure_ratio", 0.1)),
-                "financial_risk_flag": financial_flag,
-                "commute_risk_score": int(float(row.get("commute_risk_score", 1))),
-                "semester_performance_trend": float(row.get("semester_performance_trend", 0)),
-            }
-            risk = compute_risk_from_metrics_dict(metrics)
-            sid = str(row.get("id", i))
-            name = str(row.get("name", "Unknown"))
-            avatar = "".join([w[0].upper() for w in name.split()[:2]]) if name else "??"
-
-            if risk["risk_level"] == "High Risk":
-                high_risk += 1
-            elif risk["risk_level"] == "Moderate Risk":
-                moderate += 1
-            elif risk["risk_level"] == "Stable":
-                stable += 1
-            else:
-                safe += 1
+    metrics, invalid = _import_metrics(df)
+    ids = df["id"].astype(str).tolist()
+    names = df["name"].astype(str).tolist()
+    departments = df["department"].astype(str).tolist()
 
-            results.append({
-                "id": sid,
-                "name": name,
-                "avatar": avatar,
-                "riskScore": risk["risk_score"],
-                "riskLevel": risk["risk_level"],
-                "riskValue": risk["risk_value"],
-                "department": str(row.get("department", "")),
-                "attendance_rate": metrics["attendance_rate"],
-                "engagement_score": metrics["engagement_score"],
-            })
-
-            if (i + 1) % max(1, total // 20) == 0 or i == total - 1:
-                yield json.dumps({
-                    "type": "progress",
-                    "phase": "risk_compute",
-                    "processed": i + 1,
-                    "total": total,
-                    "message": f"Computed risk for {i + 1}/{total} students",
-                    "latest_student": name,
-                    "latest_risk": risk["risk_level"],
-                    "distribution": {
-                        "High Risk": high_risk,
-                        "Moderate Risk": moderate,
-                        "Stable": stable,
-                        "Safe": safe,
-                    },
-                }) + "\n"
+    for start in range(0, total, BATCH_CHUNK_SIZE):
+        stop = min(start + BATCH_CHUNK_SIZE, total)
+        for pos in np.flatnonzero(invalid.iloc[start:stop].notna().to_numpy()) + start:
+            column = invalid.iloc[pos]
+            yield json.dumps({
+                "type": "error",
+                "row": int(pos),
+                "message": f"Invalid {column}: {df[column].iloc[pos]!r}",
+            }) + "\n"
 
+        chunk = metrics.iloc[start:stop][invalid.iloc[start:stop].isna()]
+        try:
+            risks = compute_risks_from_metrics_frame(chunk) if len(chunk) else []
         except Exception as e:
             yield json.dumps({
                 "type": "error",
-                "row": i,
+                "rows": [start, stop - 1],
                 "message": str(e),
             }) + "\n"
+            continue
+
+        attendance = chunk["attendance_rate"].astype(float).tolist()
+        engagement = chunk["engagement_score"].astype(float).tolist()
+        for pos, risk, att, eng in zip(chunk.index, risks, attendance, engagement):
+            level = risk["risk_level"]
+            levels[level if level in levels else "Safe"] += 1
+            results.append({
+                "id": ids[pos],
+                "name": names[pos],
+                "avatar": _avatar(names[pos]),
+                "riskScore": risk["risk_score"],
+                "riskLevel": level,
+                "riskValue": risk["risk_value"],
+                "department": departments[pos],
+                "attendance_rate": att,
+                "engagement_score": eng,
+            })
+
+        yield json.dumps({
+            "type": "progress",
+            "phase": "risk_compute",
+            "processed": stop,
+            "total": total,
+            "message": f"Computed risk for {stop}/{total} students",
+            "latest_student": results[-1]["name"] if results else None,
+            "latest_risk": results[-1]["riskLevel"] if results else None,
+            "distribution": dict(levels),
+        }) + "\n"
+
+    high_risk = levels["High Risk"]
+    moderate = levels["Moderate Risk"]
+    stable = levels["Stable"]
+    safe = levels["Safe"]
 
     avg_risk = sum(r["riskScore"] for r in results) / len(results) if results else 0
     avg_att = sum(r["attendance_rate"] for r in results) / len(results) if results else 0
@@ -428,6 +457,32 @@ def _stream_progress(rows: List[Dict], total: int, columns: List[str], was_refin
     }) + "\n"
 
 
+def _prepare_import(raw: bytes) -> Tuple[pd.DataFrame, bool]:
+    """Parse an uploaded CSV and refine it if needed; returns (frame, was_refined)."""
+    try:
+        df = pd.read_csv(io.BytesIO(raw), encoding="utf-8")
+    except UnicodeDecodeError:
+        df = pd.read_csv(io.BytesIO(raw), encoding="latin-1")
+
+    df = _normalise_columns(df)
+    missing = [c for c in REQUIRED_COLUMNS if c not in df.columns]
+    if not missing:
+        return df.reset_index(drop=True), True
+
+    try:
+        return _refine_dataframe(df), False
+    except IrrelevantFileError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=400,
+            detail=(
+                f"CSV does not match the refined schema and auto-mapping failed. "
+                f"Missing columns: {missing}. Error: {e}"
+            ),
+        )
+
+
 @router.post("/import")
 async def import_refined_csv(file: UploadFile = File(...)):
     """
@@ -441,36 +496,14 @@ async def import_refined_csv(file: UploadFile = File(...)):
     if len(raw) > 10 * 1024 * 1024:
         raise HTTPException(status_code=413, detail="File too large (max 10 MB).")
 
-    try:
-        df = pd.read_csv(io.BytesIO(raw), encoding="utf-8")
-    except UnicodeDecodeError:
-        df = pd.read_csv(io.BytesIO(raw), encoding="latin-1")
-
-    df = _normalise_columns(df)
-    missing = [c for c in REQUIRED_COLUMNS if c not in df.columns]
-
-    was_refined = True
-    if missing:
-        try:
-            df = _refine_dataframe(df)
-            was_refined = False
-        except IrrelevantFileError as e:
-            raise HTTPException(status_code=422, detail=str(e))
-        except Exception as e:
-            raise HTTPException(
-                status_code=400,
-                detail=(
-                    f"CSV does not match the refined schema and auto-mapping failed. "
-                    f"Missing columns: {missing}. Error: {e}"
-                ),
-            )
-
-    rows = df.to_dict("records")
-    total = len(rows)
+    df, was_refined = await run_blocking(_prepare_import, raw)
     columns = list(df.columns)
 
-    def generate():
-        yield from _stream_progress(rows, total, columns, was_refined)
+    async def generate():
+        # Each chunk is scored on the upload pool; events stream in between
+        events = _stream_progress(df, columns, was_refined)
+        while (event := await run_blocking(next, events, None)) is not None:
+            yield event
 
     return StreamingResponse(
         generate(),
@@ -561,7 +594,12 @@ def persist_analysis(payload: PersistPayload, db: Session = Depends(get_db)):
             risk_row.model_version_id = active_model.id
             risk_row.shap_explanation = shap
 
+    # Rows were rewritten ad hoc (including department moves): recount.
+    db.flush()
+    rebuild_cohort_aggregates(db)
+    invalidate_profiles(db, [str(s.id).strip() for s in payload.students])
     db.commit()
+    bump_data_generation()
     return {
         "ok": True,
         "message": "Analysis persisted to database.",
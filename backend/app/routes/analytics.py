@@ -4,18 +4,31 @@ Analytics API routes for dashboard metrics and insights.
 
 from datetime import datetime, timedelta
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 from typing import List, Optional
 
 from app.database import get_db
-from app.models import Student, RiskScore, ModelVersion, RiskLevel, Department, StudentMetric, RiskHistory, Intervention, InterventionStatus, User, Role
+from app.models import Student, RiskScore, ModelVersion, RiskLevel, StudentMetric, RiskHistory, Intervention, InterventionStatus, User, Role
 from app.schemas import (
     AnalyticsOverview, DepartmentRiskBreakdown,
     FeatureImportance, RiskDistributionBucket
 )
+from app.services.cohort_aggregates import (
+    ALL_SCOPE, average, get_cohort_aggregate, get_cohort_aggregates, histogram, level_distribution,
+)
+from app.services.department_analytics import department_stats
+from app.services.intervention_listing import (
+    DEFAULT_PAGE_SIZE as INTERVENTION_PAGE_SIZE,
+    MAX_PAGE_SIZE as INTERVENTION_MAX_PAGE_SIZE,
+    count_by_status,
+    list_interventions,
+    parse_statuses,
+)
+from app.services.realtime_prediction import get_shap_cache_stats
+from app.services.response_cache import get_response_cache_stats
 
 router = APIRouter()
 
@@ -24,52 +37,30 @@ router = APIRouter()
 def get_analytics_overview(db: Session = Depends(get_db)):
     """
     Get dashboard overview metrics.
+
+    Served from the materialised cohort aggregates (one small read).
     """
-    # Total students
-    total_students = db.query(func.count(Student.id)).scalar()
-    
-    # High risk count
-    high_risk_count = db.query(func.count(RiskScore.id)).filter(
-        RiskScore.risk_level == RiskLevel.HIGH
-    ).scalar()
-    
+    aggregates = get_cohort_aggregates(db)
+    overall = aggregates.get(ALL_SCOPE) or get_cohort_aggregate(db)
+
+    total_students = overall.student_count
+    high_risk_count = overall.high_count
     high_risk_percentage = (high_risk_count / total_students * 100) if total_students > 0 else 0
-    
-    # Average risk score
-    avg_risk_score = db.query(func.avg(RiskScore.risk_score)).scalar() or 0
-    
-    # Average attendance from StudentMetric
-    avg_attendance = db.query(func.avg(StudentMetric.attendance_rate)).scalar() or 0
 
     # High risk department: department with the most high-risk students
     high_risk_dept = None
-    high_risk_dept_row = (
-        db.query(Student.department, func.count(RiskScore.id).label("cnt"))
-        .join(RiskScore, RiskScore.student_id == Student.id)
-        .filter(RiskScore.risk_level == RiskLevel.HIGH)
-        .group_by(Student.department)
-        .order_by(func.count(RiskScore.id).desc())
-        .first()
-    )
-    if high_risk_dept_row:
-        high_risk_dept = high_risk_dept_row[0].value if hasattr(high_risk_dept_row[0], 'value') else str(high_risk_dept_row[0])
-
-    # Risk distribution
-    risk_distribution = {}
-    for level in RiskLevel:
-        count = db.query(func.count(RiskScore.id)).filter(
-            RiskScore.risk_level == level
-        ).scalar()
-        risk_distribution[level.value] = count
-    
+    dept_rows = [row for scope, row in aggregates.items() if scope != ALL_SCOPE and row.high_count > 0]
+    if dept_rows:
+        high_risk_dept = max(dept_rows, key=lambda row: row.high_count).scope
+
     return AnalyticsOverview(
         total_students=total_students,
         high_risk_count=high_risk_count,
         high_risk_percentage=round(high_risk_percentage, 2),
-        average_risk_score=round(float(avg_risk_score), 2),
-        average_attendance=round(float(avg_attendance), 2),
+        average_risk_score=round(average(overall, "risk_score_sum"), 2),
+        average_attendance=round(average(overall, "attendance_sum"), 2),
         high_risk_department=high_risk_dept,
-        risk_distribution=risk_distribution
+        risk_distribution=level_distribution(overall),
     )
 
 
@@ -80,24 +71,11 @@ def get_risk_distribution(db: Session = Depends(get_db)):
     
     Returns buckets of risk scores (0-10, 10-20, ..., 90-100).
     """
-    buckets = []
-    
-    for i in range(0, 100, 10):
-        bucket_start = i
-        bucket_end = i + 10
-        
-        count = db.query(func.count(RiskScore.id)).filter(
-            RiskScore.risk_score >= bucket_start,
-            RiskScore.risk_score < bucket_end
-        ).scalar()
-        
-        buckets.append(RiskDistributionBucket(
-            bucket_start=bucket_start,
-            bucket_end=bucket_end,
-            count=count
-        ))
-    
-    return buckets
+    counts = histogram(get_cohort_aggregate(db))
+    return [
+        RiskDistributionBucket(bucket_start=i * 10, bucket_end=i * 10 + 10, count=count)
+        for i, count in enumerate(counts)
+    ]
 
 
 @router.get("/feature-importance", response_model=List[FeatureImportance])
@@ -131,37 +109,16 @@ def get_department_breakdown(db: Session = Depends(get_db)):
     
     Returns average risk score and high-risk count per department.
     """
-    results = []
-    
-    for dept in Department:
-        # Get students in department
-        students_in_dept = db.query(Student.id).filter(
-            Student.department == dept
-        ).subquery()
-        
-        # Total students
-        total = db.query(func.count(students_in_dept.c.id)).scalar()
-        
-        if total == 0:
-            continue
-        
-        # Average risk score
-        avg_risk = db.query(func.avg(RiskScore.risk_score)).join(
-            students_in_dept, RiskScore.student_id == students_in_dept.c.id
-        ).scalar() or 0
-        
-        # High risk count
-        high_risk = db.query(func.count(RiskScore.id)).join(
-            students_in_dept, RiskScore.student_id == students_in_dept.c.id
-        ).filter(RiskScore.risk_level == RiskLevel.HIGH).scalar()
-        
-        results.append(DepartmentRiskBreakdown(
+    results = [
+        DepartmentRiskBreakdown(
             department=dept,
-            total_students=total,
-            average_risk_score=round(float(avg_risk), 2),
-            high_risk_count=high_risk
-        ))
-    
+            total_students=row["total"],
+            average_risk_score=round(float(row["avg_risk"] or 0), 2),
+            high_risk_count=row["high_risk"],
+        )
+        for dept, row in department_stats(db).items()
+    ]
+
     # Sort by average risk score descending
     results.sort(key=lambda x: x.average_risk_score, reverse=True)
     
@@ -209,12 +166,14 @@ def get_ml_metrics(db: Session = Depends(get_db)):
     Returns live ML model performance metrics and student analysis counts.
     """
     active_model = db.query(ModelVersion).filter(ModelVersion.is_active == True).first()
-    total_students = db.query(func.count(Student.id)).scalar() or 0
-    high_risk_count = db.query(func.count(RiskScore.id)).filter(
-        RiskScore.risk_level == RiskLevel.HIGH
-    ).scalar() or 0
+    aggregates = get_cohort_aggregates(db)
+    overall = aggregates.get(ALL_SCOPE) or get_cohort_aggregate(db)
+    total_students = overall.student_count
+    high_risk_count = overall.high_count
 
-    dept_count = db.query(func.count(func.distinct(Student.department))).scalar() or 0
+    dept_count = sum(
+        1 for scope, row in aggregates.items() if scope != ALL_SCOPE and row.student_count > 0
+    )
 
     accuracy = round(active_model.accuracy * 100, 1) if active_model and active_model.accuracy else 0
     f1 = round(active_model.f1_score * 100, 1) if active_model and active_model.f1_score else 0
@@ -228,29 +187,41 @@ def get_ml_metrics(db: Session = Depends(get_db)):
         "department_count": dept_count,
         "high_risk_alerts": high_risk_count,
         "model_version": active_model.version if active_model else "N/A",
+        "shap_cache": get_shap_cache_stats(),
+        "response_cache": get_response_cache_stats(),
     }
 
 
 @router.get("/interventions")
-def get_interventions_list(db: Session = Depends(get_db)):
+def get_interventions_list(
+    status: Optional[str] = Query(default=None, description="Comma-separated statuses, e.g. pending,in_progress"),
+    cursor: Optional[str] = Query(default=None, description="next_cursor of the previous page"),
+    limit: int = Query(default=INTERVENTION_PAGE_SIZE, ge=1, le=INTERVENTION_MAX_PAGE_SIZE),
+    db: Session = Depends(get_db),
+):
     """
-    Returns all interventions grouped by status for the intervention board.
+    Returns interventions (newest first, one page) grouped by status for
+    the intervention board, plus ``totals`` per column over every page.
     """
-    interventions = db.query(Intervention).order_by(Intervention.created_at.desc()).all()
+    statuses = parse_statuses(status)
+    try:
+        rows, next_cursor = list_interventions(db, statuses=statuses, cursor=cursor, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    counts = count_by_status(db, statuses=statuses)
 
     pending = []
     in_progress = []
     completed = []
 
-    for iv in interventions:
-        student = db.query(Student).filter(Student.id == iv.student_id).first()
-        risk = db.query(RiskScore).filter(RiskScore.student_id == iv.student_id).first()
-        risk_level_str = risk.risk_level.value if risk else "Unknown"
+    for row in rows:
+        iv = row.Intervention
+        risk_level_str = row.risk_level.value if row.risk_level else "Unknown"
 
         card = {
             "id": str(iv.id),
-            "studentName": student.name if student else "Unknown",
-            "studentInitial": (student.name[:2].upper() if student and student.name else "UK"),
+            "studentName": row.student_name or "Unknown",
+            "studentInitial": (row.student_name[:2].upper() if row.student_name else "UK"),
             "studentId": f"#{iv.student_id}",
             "riskLevel": risk_level_str,
             "alertTitle": iv.intervention_type.value.replace("_", " ").title() if iv.intervention_type else "Alert",
@@ -271,7 +242,17 @@ def get_interventions_list(db: Session = Depends(get_db)):
         else:
             pending.append(card)
 
-    return {"pending": pending, "in_progress": in_progress, "completed": completed}
+    return {
+        "pending": pending,
+        "in_progress": in_progress,
+        "completed": completed,
+        "next_cursor": next_cursor,
+        "totals": {
+            "pending": counts[InterventionStatus.PENDING],
+            "in_progress": counts[InterventionStatus.IN_PROGRESS],
+            "completed": counts[InterventionStatus.COMPLETED] + counts[InterventionStatus.CANCELLED],
+        },
+    }
 
 
 @router.get("/faculty")
@@ -19,27 +19,26 @@ GET  /api/faculty/students/{id}/explanation   — SHAP explanation
 
 from __future__ import annotations
 
-import csv
-import io
 import math
+import tempfile
 import traceback
+from functools import partial
 from datetime import datetime, timedelta
-from typing import List, Optional, Set
+from typing import Iterator, List, Optional
 
 import pandas as pd
 from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, UploadFile
-from fastapi.responses import StreamingResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from loguru import logger
 from sqlalchemy import desc, func, text
 from sqlalchemy.orm import Session
 
-from app.database import get_db
+from app.config import get_settings
+from app.database import get_db, stream_rows
 from app.models import (
-    Department,
     Intervention,
     InterventionStatus,
     ModelVersion,
-    RiskHistory,
     RiskLevel,
     RiskScore,
     RiskTrend,
@@ -47,9 +46,6 @@ from app.models import (
     Student,
     StudentCodingProfile,
     StudentMetric,
-    StudentRawAssignments,
-    StudentRawAttendance,
-    StudentRawMarks,
 )
 from app.schemas import (
     AnalyticsOverview,
@@ -58,18 +54,32 @@ from app.schemas import (
     DepartmentTrendPoint,
     FacultyStudentListItem,
     FacultyStudentProfile,
-    InterventionItem,
+    JobAccepted,
     PaginatedStudentList,
     RecalculateRequest,
-    RiskHistoryItem,
     SHAPExplanationResponse,
     SHAPFeatureItem,
     StudentCodingStats,
-    UploadSummary,
 )
-from app.services.feature_engineering import compute_and_save_features
+from app.services.cohort_aggregates import METRIC_SUM_COLUMNS, CohortDeltas
+from app.services.columnar_snapshot import (
+    FORMATS as SNAPSHOT_FORMATS,
+    SNAPSHOT_TABLES,
+    ColumnarUnavailable,
+    import_student_metrics,
+    write_table,
+)
+from app.services.department_analytics import department_risk_trends, department_stats
+from app.services.ingestion import csv_columns, run_upload_job, spool_upload
+from app.services.jobs import create_job, submit_job
+from app.services.offload import run_blocking
+from app.services.response_cache import bump_data_generation
+from app.services.student_export import export_select, gzip_chunks, iter_csv
+from app.services.student_listing import parse_department, parse_risk_level
+from app.services.student_profiles import get_profile_document
 from app.services.realtime_prediction import (
     get_shap_explainer,
+    explain_metric,
     compute_all_risk_scores,
     compute_student_risk,
 )
@@ -89,30 +99,6 @@ def _safe(value, default=0.0):
         return default
 
 
-def _parse_department(raw: Optional[str]) -> Optional[Department]:
-    """Lenient department parser — avoids 422 on raw string values."""
-    if not raw:
-        return None
-    for dept in Department:
-        if dept.value.lower() == raw.lower() or dept.name.lower() == raw.lower():
-            return dept
-    # partial match
-    for dept in Department:
-        if raw.lower() in dept.value.lower():
-            return dept
-    return None  # unknown → ignore filter rather than 422
-
-
-def _parse_risk_level(raw: Optional[str]) -> Optional[RiskLevel]:
-    """Lenient risk level parser."""
-    if not raw:
-        return None
-    for rl in RiskLevel:
-        if rl.value.lower() == raw.lower() or rl.name.lower() == raw.lower():
-            return rl
-    return None
-
-
 def _student_to_list_item(s: Student) -> FacultyStudentListItem:
     m = s.metrics
     r = s.risk_score
@@ -134,81 +120,6 @@ def _student_to_list_item(s: Student) -> FacultyStudentListItem:
     )
 
 
-def _build_full_profile(student: Student, db: Session) -> FacultyStudentProfile:
-    m = student.metrics
-    r = student.risk_score
-
-    # Risk history — last 30 descending
-    history = (
-        db.query(RiskHistory)
-        .filter(RiskHistory.student_id == student.id)
-        .order_by(desc(RiskHistory.recorded_at))
-        .limit(30)
-        .all()
-    )
-    history_items = [
-        RiskHistoryItem(
-            risk_score=_safe(h.risk_score),
-            risk_level=h.risk_level.value,
-            recorded_at=h.recorded_at,
-        )
-        for h in history
-    ]
-
-    # SHAP factors from stored JSON
-    shap_factors: List[SHAPFeatureItem] = []
-    if r and r.shap_explanation and isinstance(r.shap_explanation, dict):
-        for f in r.shap_explanation.get("top_factors", []):
-            shap_factors.append(
-                SHAPFeatureItem(
-                    feature=f.get("feature", ""),
-                    impact=_safe(f.get("impact", 0.0)),
-                    direction=f.get("direction", "positive"),
-                )
-            )
-
-    # Interventions
-    interventions_items = [
-        InterventionItem(
-            id=i.id,
-            intervention_type=i.intervention_type.value,
-            status=i.status.value,
-            assigned_to=i.assigned_to,
-            notes=i.notes,
-            created_at=i.created_at,
-        )
-        for i in student.interventions
-    ]
-
-    return FacultyStudentProfile(
-        id=student.id,
-        name=student.name,
-        avatar=student.avatar or student.name[:2].upper(),
-        department=student.department.value if student.department else "",
-        course=student.course,
-        section=student.section.value if student.section else "",
-        advisor=student.advisor_id,
-        created_at=student.created_at,
-        # features
-        attendance_rate=_safe(m.attendance_rate if m else 0.0),
-        engagement_score=_safe(m.engagement_score if m else 0.0),
-        academic_performance_index=_safe(m.academic_performance_index if m else 0.0),
-        failure_ratio=_safe(m.failure_ratio if m else 0.0),
-        semester_performance_trend=_safe(m.semester_performance_trend if m else 0.0),
-        login_gap_days=int(_safe(m.login_gap_days if m else 3, 3)),
-        financial_risk_flag=bool(m.financial_risk_flag if m else False),
-        commute_risk_score=int(_safe(m.commute_risk_score if m else 1, 1)),
-        # risk
-        risk_score=_safe(r.risk_score if r else 0.0),
-        risk_level=(r.risk_level.value if r else RiskLevel.SAFE.value),
-        risk_trend=(r.risk_trend.value if r else RiskTrend.STABLE.value),
-        risk_value=(r.risk_value if r else "Stable"),
-        risk_history=history_items,
-        shap_factors=shap_factors,
-        interventions=interventions_items,
-    )
-
-
 # ─────────────────────────────────────────────────────────────────────────────
 # 1. OVERVIEW
 # ─────────────────────────────────────────────────────────────────────────────
@@ -279,8 +190,8 @@ def get_faculty_student_list(
 
     All filtering via SQL WHERE — no client-side filtering.
     """
-    dept_enum = _parse_department(department)
-    risk_enum = _parse_risk_level(risk_level)
+    dept_enum = parse_department(department)
+    risk_enum = parse_risk_level(risk_level)
 
     query = (
         db.query(Student)
@@ -347,28 +258,19 @@ def get_student_explanation(student_id: str, db: Session = Depends(get_db)):
             ))
 
     # If no stored SHAP, compute live
-    if not top_features and student.metrics:
-        live_shap = get_shap_explainer()
-        if live_shap:
-            try:
-                from app.services.feature_engineering import FeatureEngineer
-                X = FeatureEngineer.prepare_ml_features({
-                    "attendance_rate": _safe(student.metrics.attendance_rate),
-                    "engagement_score": _safe(student.metrics.engagement_score),
-                    "academic_performance_index": _safe(student.metrics.academic_performance_index),
-                    "login_gap_days": int(_safe(student.metrics.login_gap_days, 3)),
-                    "failure_ratio": _safe(student.metrics.failure_ratio),
-                    "financial_risk_flag": bool(student.metrics.financial_risk_flag),
-                    "commute_risk_score": int(_safe(student.metrics.commute_risk_score, 1)),
-                    "semester_performance_trend": _safe(student.metrics.semester_performance_trend),
-                })
-                factors = live_shap.explain(X, top_n=5)
-                top_features = [
-                    SHAPFeatureItem(feature=f.feature, impact=_safe(f.impact), direction=f.direction)
-                    for f in factors
-                ]
-            except Exception as exc:
-                logger.warning(f"Live SHAP fallback failed for {student_id}: {exc}")
+    if not top_features and student.metrics and get_shap_explainer():
+        try:
+            explanation = explain_metric(student.metrics, student_id)
+            top_features = [
+                SHAPFeatureItem(
+                    feature=f["feature"],
+                    impact=_safe(f["impact"]),
+                    direction=f["direction"],
+                )
+                for f in explanation["top_factors"]
+            ]
+        except Exception as exc:
+            logger.warning(f"Live SHAP fallback failed for {student_id}: {exc}")
 
     return SHAPExplanationResponse(
         student_id=student_id,
@@ -384,15 +286,14 @@ def get_student_profile(student_id: str, db: Session = Depends(get_db)):
     Full student profile: base info + features + current risk +
     risk history + SHAP explanation + interventions.
 
-    Every field is sourced from DB — no placeholders.
+    Every field is sourced from DB — no placeholders.  Served from the
+    stored profile document (one primary-key read), built on first view.
     """
-    student = (
-        db.query(Student).filter(Student.id == student_id).first()
-    )
-    if not student:
+    document = get_profile_document(db, student_id)
+    if document is None:
         raise HTTPException(status_code=404, detail=f"Student {student_id} not found")
 
-    return _build_full_profile(student, db)
+    return JSONResponse(document)
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -441,6 +342,13 @@ def create_student_manually(payload: CreateStudentRequest, db: Session = Depends
         db.add(metric)
         db.flush()
 
+        deltas = CohortDeltas()
+        deltas.students_added(payload.department)
+        deltas.metric_changed(payload.department, None, {
+            column: getattr(metric, column) for column in METRIC_SUM_COLUMNS
+        })
+        deltas.apply(db)
+
         # 3. ML inference (uses singleton model)
         try:
             compute_student_risk(payload.id, db, save_to_db=True)
@@ -448,8 +356,8 @@ def create_student_manually(payload: CreateStudentRequest, db: Session = Depends
             logger.warning(f"Risk inference failed for new student {payload.id}: {exc}")
 
         db.commit()
-        db.refresh(student)
-        return _build_full_profile(student, db)
+        bump_data_generation()
+        return JSONResponse(get_profile_document(db, payload.id), status_code=201)
 
     except HTTPException:
         raise
@@ -476,7 +384,7 @@ _OPTIONAL_COLUMNS = {
 }
 
 
-@router.post("/upload/{data_type}", response_model=UploadSummary)
+@router.post("/upload/{data_type}", response_model=JobAccepted, status_code=202)
 async def upload_csv(
     data_type: str,
     file: UploadFile = File(...),
@@ -485,9 +393,12 @@ async def upload_csv(
     """
     Bulk CSV upload for attendance, marks, or assignments.
 
-    Event chain (non-negotiable):
-        Validate → Persist raw rows → Feature recompute → ML inference →
+    The header is validated here; the file is then spooled to disk and the
+    event chain runs as a background job:
+        Persist raw rows → Feature recompute → ML inference →
         Risk persistence → History append → Intervention detection
+
+    Returns the job ID at once — poll GET /api/jobs/{job_id} for progress.
     """
     data_type = data_type.lower()
     if data_type not in _REQUIRED_COLUMNS:
@@ -498,121 +409,28 @@ async def upload_csv(
     if not file.filename.lower().endswith(".csv"):
         raise HTTPException(status_code=400, detail="Only CSV files are accepted")
 
-    # ── Parse CSV ─────────────────────────────────────────────────────────────
-    contents = await file.read()
-    try:
-        df = pd.read_csv(io.BytesIO(contents))
-        df.columns = [c.strip().lower().replace(" ", "_") for c in df.columns]
-    except Exception as exc:
-        raise HTTPException(status_code=400, detail=f"CSV parse error: {exc}")
+    return await run_blocking(_queue_upload, data_type, file, db)
 
+
+def _queue_upload(data_type: str, file: UploadFile, db: Session) -> JobAccepted:
+    """Header check, spool and job creation for upload_csv (runs on the upload pool)."""
     required = _REQUIRED_COLUMNS[data_type]
-    missing = required - set(df.columns)
+    try:
+        missing = required - csv_columns(file.file)
+    except (pd.errors.ParserError, pd.errors.EmptyDataError, UnicodeDecodeError) as exc:
+        raise HTTPException(status_code=400, detail=f"CSV parse error: {exc}")
     if missing:
         raise HTTPException(
             status_code=422,
-            detail=f"Missing required columns: {missing}. "
-                   f"Required: {required}",
+            detail=f"Missing required columns: {missing}. Required: {required}",
         )
 
-    rows_processed = 0
-    affected_ids: Set[str] = set()
-    errors: List[str] = []
+    path = spool_upload(file.file)
+    job = create_job(db, f"upload_{data_type}", {"data_type": data_type, "filename": file.filename})
+    submit_job(job.id, partial(run_upload_job, path=path, data_type=data_type, required=required))
 
-    # ── Validate student IDs & insert raw rows ─────────────────────────────
-    try:
-        for idx, row in df.iterrows():
-            student_id = str(row.get("student_id", "")).strip()
-            if not student_id:
-                errors.append(f"Row {idx}: missing student_id — skipped")
-                continue
-
-            student_exists = db.query(Student.id).filter(Student.id == student_id).scalar()
-            if not student_exists:
-                errors.append(f"Row {idx}: student '{student_id}' not in DB — skipped")
-                continue
-
-            try:
-                if data_type == "attendance":
-                    date_val = pd.to_datetime(row.get("date", datetime.utcnow()), errors="coerce")
-                    if pd.isnull(date_val):
-                        errors.append(f"Row {idx}: invalid date '{row.get('date')}' — skipped")
-                        continue
-                    db.add(StudentRawAttendance(
-                        student_id=student_id,
-                        date=date_val.to_pydatetime(),
-                        subject=str(row.get("subject", "General")),
-                        status=str(row.get("status", "Present")).strip(),
-                    ))
-
-                elif data_type == "marks":
-                    db.add(StudentRawMarks(
-                        student_id=student_id,
-                        subject=str(row.get("subject", "General")),
-                        exam_type=str(row.get("exam_type", "Internal")),
-                        marks_obtained=float(row.get("marks_obtained", 0)),
-                        max_marks=float(row.get("max_marks", 100)) or 100.0,
-                    ))
-
-                elif data_type == "assignments":
-                    raw_submitted = str(row.get("submitted", "false")).strip().lower()
-                    submitted = raw_submitted in ("true", "1", "yes", "y")
-                    raw_score = row.get("score", None)
-                    score = float(raw_score) if raw_score is not None and str(raw_score).strip() != "" else None
-                    db.add(StudentRawAssignments(
-                        student_id=student_id,
-                        subject=str(row.get("subject", "General")),
-                        assignment_name=str(row.get("assignment_name", "Assignment")),
-                        submitted=submitted,
-                        score=score,
-                        max_score=float(row.get("max_score", 10)) or 10.0,
-                    ))
-
-                affected_ids.add(student_id)
-                rows_processed += 1
-
-            except Exception as row_err:
-                errors.append(f"Row {idx}: {row_err}")
-
-        db.flush()  # all raw rows committed together
-
-    except Exception as exc:
-        db.rollback()
-        logger.error(f"Upload failed during raw insert: {traceback.format_exc()}")
-        raise HTTPException(status_code=500, detail=f"Bulk insert failed: {str(exc)}")
-
-    # ── Event chain: feature recompute → ML inference per affected student ──
-    recalcs = 0
-    for sid in affected_ids:
-        try:
-            compute_and_save_features(sid, db)
-            compute_student_risk(sid, db, save_to_db=True)
-            recalcs += 1
-        except Exception as exc:
-            errors.append(f"student {sid} recompute failed: {exc}")
-            logger.error(f"Recompute failed for {sid}: {traceback.format_exc()}")
-
-    try:
-        db.commit()
-    except Exception as exc:
-        db.rollback()
-        raise HTTPException(status_code=500, detail=f"Commit failed: {str(exc)}")
-
-    msg = (
-        f"Processed {rows_processed} rows for {len(affected_ids)} students; "
-        f"{recalcs} risk scores updated."
-    )
-    if errors:
-        msg += f" {len(errors)} row(s) skipped (see 'errors' field)."
-
-    logger.info(msg)
-    return UploadSummary(
-        rows_processed=rows_processed,
-        students_affected=len(affected_ids),
-        recalculations_triggered=recalcs,
-        errors=errors[:50],  # cap to avoid huge responses
-        message=msg,
-    )
+    logger.info(f"Queued {data_type} upload '{file.filename}' as job {job.id}")
+    return JobAccepted(job_id=job.id, status=job.status, status_url=f"/api/jobs/{job.id}")
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -642,6 +460,7 @@ def recalculate_risk(
                 )
             result = compute_student_risk(sid, db, save_to_db=True)
             db.commit()
+            bump_data_generation()
             return {
                 "message": f"Risk recalculated for student {sid}",
                 "student_id": sid,
@@ -672,71 +491,23 @@ def get_department_analytics(db: Session = Depends(get_db)):
     Per-department statistics including a 7-day daily average risk trend.
     All computed via SQL aggregations — no in-memory accumulation.
     """
-    dept_stats = (
-        db.query(
-            Student.department,
-            func.count(Student.id).label("total"),
-            func.avg(RiskScore.risk_score).label("avg_risk"),
-            func.avg(StudentMetric.attendance_rate).label("avg_att"),
-            func.count(
-                func.nullif(RiskScore.risk_level != RiskLevel.HIGH, True)
-            ).label("high_risk"),
-        )
-        .outerjoin(RiskScore, Student.id == RiskScore.student_id)
-        .outerjoin(StudentMetric, Student.id == StudentMetric.student_id)
-        .group_by(Student.department)
-        .all()
-    )
-
-    response: List[DepartmentAnalytics] = []
-
-    for dept, total, avg_risk, avg_att, _ in dept_stats:
-        # Accurate high_risk count via separate query (nullif trick unreliable)
-        high_risk_cnt = (
-            db.query(func.count(Student.id))
-            .join(RiskScore)
-            .filter(Student.department == dept, RiskScore.risk_level == RiskLevel.HIGH)
-            .scalar()
-            or 0
+    stats = department_stats(db)
+    trends = department_risk_trends(db)
+
+    return [
+        DepartmentAnalytics(
+            department=dept.value,
+            total_students=row["total"],
+            avg_risk_score=round(_safe(row["avg_risk"]), 1),
+            avg_attendance=round(_safe(row["avg_attendance"]), 1),
+            high_risk_count=row["high_risk"],
+            trend_7d=[
+                DepartmentTrendPoint(date=day, avg_risk=round(_safe(avg), 2))
+                for day, avg in trends.get(dept, [])
+            ],
         )
-
-        # 7-day daily trend from risk_history
-        seven_days_ago = datetime.utcnow() - timedelta(days=7)
-        daily_trend_rows = (
-            db.query(
-                func.date(RiskHistory.recorded_at).label("day"),
-                func.avg(RiskHistory.risk_score).label("avg"),
-            )
-            .join(Student, RiskHistory.student_id == Student.id)
-            .filter(
-                Student.department == dept,
-                RiskHistory.recorded_at >= seven_days_ago,
-            )
-            .group_by(func.date(RiskHistory.recorded_at))
-            .order_by(func.date(RiskHistory.recorded_at))
-            .all()
-        )
-
-        trend_7d = [
-            DepartmentTrendPoint(
-                date=str(row.day),
-                avg_risk=round(_safe(row.avg), 2),
-            )
-            for row in daily_trend_rows
-        ]
-
-        response.append(
-            DepartmentAnalytics(
-                department=dept.value if dept else "Unknown",
-                total_students=total or 0,
-                avg_risk_score=round(_safe(avg_risk), 1),
-                avg_attendance=round(_safe(avg_att), 1),
-                high_risk_count=high_risk_cnt,
-                trend_7d=trend_7d,
-            )
-        )
-
-    return response
+        for dept, row in stats.items()
+    ]
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -744,63 +515,120 @@ def get_department_analytics(db: Session = Depends(get_db)):
 # ─────────────────────────────────────────────────────────────────────────────
 
 @router.get("/export")
-def export_students_csv(db: Session = Depends(get_db)):
+def export_students_csv(
+    gzip: bool = Query(default=False, description="Send the CSV gzip-compressed (.csv.gz)"),
+):
     """
     Stream a CSV download of all students with their engineered features
-    and current risk score. Sourced entirely from DB.
+    and current risk score. Sourced entirely from DB, written out in
+    batches as rows are fetched on a session the stream owns.
     """
-    students = (
-        db.query(Student)
-        .outerjoin(StudentMetric, Student.id == StudentMetric.student_id)
-        .outerjoin(RiskScore, Student.id == RiskScore.student_id)
-        .order_by(desc(RiskScore.risk_score))
-        .all()
+    try:
+        # Executed here so query errors still surface as a 500
+        rows = stream_rows(export_select())
+    except Exception as exc:
+        logger.error(f"Export query failed: {exc}")
+        raise HTTPException(status_code=500, detail=f"Export failed: {str(exc)}")
+
+    filename = f"student_risk_export_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.csv"
+    if gzip:
+        return StreamingResponse(
+            gzip_chunks(iter_csv(rows)),
+            media_type="application/gzip",
+            headers={"Content-Disposition": f"attachment; filename={filename}.gz"},
+        )
+    return StreamingResponse(
+        iter_csv(rows),
+        media_type="text/csv",
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
     )
 
-    output = io.StringIO()
-    writer = csv.DictWriter(output, fieldnames=[
-        "student_id", "name", "department", "course", "section",
-        "advisor",
-        "attendance_rate", "engagement_score", "academic_performance_index",
-        "failure_ratio", "semester_performance_trend",
-        "login_gap_days", "financial_risk_flag", "commute_risk_score",
-        "risk_score", "risk_level", "risk_trend", "risk_value",
-        "last_updated",
-    ])
-    writer.writeheader()
 
-    for s in students:
-        m = s.metrics
-        r = s.risk_score
-        writer.writerow({
-            "student_id": s.id,
-            "name": s.name,
-            "department": s.department.value if s.department else "",
-            "course": s.course,
-            "section": s.section.value if s.section else "",
-            "advisor": s.advisor_id or "",
-            "attendance_rate": _safe(m.attendance_rate if m else 0),
-            "engagement_score": _safe(m.engagement_score if m else 0),
-            "academic_performance_index": _safe(m.academic_performance_index if m else 0),
-            "failure_ratio": _safe(m.failure_ratio if m else 0),
-            "semester_performance_trend": _safe(m.semester_performance_trend if m else 0),
-            "login_gap_days": int(_safe(m.login_gap_days if m else 0)),
-            "financial_risk_flag": bool(m.financial_risk_flag if m else False),
-            "commute_risk_score": int(_safe(m.commute_risk_score if m else 1)),
-            "risk_score": _safe(r.risk_score if r else 0),
-            "risk_level": r.risk_level.value if r else "",
-            "risk_trend": r.risk_trend.value if r else "",
-            "risk_value": r.risk_value if r else "",
-            "last_updated": r.updated_at.isoformat() if r and r.updated_at else "",
-        })
+SNAPSHOT_READ_CHUNK = 1 << 20  # bytes per streamed chunk of a snapshot file
 
-    output.seek(0)
-    filename = f"student_risk_export_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.csv"
+
+def _stream_file(fileobj) -> Iterator[bytes]:
+    """Stream *fileobj* from the start in fixed-size chunks, then close it."""
+    try:
+        fileobj.seek(0)
+        while chunk := fileobj.read(SNAPSHOT_READ_CHUNK):
+            yield chunk
+    finally:
+        fileobj.close()
+
+
+@router.get("/export/snapshot")
+def export_snapshot_table(
+    table: str = Query(default="students", description=f"One of: {', '.join(SNAPSHOT_TABLES)}"),
+    format: str = Query(default="parquet", pattern="^(parquet|arrow)$"),
+    db: Session = Depends(get_db),
+):
+    """
+    Columnar download of one snapshot table (students, student_metrics,
+    risk_scores or risk_history) as Parquet or Arrow IPC.
+
+    The file is written to a temporary file in record batches, then
+    streamed.  Returns 503 if pyarrow is not installed.
+    """
+    spooled = tempfile.TemporaryFile(dir=get_settings().job_spool_dir or None)
+    try:
+        rows = write_table(db, table, spooled, format)
+    except ValueError as exc:
+        spooled.close()
+        raise HTTPException(status_code=400, detail=str(exc))
+    except ColumnarUnavailable as exc:
+        spooled.close()
+        raise HTTPException(status_code=503, detail=str(exc))
+    except Exception as exc:
+        spooled.close()
+        logger.error(f"Snapshot export of {table} failed: {traceback.format_exc()}")
+        raise HTTPException(status_code=500, detail=f"Export failed: {str(exc)}")
+
+    extension, media_type = SNAPSHOT_FORMATS[format]
+    filename = f"{table}_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}{extension}"
+    logger.info(f"Snapshot export: {rows} {table} rows as {format}")
     return StreamingResponse(
-        iter([output.getvalue()]),
-        media_type="text/csv",
+        _stream_file(spooled),
+        media_type=media_type,
         headers={"Content-Disposition": f"attachment; filename={filename}"},
     )
+
+
+@router.post("/import/metrics")
+def import_metrics_snapshot(
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(default=None, pattern="^(parquet|arrow)$",
+                                  description="Defaults to the file extension"),
+    db: Session = Depends(get_db),
+):
+    """
+    Seed student_metrics from a Parquet or Arrow IPC file with the columns
+    of the student_metrics snapshot.  Rows for unknown students are skipped.
+    """
+    if format is None:
+        name = (file.filename or "").lower()
+        format = next((fmt for fmt, (ext, _) in SNAPSHOT_FORMATS.items() if name.endswith(ext)), None)
+        if format is None:
+            raise HTTPException(status_code=400, detail="Pass ?format=parquet|arrow or upload a .parquet/.arrow file")
+
+    try:
+        summary = import_student_metrics(db, file.file, format)
+        db.commit()
+        bump_data_generation()
+    except ValueError as exc:
+        db.rollback()
+        raise HTTPException(status_code=422, detail=str(exc))
+    except ColumnarUnavailable as exc:
+        raise HTTPException(status_code=503, detail=str(exc))
+    except Exception as exc:
+        db.rollback()
+        logger.error(f"Metrics import failed: {traceback.format_exc()}")
+        raise HTTPException(status_code=400, detail=f"Could not read {format} file: {str(exc)}")
+
+    logger.info(f"Metrics import from '{file.filename}': {summary}")
+    return summary
+
+
 @router.get("/reports/coding", response_model=List[StudentCodingStats])
 def get_coding_reports(
     department: Optional[str] = Query(None),
@@ -813,7 +641,7 @@ def get_coding_reports(
 
     if department and department != "All Departments":
         # Robust department filtering
-        dept_enum = _parse_department(department)
+        dept_enum = parse_department(department)
         if dept_enum:
             query = query.filter(Student.department == dept_enum)
 
@@ -0,0 +1,26 @@
+"""
+Background job status routes.
+"""
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.models import Job
+from app.schemas import JobStatusResponse
+
+router = APIRouter()
+
+
+@router.get("/jobs/{job_id}", response_model=JobStatusResponse)
+def get_job(job_id: str, db: Session = Depends(get_db)):
+    """
+    Status of a background job (e.g. a faculty upload).
+
+    Reports progress counters, per-stage timings (ingest, features,
+    inference, persistence), errors and, once finished, the result.
+    """
+    job = db.query(Job).filter(Job.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job
@@ -4,17 +4,25 @@ Provides KPIs, GPA trends, course deep-dive, risk scoring,
 early-warning alerts, and AI insight summaries.
 """
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import func
 from typing import List, Dict, Any, Optional
 import math
 
 from app.database import get_db
 from app.models import (
-    Student, StudentMetric, Department, RiskScore, RiskLevel,
-    StudentRawMarks, StudentRawAttendance, StudentRawAssignments, Intervention
+    Student, StudentMetric, Department,
+    StudentRawMarks, StudentRawAttendance, StudentRawAssignments, InterventionStatus
 )
+from app.services.cohort_aggregates import average, get_cohort_aggregate
+from app.services.department_analytics import department_stats
+from app.services.intervention_listing import (
+    MAX_PAGE_SIZE as INTERVENTION_MAX_PAGE_SIZE,
+    count_by_status,
+    list_interventions,
+    parse_statuses,
+)
+from app.services.performance_stats import cohort_performance_stats
 from app.utils.performance_utils import (
     calculate_performance_risk_score,
     compute_rolling_average,
@@ -44,13 +52,25 @@ DEPT_MAPPING = {
 }
 
 
+def _department_filter(department: Optional[str]) -> Optional[Department]:
+    if department and department != "All Departments":
+        return DEPT_MAPPING.get(department)
+    return None
+
+
 def _filter_students(db: Session, department: Optional[str] = None) -> List[Student]:
     query = db.query(Student).join(StudentMetric)
-    if department and department != "All Departments" and department in DEPT_MAPPING:
-        query = query.filter(Student.department == DEPT_MAPPING[department])
+    dept = _department_filter(department)
+    if dept:
+        query = query.filter(Student.department == dept)
     return query.all()
 
 
+def _cohort_stats(db: Session, department: Optional[str] = None) -> Dict[str, Any]:
+    """Single-query cohort aggregates (see ``cohort_performance_stats``)."""
+    return cohort_performance_stats(db, _department_filter(department))
+
+
 def _gpa_from_index(api: float) -> float:
     """Convert 0-100 academic_performance_index to a 4.0 GPA scale."""
     return round(min(4.0, api / 25.0), 2)
@@ -73,23 +93,22 @@ def get_performance_kpis(department: str = None, db: Session = Depends(get_db)):
     At-a-glance academic KPIs for the performance page overview.
     Returns GPA stats, pass rate, failed subjects, assignment rate, credits.
     """
-    students = _filter_students(db, department)
-    if not students:
+    stats = _cohort_stats(db, department)
+    if not stats["total"]:
         return _empty_kpis()
 
-    total = len(students)
-    gpas = [_gpa_from_index(s.metrics.academic_performance_index) for s in students]
-    avg_gpa = round(sum(gpas) / total, 2)
+    total = stats["total"]
+    avg_gpa = round(stats["avg_gpa"], 2)
 
     # Course pass rate — derive from failure_ratio
-    avg_failure_ratio = sum(s.metrics.failure_ratio for s in students) / total
+    avg_failure_ratio = stats["avg_failure_ratio"]
     pass_rate = round((1 - avg_failure_ratio) * 100, 1)
 
     # Failed subjects — use failure_ratio * 8 courses as proxy
     avg_failed_subjects = round(avg_failure_ratio * 8, 1)
 
     # Assignment completion — derive from engagement_score
-    avg_engagement = sum(s.metrics.engagement_score for s in students) / total
+    avg_engagement = stats["avg_engagement"]
     assignment_rate = round(min(100, avg_engagement * 0.9 + 10), 1)
 
     # Credits: assume 8 credits per course, 8 courses, 4 semesters = 256 total
@@ -97,13 +116,13 @@ def get_performance_kpis(department: str = None, db: Session = Depends(get_db)):
     credits_required = 160
     credits_earned = round(credits_required * (pass_rate / 100), 0)
 
-    avg_trend = sum(s.metrics.semester_performance_trend for s in students) / total
+    avg_trend = stats["avg_trend"]
     prev_gpa = round(max(0, avg_gpa - (avg_trend / 100 * 0.3)), 2)
     gpa_trend = "improving" if avg_trend > 2 else ("declining" if avg_trend < -2 else "stable")
 
     # Risk distribution
-    high_risk = sum(1 for s in students if s.risk_score and s.risk_score.risk_level == RiskLevel.HIGH)
-    moderate_risk = sum(1 for s in students if s.risk_score and s.risk_score.risk_level == RiskLevel.MODERATE)
+    high_risk = stats["high_risk"]
+    moderate_risk = stats["moderate_risk"]
 
     return {
         "total_students": total,
@@ -146,12 +165,12 @@ def get_performance_trends(department: str = None, db: Session = Depends(get_db)
     Returns term-wise GPA data, 3-term rolling average, and drop annotations.
     Data is derived from academic_performance_index and semester_performance_trend.
     """
-    students = _filter_students(db, department)
-    if not students:
+    stats = _cohort_stats(db, department)
+    if not stats["total"]:
         return {"terms": [], "gpa_series": [], "rolling_avg": [], "drops": []}
 
-    avg_api = sum(s.metrics.academic_performance_index for s in students) / len(students)
-    avg_trend = sum(s.metrics.semester_performance_trend for s in students) / len(students)
+    avg_api = stats["avg_performance"]
+    avg_trend = stats["avg_trend"]
     base_gpa = _gpa_from_index(avg_api)
 
     labels = ["Sem 1", "Sem 2", "Sem 3", "Sem 4", "Sem 5", "Sem 6"]
@@ -247,14 +266,13 @@ def get_course_detail(department: str = None, db: Session = Depends(get_db)):
     """
     Returns per-course aggregate metrics for radar charts, box plots, and tables.
     """
-    students = _filter_students(db, department)
-    if not students:
+    stats = _cohort_stats(db, department)
+    if not stats["total"]:
         return {"courses": []}
 
-    total = len(students)
-    avg_api = sum(s.metrics.academic_performance_index for s in students) / total
-    avg_attend = sum(s.metrics.attendance_rate for s in students) / total
-    avg_engage = sum(s.metrics.engagement_score for s in students) / total
+    avg_api = stats["avg_performance"]
+    avg_attend = stats["avg_attendance"]
+    avg_engage = stats["avg_engagement"]
 
     courses = [
         {"id": "CS101", "name": "Mathematics",          "credits": 4, "is_core": True},
@@ -324,16 +342,16 @@ def get_comparative_analytics(department: str = None, db: Session = Depends(get_
     """
     Student cohort vs class average and vs the historical at-risk group.
     """
-    students = _filter_students(db, department)
-    if not students:
+    stats = _cohort_stats(db, department)
+    if not stats["total"]:
         return {}
 
-    total = len(students)
-    avg_gpa = _gpa_from_index(sum(s.metrics.academic_performance_index for s in students) / total)
+    total = stats["total"]
+    avg_gpa = _gpa_from_index(stats["avg_performance"])
 
     # High-risk sub-group
-    at_risk = [s for s in students if s.risk_score and s.risk_score.risk_level in (RiskLevel.HIGH, RiskLevel.MODERATE)]
-    at_risk_gpa = _gpa_from_index(sum(s.metrics.academic_performance_index for s in at_risk) / len(at_risk)) if at_risk else avg_gpa
+    at_risk = stats["at_risk"]
+    at_risk_gpa = _gpa_from_index(stats["at_risk_avg_performance"]) if at_risk else avg_gpa
 
     # Rank percentile derived from GPA
     percentile = round(100 - ((avg_gpa / 4.0) * 100) + 20, 1)
@@ -344,9 +362,9 @@ def get_comparative_analytics(department: str = None, db: Session = Depends(get_
         "at_risk_avg_gpa":   at_risk_gpa,
         "gpa_delta_vs_class": round(avg_gpa - avg_gpa, 2),   # cohort vs itself
         "rank_percentile":   percentile,
-        "at_risk_count":     len(at_risk),
+        "at_risk_count":     at_risk,
         "total_students":    total,
-        "pattern_similarity_score": round(len(at_risk) / max(1, total) * 100, 1),
+        "pattern_similarity_score": round(at_risk / max(1, total) * 100, 1),
     }
 
 
@@ -420,27 +438,27 @@ def get_ai_insight(department: str = None, db: Session = Depends(get_db)):
     """
     Returns an AI-generated (rule-based) insight summary for the cohort.
     """
-    students = _filter_students(db, department)
-    if not students:
+    stats = _cohort_stats(db, department)
+    if not stats["total"]:
         return {"insight": "No data available for the selected filters."}
 
-    total = len(students)
-    avg_api = sum(s.metrics.academic_performance_index for s in students) / total
-    avg_failure = sum(s.metrics.failure_ratio for s in students) / total
-    avg_trend = sum(s.metrics.semester_performance_trend for s in students) / total
+    total = stats["total"]
+    avg_api = stats["avg_performance"]
+    avg_failure = stats["avg_failure_ratio"]
+    avg_trend = stats["avg_trend"]
 
     base_gpa = _gpa_from_index(avg_api)
     trend_step = avg_trend / 100 * 0.25
     gpa_series = [round(min(4.0, max(0, base_gpa - trend_step * (4 - i))), 2) for i in range(5)]
 
     failed_total = round(avg_failure * 8 * 2)   # approx over 2 semesters
-    assign_rate = round(min(100, sum(s.metrics.engagement_score for s in students) / total * 0.9 + 10), 1)
+    assign_rate = round(min(100, stats["avg_engagement"] * 0.9 + 10), 1)
     gpa_decline = max(0, (gpa_series[0] - gpa_series[-1]) / max(0.01, gpa_series[0]))
 
     risk_result = calculate_performance_risk_score(
         gpa_decline=gpa_decline,
         failed_subjects_ratio=avg_failure,
-        attendance_rate=sum(s.metrics.attendance_rate for s in students) / total,
+        attendance_rate=stats["avg_attendance"],
         assignment_completion=assign_rate,
     )
 
@@ -472,24 +490,38 @@ def get_ai_insight(department: str = None, db: Session = Depends(get_db)):
 # ---------------------------------------------------------------------------
 
 @router.get("/interventions")
-def get_interventions(department: str = None, db: Session = Depends(get_db)):
+def get_interventions(
+    department: str = None,
+    status: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(default=100, ge=1, le=INTERVENTION_MAX_PAGE_SIZE),
+    db: Session = Depends(get_db),
+):
     """
-    Returns intervention records for at-risk students in the cohort.
+    Returns one page of intervention records for the cohort; ``total`` and
+    the status counts cover every page.
     """
-    students = _filter_students(db, department)
-    student_ids = [s.id for s in students]
-
-    interventions = db.query(Intervention).filter(
-        Intervention.student_id.in_(student_ids)
-    ).order_by(Intervention.created_at.desc()).limit(100).all()
+    statuses = parse_statuses(status)
+    dept = _department_filter(department)
+    try:
+        rows, next_cursor = list_interventions(
+            db,
+            statuses=statuses,
+            department=dept,
+            cursor=cursor,
+            limit=limit,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    counts = count_by_status(db, statuses=statuses, department=dept)
 
     result = []
-    for iv in interventions:
-        student = next((s for s in students if s.id == iv.student_id), None)
+    for row in rows:
+        iv = row.Intervention
         result.append({
             "id":               iv.id,
             "student_id":       iv.student_id,
-            "student_name":     student.name if student else "Unknown",
+            "student_name":     row.student_name or "Unknown",
             "type":             iv.intervention_type.value if iv.intervention_type else "",
             "status":           iv.status.value if iv.status else "",
             "assigned_to":      iv.assigned_to,
@@ -500,10 +532,11 @@ def get_interventions(department: str = None, db: Session = Depends(get_db)):
 
     return {
         "interventions": result,
-        "total": len(result),
-        "pending": sum(1 for i in result if i["status"] == "pending"),
-        "in_progress": sum(1 for i in result if i["status"] == "in_progress"),
-        "completed": sum(1 for i in result if i["status"] == "completed"),
+        "total": sum(counts.values()),
+        "pending": counts[InterventionStatus.PENDING],
+        "in_progress": counts[InterventionStatus.IN_PROGRESS],
+        "completed": counts[InterventionStatus.COMPLETED],
+        "next_cursor": next_cursor,
     }
 
 
@@ -516,18 +549,14 @@ def get_performance_aggregate(department: str = None, db: Session = Depends(get_
     """
     Aggregated performance metrics (kept for backwards compatibility).
     """
-    query = db.query(Student).join(StudentMetric)
-    if department and department != "All Departments" and department in DEPT_MAPPING:
-        query = query.filter(Student.department == DEPT_MAPPING[department])
-    students = query.all()
-
-    if not students:
+    stats = _cohort_stats(db, department)
+    if not stats["total"]:
         return {"total_students": 0, "neo_pat_score": 0, "coding_stats": {}, "mcq_stats": {}, "projects_stats": {}, "solved_questions": {}}
 
-    total = len(students)
-    avg_performance = sum(s.metrics.academic_performance_index for s in students) / total
-    avg_attendance  = sum(s.metrics.attendance_rate for s in students) / total
-    avg_engagement  = sum(s.metrics.engagement_score for s in students) / total
+    total = stats["total"]
+    avg_performance = stats["avg_performance"]
+    avg_attendance  = stats["avg_attendance"]
+    avg_engagement  = stats["avg_engagement"]
 
     neo_pat_score = int((avg_performance / 100) * 500)
     coding_attended = int(avg_performance * 0.4)
@@ -579,26 +608,22 @@ def get_performance_aggregate(department: str = None, db: Session = Depends(get_
 
 @router.get("/institutional-avg")
 def get_institutional_average(db: Session = Depends(get_db)):
-    avg_risk = db.query(func.avg(RiskScore.risk_score)).scalar() or 0
-    total = db.query(func.count(RiskScore.id)).scalar() or 1
-    high_count = db.query(func.count(RiskScore.id)).filter(RiskScore.risk_level == RiskLevel.HIGH).scalar() or 0
-    high_pct = round(high_count / total * 100, 1)
+    overall = get_cohort_aggregate(db)
+    avg_risk = average(overall, "risk_score_sum")
+    high_pct = round(overall.high_count / (overall.scored_count or 1) * 100, 1)
     trend = round(float(avg_risk) - 50, 1)
     return {"avg_risk_percentage": round(float(avg_risk), 2), "trend": trend, "target": 10.0, "high_risk_pct": high_pct}
 
 
 @router.get("/department-breakdown")
 def get_department_performance(db: Session = Depends(get_db)):
-    results = []
-    for dept in Department:
-        students_in_dept = db.query(Student).join(StudentMetric).filter(Student.department == dept).all()
-        if not students_in_dept:
-            continue
-        total = len(students_in_dept)
-        results.append({
-            "department":     dept.value,
-            "total_students": total,
-            "avg_performance": round(sum(s.metrics.academic_performance_index for s in students_in_dept) / total, 2),
-            "avg_attendance":  round(sum(s.metrics.attendance_rate for s in students_in_dept) / total, 2),
-        })
-    return results
+    return [
+        {
+            "department":      dept.value,
+            "total_students":  row["with_metrics"],
+            "avg_performance": round(row["avg_performance"], 2),
+            "avg_attendance":  round(row["avg_attendance"], 2),
+        }
+        for dept, row in department_stats(db).items()
+        if row["with_metrics"]
+    ]
@@ -9,9 +9,11 @@ from loguru import logger
 from app.database import get_db
 from app.models import ModelVersion
 from app.schemas import PredictionRequest, RiskExplanation
-from app.services.risk_model import RiskModel
-from app.services.shap_explainer import SHAPExplainer
-from app.services.feature_engineering import FeatureEngineer
+from app.services.realtime_prediction import (
+    explain_features,
+    get_registered_model,
+    metrics_to_features,
+)
 
 router = APIRouter()
 
@@ -40,31 +42,24 @@ def predict_risk(
         raise HTTPException(status_code=500, detail="No active model found")
     
     try:
-        # Load model
-        risk_model = RiskModel()
-        risk_model.load(active_model.model_path)
+        # Process-wide model for this version (unpickled once, then reused)
+        risk_model, shap_explainer = get_registered_model(active_model)
         
         # Prepare features
-        feature_engineer = FeatureEngineer()
-        features_df = feature_engineer.prepare_ml_features(
-            request.metrics.model_dump()
-        )
+        features_df = metrics_to_features(request.metrics.model_dump(), risk_model)
         
         # Get prediction
         risk_prediction = risk_model.predict_risk_score(features_df)
         
-        # Get SHAP explanation
-        try:
-            shap_explainer = SHAPExplainer(risk_model.calibrated_model)
-            shap_factors = shap_explainer.explain(features_df, top_n=5)
-        except Exception as e:
-            logger.warning(f"SHAP explanation failed: {e}")
-            shap_factors = []
+        # Get SHAP explanation (cached per model version + feature row)
+        explanation = explain_features(
+            features_df, request.student_id, active_model.id, shap_explainer
+        )
         
         return RiskExplanation(
             risk_score=risk_prediction['risk_score'],
             risk_level=risk_prediction['risk_level'],
-            top_factors=shap_factors
+            top_factors=explanation["top_factors"]
         )
         
     except Exception as e:
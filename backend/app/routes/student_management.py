@@ -11,6 +11,7 @@ from datetime import datetime
 
 from app.database import get_db
 from app.models import Student, Intervention, InterventionType, InterventionStatus
+from app.services.student_profiles import refresh_profiles
 
 router = APIRouter()
 
@@ -41,6 +42,7 @@ def assign_advisor(request: AssignAdvisorRequest, db: Session = Depends(get_db))
                 student.advisor_id = request.advisor_name
                 updated_count += 1
         
+        refresh_profiles(db, request.student_ids)
         db.commit()
         
         return {
@@ -83,6 +85,7 @@ def schedule_counseling(request: ScheduleCounselingRequest, db: Session = Depend
             db.add(intervention)
             created_ids.append(student.id)
 
+        refresh_profiles(db, created_ids)
         db.commit()
 
         return {
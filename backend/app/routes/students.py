@@ -1,68 +1,173 @@
 """
 Students API routes for retrieving student data and risk information.
 """
-from fastapi import APIRouter, Depends, HTTPException
+import json
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from typing import List
-from app.database import get_db
+from typing import Iterable, Iterator, List, Optional
+from app.database import get_db, stream_rows
 from app.models import Student, StudentMetric, RiskScore, Intervention, InterventionType, InterventionStatus
-from app.schemas import StudentResponse, RiskExplanation
+from app.schemas import FacultyStudentListItem, StudentPage, StudentResponse, RiskExplanation
+from app.services.student_listing import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    list_students_page,
+    parse_department,
+    parse_risk_level,
+    parse_section,
+)
+from app.services.student_profiles import refresh_profiles
 from loguru import logger
 from datetime import datetime
 
 router = APIRouter()
 
+STUDENT_LIST_BATCH = 1000  # rows fetched per round-trip while streaming
+
+
+def _student_list_select():
+    """
+    One joined, column-only select for the dashboard list — students with
+    both a risk score and metrics, no ORM entity hydration.
+    """
+    return (
+        select(
+            Student.id,
+            Student.name,
+            Student.avatar,
+            Student.course,
+            Student.section,
+            Student.updated_at,
+            RiskScore.risk_level,
+            RiskScore.risk_trend,
+            RiskScore.risk_score,
+            RiskScore.shap_explanation,
+            StudentMetric.attendance_rate,
+            StudentMetric.engagement_score,
+        )
+        .join(RiskScore, RiskScore.student_id == Student.id)
+        .join(StudentMetric, StudentMetric.student_id == Student.id)
+        .order_by(Student.id)
+        .execution_options(yield_per=STUDENT_LIST_BATCH)
+    )
+
+
+def _student_list_item(row) -> dict:
+    """Format one joined row for the frontend dashboard."""
+    return {
+        "id": str(row.id),
+        "name": row.name or f"Student {row.id}",
+        "avatar": row.avatar or "",
+        "course": row.course,
+        "department": map_department(row.course),
+        "section": row.section.value if row.section else "A",
+        "riskStatus": row.risk_level.value if hasattr(row.risk_level, 'value') else str(row.risk_level),
+        "riskTrend": row.risk_trend.value if hasattr(row.risk_trend, 'value') else "stable",
+        "riskValue": f"{row.risk_score:.1f}%",
+        "attendance": int(row.attendance_rate or 0),  # Already 0-100 scale
+        "engagementScore": int(row.engagement_score or 0),  # Already 0-100 scale
+        "lastInteraction": row.updated_at.strftime("%Y-%m-%d") if row.updated_at else "2024-01-01",
+        "primaryRiskDriver": get_primary_driver(row.shap_explanation),
+    }
+
+
+def _stream_student_list(rows: Iterable) -> Iterator[str]:
+    """Encode the student list as a JSON array, one batch of rows at a time."""
+    count = 0
+    batch: List[str] = []
+    yield "["
+    for row in rows:
+        batch.append(json.dumps(_student_list_item(row)))
+        count += 1
+        if len(batch) == STUDENT_LIST_BATCH:
+            yield ("," if count > len(batch) else "") + ",".join(batch)
+            batch = []
+    if batch:
+        yield ("," if count > len(batch) else "") + ",".join(batch)
+    yield "]"
+    logger.info(f"Retrieved {count} students with risk scores")
+
+
 @router.get("/students")
-def get_all_students(db: Session = Depends(get_db)):
+def get_all_students():
     """
     Get all students with their risk scores.
-    Returns a list of students formatted for the frontend dashboard.
+    Returns a list of students formatted for the frontend dashboard,
+    streamed from a single joined query on a session the stream owns.
     """
     try:
-        # Query all students with their risk scores
-        students = db.query(Student).all()
-        
-        result = []
-        for student in students:
-            # Get risk score
-            risk_score = db.query(RiskScore).filter(RiskScore.student_id == student.id).first()
-            
-            # Get metrics for additional data
-            metrics = db.query(StudentMetric).filter(StudentMetric.student_id == student.id).first()
-            
-            if risk_score and metrics:
-                # Format for frontend
-                student_data = {
-                    "id": str(student.id),
-                    "name": student.name if hasattr(student, 'name') and student.name else f"Student {student.id}",
-                    "avatar": student.avatar if hasattr(student, 'avatar') and student.avatar else "",
-                    "course": student.course,
-                    "department": map_department(student.course),
-                    "section": student.section.value if hasattr(student, 'section') else "A",
-                    "riskStatus": risk_score.risk_level.value if hasattr(risk_score.risk_level, 'value') else str(risk_score.risk_level),
-                    "riskTrend": risk_score.risk_trend.value if hasattr(risk_score, 'risk_trend') and hasattr(risk_score.risk_trend, 'value') else "stable",
-                    "riskValue": f"{risk_score.risk_score:.1f}%",
-                    "attendance": int(getattr(metrics, 'attendance_rate', 85)),  # Already 0-100 scale
-                    "engagementScore": int(getattr(metrics, 'engagement_score', 75)),  # Already 0-100 scale
-                    "lastInteraction": student.updated_at.strftime("%Y-%m-%d") if student.updated_at else "2024-01-01",
-                    "primaryRiskDriver": get_primary_driver(risk_score.shap_explanation)
-                }
-                result.append(student_data)
-        
-        logger.info(f"Retrieved {len(result)} students with risk scores")
-        return result
-        
+        # Executed here so query errors still surface as a 500
+        rows = stream_rows(_student_list_select())
     except Exception as e:
         logger.error(f"Error fetching students: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+    return StreamingResponse(_stream_student_list(rows), media_type="application/json")
+
 @router.get("/students/all")
-def get_all_students_endpoint(db: Session = Depends(get_db)):
+def get_all_students_endpoint():
     """
     Alias endpoint for get_all_students to match frontend expectations.
     Frontend components call /api/students/all
     """
-    return get_all_students(db)
+    return get_all_students()
+
+
+@router.get("/students/page", response_model=StudentPage)
+def get_students_page(
+    department: Optional[str] = Query(default=None),
+    section: Optional[str] = Query(default=None),
+    risk_level: Optional[str] = Query(default=None),
+    advisor: Optional[str] = Query(default=None),
+    order: str = Query(default="desc", pattern="^(asc|desc)$", description="Sort by risk score"),
+    cursor: Optional[str] = Query(default=None, description="next_cursor of the previous page"),
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db),
+):
+    """
+    Keyset-paginated student listing ordered by (risk_score, id).
+
+    Filters: department, section, risk level and advisor.  Each page
+    seeks from the cursor, so deep pages cost the same as the first.
+    """
+    try:
+        rows, next_cursor = list_students_page(
+            db,
+            department=parse_department(department),
+            section=parse_section(section),
+            risk_level=parse_risk_level(risk_level),
+            advisor=advisor,
+            cursor=cursor,
+            limit=limit,
+            descending=order == "desc",
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    items = [
+        FacultyStudentListItem(
+            id=row.id,
+            name=row.name,
+            avatar=row.avatar or row.name[:2].upper(),
+            department=row.department.value,
+            course=row.course,
+            section=row.section.value,
+            advisor=row.advisor_id,
+            risk_score=row.risk_score,
+            risk_level=row.risk_level.value,
+            risk_trend=row.risk_trend.value,
+            risk_value=row.risk_value,
+            attendance_rate=row.attendance_rate or 0.0,
+            engagement_score=row.engagement_score or 0.0,
+            academic_performance_index=row.academic_performance_index or 0.0,
+            last_updated=row.updated_at,
+        )
+        for row in rows
+    ]
+    return StudentPage(items=items, next_cursor=next_cursor, limit=limit)
 
 
 @router.get("/students/{student_id}")
@@ -241,6 +346,7 @@ def assign_advisor(request: AssignAdvisorRequest, db: Session = Depends(get_db))
                 student.advisor_id = request.advisor_name
                 updated_count += 1
         
+        refresh_profiles(db, request.student_ids)
         db.commit()
         
         return {
@@ -284,6 +390,7 @@ def schedule_counseling(request: ScheduleCounselingRequest, db: Session = Depend
             db.add(intervention)
             created_ids.append(student.id)
 
+        refresh_profiles(db, created_ids)
         db.commit()
 
         return {
@@ -320,6 +427,7 @@ def add_case_note(student_id: str, request: CaseNoteRequest, db: Session = Depen
     )
     db.add(intervention)
     student.updated_at = datetime.utcnow()
+    refresh_profiles(db, [student_id])
     db.commit()
     return {"success": True, "message": "Case note added.", "intervention_id": intervention.id}
 
@@ -349,6 +457,7 @@ def escalate_case(student_id: str, db: Session = Depends(get_db)):
         notes="ESCALATED — Requires immediate review by Dean of Students.",
     )
     db.add(intervention)
+    refresh_profiles(db, [student_id])
     db.commit()
     return {"success": True, "message": "Case escalated to Dean of Students.", "intervention_id": intervention.id}
 
@@ -367,6 +476,7 @@ def schedule_single_counseling(student_id: str, request: CounselingRequest, db:
         notes=f"{request.type} counseling — Scheduled {request.date} at {request.time}",
     )
     db.add(intervention)
+    refresh_profiles(db, [student_id])
     db.commit()
     return {"success": True, "message": f"Counseling scheduled for {request.date} at {request.time}.", "intervention_id": intervention.id}
 
@@ -386,6 +496,7 @@ def assign_mentor(student_id: str, request: MentorRequest, db: Session = Depends
         notes=f"Peer mentor {request.mentor_name} assigned.",
     )
     db.add(intervention)
+    refresh_profiles(db, [student_id])
     db.commit()
     return {"success": True, "message": f"Mentor {request.mentor_name} assigned.", "intervention_id": intervention.id}
 
@@ -405,6 +516,7 @@ def email_student(student_id: str, request: EmailRequest, db: Session = Depends(
         outcome_label="Email sent",
     )
     db.add(intervention)
+    refresh_profiles(db, [student_id])
     db.commit()
     return {"success": True, "message": "Email sent to student."}
 
@@ -472,6 +584,7 @@ def create_intervention(request: CreateInterventionRequest, db: Session = Depend
         notes=request.notes,
     )
     db.add(intervention)
+    refresh_profiles(db, [request.student_id])
     db.commit()
     return {
         "success": True,
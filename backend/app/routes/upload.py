@@ -4,13 +4,15 @@ Supports attendance, marks, and assignments ingestion.
 
 After any successful upload the endpoint automatically re-runs feature
 engineering for affected students so risk scores update without delay.
+Parsing, inserts and the feature refresh run on the bounded upload pool
+(``run_blocking``), not on the event loop.
 """
 
 from __future__ import annotations
 
 import io
 from datetime import datetime
-from typing import List
+from typing import Iterator, List, Set
 
 import pandas as pd
 from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
@@ -19,12 +21,14 @@ from sqlalchemy.orm import Session
 
 from app.database import get_db
 from app.models import (
-    Student,
     StudentRawAttendance,
     StudentRawAssignments,
     StudentRawMarks,
 )
-from app.services.feature_engineering import compute_and_save_features
+from app.services.feature_engineering import update_features_incremental
+from app.services.ingestion import iter_csv_chunks, known_student_ids, normalise_columns
+from app.services.offload import run_blocking
+from app.services.response_cache import bump_data_generation
 
 router = APIRouter(prefix="/api/faculty/upload", tags=["Upload"])
 
@@ -40,26 +44,30 @@ ALLOWED_MIME = {
     "application/octet-stream",  # some browsers send this for .xlsx
 }
 
-MAX_FILE_SIZE = 20 * 1024 * 1024  # 20 MB
+MAX_FILE_SIZE = 20 * 1024 * 1024  # 20 MB (Excel only; CSV is streamed)
 
 
-def _read_file(file: UploadFile) -> pd.DataFrame:
-    """Read a CSV or Excel upload into a DataFrame."""
-    raw = file.file.read()
-    if len(raw) > MAX_FILE_SIZE:
-        raise HTTPException(status_code=413, detail="File too large (max 20 MB).")
+def _iter_frames(file: UploadFile) -> Iterator[pd.DataFrame]:
+    """
+    Yield a CSV or Excel upload as DataFrames with normalised columns.
 
+    CSV is parsed from the spooled upload in chunks of
+    ``settings.upload_chunk_rows`` rows.  Excel cannot be parsed
+    incrementally, so it is read whole and capped at MAX_FILE_SIZE.
+    """
     filename = (file.filename or "").lower()
 
     try:
         if filename.endswith(".xlsx") or filename.endswith(".xls"):
-            return pd.read_excel(io.BytesIO(raw))
+            file.file.seek(0, io.SEEK_END)
+            if file.file.tell() > MAX_FILE_SIZE:
+                raise HTTPException(status_code=413, detail="File too large (max 20 MB).")
+            file.file.seek(0)
+            yield normalise_columns(pd.read_excel(file.file))
         else:
-            # Try UTF-8 first, fall back to latin-1
-            try:
-                return pd.read_csv(io.BytesIO(raw), encoding="utf-8")
-            except UnicodeDecodeError:
-                return pd.read_csv(io.BytesIO(raw), encoding="latin-1")
+            yield from iter_csv_chunks(file.file)
+    except HTTPException:
+        raise
     except Exception as exc:
         raise HTTPException(
             status_code=400,
@@ -67,32 +75,97 @@ def _read_file(file: UploadFile) -> pd.DataFrame:
         )
 
 
-def _normalise_columns(df: pd.DataFrame) -> pd.DataFrame:
-    """Lowercase and strip column names."""
-    df.columns = [str(c).strip().lower().replace(" ", "_") for c in df.columns]
-    return df
+def _require_columns(df: pd.DataFrame, required: List[str]) -> None:
+    missing = set(required) - set(df.columns)
+    if missing:
+        raise HTTPException(
+            status_code=422,
+            detail=(
+                f"Missing required columns: {', '.join(missing)}. "
+                f"Found: {', '.join(df.columns)}. "
+                f"Required: {', '.join(required)}"
+            ),
+        )
 
 
-def _validate_students(student_ids: List[str], db: Session) -> dict:
+def _validate_students(student_ids: List[str], db: Session) -> Set[str]:
     """Return a set of known student IDs."""
-    existing = db.query(Student.id).filter(Student.id.in_(student_ids)).all()
-    return {row.id for row in existing}
+    return known_student_ids(student_ids, db)
 
 
-def _recompute_features(student_ids: List[str], db: Session) -> None:
-    """Re-run feature engineering for affected students."""
-    for sid in student_ids:
-        try:
-            compute_and_save_features(sid, db)
-        except Exception as exc:
-            logger.warning(f"Feature re-compute skipped for {sid}: {exc}")
-    db.commit()
+def _commit_chunk(data_type: str, new_rows: List[dict], committed: int, db: Session) -> None:
+    """
+    Fold a chunk's new raw rows into the affected students' features and
+    commit both together, as ``ingest_csv_stream`` does.
+
+    The running aggregates only ever receive deltas, so raw rows committed
+    without theirs would never be counted.  On failure the whole chunk is
+    rolled back and the upload stops; earlier chunks stay committed.
+    """
+    try:
+        update_features_incremental(db, **{data_type: pd.DataFrame(new_rows)})
+        db.commit()
+    except Exception as exc:
+        db.rollback()
+        logger.error(f"{data_type.capitalize()} upload failed after {committed} rows were committed: {exc}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Upload failed after {committed} rows were imported: {exc}",
+        )
+    bump_data_generation()
 
 
 # ─────────────────────────────────────────────────────────────────────────────
 # Endpoints
 # ─────────────────────────────────────────────────────────────────────────────
 
+def _ingest_attendance(file: UploadFile, db: Session) -> dict:
+    """Blocking body of upload_attendance (runs on the upload pool)."""
+    inserted = 0
+    skipped = 0
+    for chunk_no, df in enumerate(_iter_frames(file), start=1):
+        if chunk_no == 1:
+            _require_columns(df, ["student_id", "date", "status"])
+
+        df["date"] = pd.to_datetime(df["date"], errors="coerce")
+        df = df.dropna(subset=["date"])
+
+        student_ids = df["student_id"].astype(str).unique().tolist()
+        valid_ids = _validate_students(student_ids, db)
+
+        new_rows: List[dict] = []
+        for _, row in df.iterrows():
+            sid = str(row["student_id"])
+            if sid not in valid_ids:
+                skipped += 1
+                continue
+
+            subject = str(row.get("subject") or row.get("course_id") or "General")
+            status_val = str(row["status"]).strip().capitalize()
+            if status_val not in ("Present", "Absent", "Late", "Excused", "P", "A"):
+                status_val = "Present" if status_val.upper().startswith("P") else "Absent"
+
+            db.add(StudentRawAttendance(
+                student_id=sid,
+                date=row["date"],
+                subject=subject[:200],
+                status=status_val[:20],
+            ))
+            new_rows.append({"student_id": sid, "status": status_val[:20]})
+            inserted += 1
+
+        # Commit each chunk (rows + feature deltas) so transaction size stays bounded
+        _commit_chunk("attendance", new_rows, inserted - len(new_rows), db)
+        logger.info(f"Attendance upload chunk {chunk_no}: {inserted} rows inserted, {skipped} skipped so far.")
+
+    logger.info(f"Attendance upload: {inserted} rows inserted, {skipped} skipped (unknown student).")
+    return {
+        "message": f"Attendance uploaded successfully. {inserted} records imported.",
+        "inserted": inserted,
+        "skipped_unknown_students": skipped,
+    }
+
+
 @router.post("/attendance")
 async def upload_attendance(
     file: UploadFile = File(...),
@@ -106,56 +179,56 @@ async def upload_attendance(
     Optional columns:
         subject / course_id
     """
-    df = _normalise_columns(_read_file(file))
+    return await run_blocking(_ingest_attendance, file, db)
 
-    required = {"student_id", "date", "status"}
-    missing = required - set(df.columns)
-    if missing:
-        raise HTTPException(
-            status_code=422,
-            detail=(
-                f"Missing required columns: {', '.join(missing)}. "
-                f"Found: {', '.join(df.columns)}. "
-                "Required: student_id, date, status"
-            ),
-        )
-
-    df["date"] = pd.to_datetime(df["date"], errors="coerce")
-    df = df.dropna(subset=["date"])
-
-    student_ids = df["student_id"].astype(str).unique().tolist()
-    valid_ids = _validate_students(student_ids, db)
 
+def _ingest_marks(file: UploadFile, db: Session) -> dict:
+    """Blocking body of upload_marks (runs on the upload pool)."""
     inserted = 0
     skipped = 0
-    for _, row in df.iterrows():
-        sid = str(row["student_id"])
-        if sid not in valid_ids:
-            skipped += 1
-            continue
-
-        subject = str(row.get("subject") or row.get("course_id") or "General")
-        status_val = str(row["status"]).strip().capitalize()
-        if status_val not in ("Present", "Absent", "Late", "Excused", "P", "A"):
-            status_val = "Present" if status_val.upper().startswith("P") else "Absent"
-
-        db.add(StudentRawAttendance(
-            student_id=sid,
-            date=row["date"],
-            subject=subject[:200],
-            status=status_val[:20],
-        ))
-        inserted += 1
-
-    db.commit()
-
-    # Recompute features for affected students
-    affected_ids = [s for s in student_ids if s in valid_ids]
-    _recompute_features(affected_ids, db)
+    for chunk_no, df in enumerate(_iter_frames(file), start=1):
+        if chunk_no == 1:
+            _require_columns(df, ["student_id", "marks_obtained", "max_marks"])
 
-    logger.info(f"Attendance upload: {inserted} rows inserted, {skipped} skipped (unknown student).")
+        student_ids = df["student_id"].astype(str).unique().tolist()
+        valid_ids = _validate_students(student_ids, db)
+
+        new_rows: List[dict] = []
+        for _, row in df.iterrows():
+            sid = str(row["student_id"])
+            if sid not in valid_ids:
+                skipped += 1
+                continue
+
+            try:
+                obtained = float(row["marks_obtained"])
+                maximum = float(row["max_marks"])
+            except (ValueError, TypeError):
+                continue
+
+            if maximum <= 0:
+                continue
+
+            subject = str(row.get("subject") or row.get("course_id") or "General")
+            exam_type = str(row.get("exam_type") or "Internal")
+
+            db.add(StudentRawMarks(
+                student_id=sid,
+                subject=subject[:200],
+                exam_type=exam_type[:100],
+                marks_obtained=obtained,
+                max_marks=maximum,
+            ))
+            new_rows.append({"student_id": sid, "marks_obtained": obtained, "max_marks": maximum})
+            inserted += 1
+
+        # Commit each chunk (rows + feature deltas) so transaction size stays bounded
+        _commit_chunk("marks", new_rows, inserted - len(new_rows), db)
+        logger.info(f"Marks upload chunk {chunk_no}: {inserted} rows inserted, {skipped} skipped so far.")
+
+    logger.info(f"Marks upload: {inserted} rows inserted, {skipped} skipped.")
     return {
-        "message": f"Attendance uploaded successfully. {inserted} records imported.",
+        "message": f"Marks uploaded successfully. {inserted} records imported.",
         "inserted": inserted,
         "skipped_unknown_students": skipped,
     }
@@ -174,60 +247,71 @@ async def upload_marks(
     Optional columns:
         subject / course_id | exam_type
     """
-    df = _normalise_columns(_read_file(file))
+    return await run_blocking(_ingest_marks, file, db)
 
-    required = {"student_id", "marks_obtained", "max_marks"}
-    missing = required - set(df.columns)
-    if missing:
-        raise HTTPException(
-            status_code=422,
-            detail=(
-                f"Missing required columns: {', '.join(missing)}. "
-                f"Found: {', '.join(df.columns)}. "
-                "Required: student_id, marks_obtained, max_marks"
-            ),
-        )
-
-    student_ids = df["student_id"].astype(str).unique().tolist()
-    valid_ids = _validate_students(student_ids, db)
 
+def _ingest_assignments(file: UploadFile, db: Session) -> dict:
+    """Blocking body of upload_assignments (runs on the upload pool)."""
     inserted = 0
     skipped = 0
-    for _, row in df.iterrows():
-        sid = str(row["student_id"])
-        if sid not in valid_ids:
-            skipped += 1
-            continue
-
-        try:
-            obtained = float(row["marks_obtained"])
-            maximum = float(row["max_marks"])
-        except (ValueError, TypeError):
-            continue
-
-        if maximum <= 0:
-            continue
-
-        subject = str(row.get("subject") or row.get("course_id") or "General")
-        exam_type = str(row.get("exam_type") or "Internal")
-
-        db.add(StudentRawMarks(
-            student_id=sid,
-            subject=subject[:200],
-            exam_type=exam_type[:100],
-            marks_obtained=obtained,
-            max_marks=maximum,
-        ))
-        inserted += 1
-
-    db.commit()
-
-    affected_ids = [s for s in student_ids if s in valid_ids]
-    _recompute_features(affected_ids, db)
+    for chunk_no, df in enumerate(_iter_frames(file), start=1):
+        if chunk_no == 1:
+            _require_columns(df, ["student_id", "submitted"])
+
+        student_ids = df["student_id"].astype(str).unique().tolist()
+        valid_ids = _validate_students(student_ids, db)
+
+        new_rows: List[dict] = []
+        for _, row in df.iterrows():
+            sid = str(row["student_id"])
+            if sid not in valid_ids:
+                skipped += 1
+                continue
+
+            # Parse submitted column — accept True/False/1/0/Yes/No
+            sub_raw = str(row["submitted"]).strip().lower()
+            submitted = sub_raw in ("true", "1", "yes", "submitted", "y")
+
+            subject = str(row.get("subject") or row.get("course_id") or "General")
+            assignment_name = str(
+                row.get("assignment_name") or row.get("assignment_id") or "Assignment"
+            )
+
+            score: float | None = None
+            try:
+                score = float(row.get("score")) if row.get("score") is not None else None
+            except (ValueError, TypeError):
+                score = None
 
-    logger.info(f"Marks upload: {inserted} rows inserted, {skipped} skipped.")
+            max_score = 10.0
+            try:
+                max_score = float(row.get("max_score") or 10.0)
+            except (ValueError, TypeError):
+                pass
+
+            db.add(StudentRawAssignments(
+                student_id=sid,
+                subject=subject[:200],
+                assignment_name=assignment_name[:300],
+                submitted=submitted,
+                score=score,
+                max_score=max_score if max_score > 0 else 10.0,
+            ))
+            new_rows.append({
+                "student_id": sid,
+                "submitted": submitted,
+                "score": score,
+                "max_score": max_score if max_score > 0 else 10.0,
+            })
+            inserted += 1
+
+        # Commit each chunk (rows + feature deltas) so transaction size stays bounded
+        _commit_chunk("assignments", new_rows, inserted - len(new_rows), db)
+        logger.info(f"Assignments upload chunk {chunk_no}: {inserted} rows inserted, {skipped} skipped so far.")
+
+    logger.info(f"Assignments upload: {inserted} rows inserted, {skipped} skipped.")
     return {
-        "message": f"Marks uploaded successfully. {inserted} records imported.",
+        "message": f"Assignments uploaded successfully. {inserted} records imported.",
         "inserted": inserted,
         "skipped_unknown_students": skipped,
     }
@@ -246,70 +330,4 @@ async def upload_assignments(
     Optional columns:
         subject / course_id | assignment_name / assignment_id | score | max_score
     """
-    df = _normalise_columns(_read_file(file))
-
-    required = {"student_id", "submitted"}
-    missing = required - set(df.columns)
-    if missing:
-        raise HTTPException(
-            status_code=422,
-            detail=(
-                f"Missing required columns: {', '.join(missing)}. "
-                f"Found: {', '.join(df.columns)}. "
-                "Required: student_id, submitted"
-            ),
-        )
-
-    student_ids = df["student_id"].astype(str).unique().tolist()
-    valid_ids = _validate_students(student_ids, db)
-
-    inserted = 0
-    skipped = 0
-    for _, row in df.iterrows():
-        sid = str(row["student_id"])
-        if sid not in valid_ids:
-            skipped += 1
-            continue
-
-        # Parse submitted column — accept True/False/1/0/Yes/No
-        sub_raw = str(row["submitted"]).strip().lower()
-        submitted = sub_raw in ("true", "1", "yes", "submitted", "y")
-
-        subject = str(row.get("subject") or row.get("course_id") or "General")
-        assignment_name = str(
-            row.get("assignment_name") or row.get("assignment_id") or "Assignment"
-        )
-
-        score: float | None = None
-        try:
-            score = float(row.get("score")) if row.get("score") is not None else None
-        except (ValueError, TypeError):
-            score = None
-
-        max_score = 10.0
-        try:
-            max_score = float(row.get("max_score") or 10.0)
-        except (ValueError, TypeError):
-            pass
-
-        db.add(StudentRawAssignments(
-            student_id=sid,
-            subject=subject[:200],
-            assignment_name=assignment_name[:300],
-            submitted=submitted,
-            score=score,
-            max_score=max_score if max_score > 0 else 10.0,
-        ))
-        inserted += 1
-
-    db.commit()
-
-    affected_ids = [s for s in student_ids if s in valid_ids]
-    _recompute_features(affected_ids, db)
-
-    logger.info(f"Assignments upload: {inserted} rows inserted, {skipped} skipped.")
-    return {
-        "message": f"Assignments uploaded successfully. {inserted} records imported.",
-        "inserted": inserted,
-        "skipped_unknown_students": skipped,
-    }
+    return await run_blocking(_ingest_assignments, file, db)
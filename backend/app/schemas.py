@@ -3,9 +3,9 @@ Pydantic schemas for request/response validation.
 """
 
 from pydantic import BaseModel, Field, ConfigDict
-from typing import Optional, List
+from typing import Any, Dict, Optional, List
 from datetime import datetime
-from app.models import Department, Section, RiskLevel, RiskTrend, InterventionType, InterventionStatus, Role
+from app.models import Department, Section, RiskLevel, RiskTrend, InterventionType, InterventionStatus, JobStatus, Role
 
 
 # Base Schemas
@@ -464,11 +464,19 @@ class FacultyStudentListItem(BaseModel):
     attendance_rate: float
     engagement_score: float
     academic_performance_index: float
+    advisor: Optional[str] = None
     last_updated: Optional[datetime] = None
 
     model_config = ConfigDict(from_attributes=True)
 
 
+class StudentPage(BaseModel):
+    """Keyset-paginated student listing; pass next_cursor back as cursor."""
+    items: List[FacultyStudentListItem]
+    next_cursor: Optional[str] = None
+    limit: int
+
+
 class PaginatedStudentList(BaseModel):
     """Paginated faculty student directory response."""
     items: List[FacultyStudentListItem]
@@ -567,9 +575,35 @@ class UploadSummary(BaseModel):
     students_affected: int
     recalculations_triggered: int
     errors: List[str] = []
+    rejected_rows: List[int] = []  # indexes of skipped upload rows
     message: str
 
 
+class JobAccepted(BaseModel):
+    """Response when work is queued as a background job."""
+    job_id: str
+    status: JobStatus
+    status_url: str
+
+
+class JobStatusResponse(BaseModel):
+    """Progress, per-stage timings and outcome of a background job."""
+    id: str
+    job_type: str
+    status: JobStatus
+    params: Dict[str, Any] = {}
+    progress: Dict[str, Any] = {}
+    stage_timings: Dict[str, float] = {}  # seconds: ingest, features, inference, persistence
+    errors: List[str] = []
+    error: Optional[str] = None
+    result: Optional[Dict[str, Any]] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
 class RecalculateRequest(BaseModel):
     """Optional body for risk recalculation endpoint."""
     student_id: Optional[str] = None
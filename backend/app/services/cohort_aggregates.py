@@ -0,0 +1,265 @@
+"""
+Materialised cohort aggregates for the analytics dashboards.
+
+One ``cohort_aggregates`` row per department plus an "all" row holds the
+student count, StudentMetric sums, RiskScore level counts and a 10-point
+risk histogram.  Writers describe what changed with a ``CohortDeltas``
+accumulator — feature refresh (``_refresh_metrics``) and risk persistence
+(``_save_risk_result`` / ``_save_risk_results``) do so — and ``apply``
+folds it in with one additive UPDATE per touched scope.  Bulk imports
+and the seed / load scripts that write rows directly call
+``rebuild_cohort_aggregates`` instead, and the API rebuilds on every
+startup, so drift from any other direct write lasts until the next boot.
+
+Deltas are diffs against the old values, so writers that update existing
+rows call ``lock_cohort_aggregates`` and read those values with a locking
+read (``with_for_update``); two jobs rescoring the same students then
+queue instead of both subtracting the same old snapshot.
+"""
+
+from __future__ import annotations
+
+from collections import Counter, defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, Mapping, Optional
+
+from sqlalchemy import and_, case, func, select, update
+from sqlalchemy.orm import Session
+
+from app.database import bulk_upsert
+from app.models import CohortAggregate, Department, RiskLevel, RiskScore, Student, StudentMetric
+
+ALL_SCOPE = "all"
+HISTOGRAM_BUCKETS = 10  # [0,10) ... [90,100); a score of exactly 100 is not bucketed
+
+LEVEL_COLUMNS = {
+    RiskLevel.HIGH: "high_count",
+    RiskLevel.MODERATE: "moderate_count",
+    RiskLevel.STABLE: "stable_count",
+    RiskLevel.SAFE: "safe_count",
+}
+
+# StudentMetric column → running sum column
+METRIC_SUM_COLUMNS = {
+    "attendance_rate": "attendance_sum",
+    "engagement_score": "engagement_sum",
+    "academic_performance_index": "performance_sum",
+    "failure_ratio": "failure_ratio_sum",
+    "semester_performance_trend": "trend_sum",
+}
+
+BUCKET_COLUMNS = [f"risk_bucket_{i}" for i in range(HISTOGRAM_BUCKETS)]
+
+COUNTER_COLUMNS = [
+    "student_count",
+    "metrics_count", *METRIC_SUM_COLUMNS.values(),
+    "scored_count", "risk_score_sum", *LEVEL_COLUMNS.values(), *BUCKET_COLUMNS,
+]
+
+
+def _scope(department: Any) -> str:
+    return department.value if isinstance(department, Department) else str(department)
+
+
+def risk_bucket_column(score: Optional[float]) -> Optional[str]:
+    """Histogram column for *score*, or None if it falls outside [0, 100)."""
+    if score is None or not 0 <= score < 100:
+        return None
+    return BUCKET_COLUMNS[int(score // 10)]
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Incremental maintenance
+# ─────────────────────────────────────────────────────────────────────────────
+
+def lock_cohort_aggregates(db: Session) -> None:
+    """
+    Lock the "all" aggregate row until the transaction ends (no-op where
+    the backend has no row locks, e.g. SQLite).
+
+    Every ``apply`` updates that row anyway, so delta writers already
+    serialise on it at apply time; taking it before the old values are
+    read extends the same lock over the read → diff → apply window.
+    """
+    db.execute(
+        select(CohortAggregate.id).where(CohortAggregate.scope == ALL_SCOPE).with_for_update()
+    )
+
+
+class CohortDeltas:
+    """Accumulates aggregate changes per department until ``apply``."""
+
+    def __init__(self) -> None:
+        self._deltas: Dict[str, Counter] = defaultdict(Counter)
+
+    def __bool__(self) -> bool:
+        return any(self._deltas.values())
+
+    def students_added(self, department: Any, count: int = 1) -> None:
+        self._deltas[_scope(department)]["student_count"] += count
+
+    def metric_changed(
+        self,
+        department: Any,
+        old: Optional[Mapping[str, Any]],
+        new: Mapping[str, Any],
+    ) -> None:
+        """A StudentMetric row went from *old* (None if inserted) to *new*."""
+        delta = self._deltas[_scope(department)]
+        if old is None:
+            delta["metrics_count"] += 1
+        for column, sum_column in METRIC_SUM_COLUMNS.items():
+            delta[sum_column] += float(new[column] or 0.0)
+            if old is not None:
+                delta[sum_column] -= float(old[column] or 0.0)
+
+    def risk_changed(
+        self,
+        department: Any,
+        old_score: Optional[float],
+        old_level: Optional[RiskLevel],
+        new_score: float,
+        new_level: RiskLevel,
+    ) -> None:
+        """A RiskScore row went from (old_score, old_level) — None if inserted — to new."""
+        delta = self._deltas[_scope(department)]
+        if old_score is None:
+            delta["scored_count"] += 1
+        else:
+            delta["risk_score_sum"] -= old_score
+            delta[LEVEL_COLUMNS[old_level]] -= 1
+            old_bucket = risk_bucket_column(old_score)
+            if old_bucket:
+                delta[old_bucket] -= 1
+
+        delta["risk_score_sum"] += new_score
+        delta[LEVEL_COLUMNS[new_level]] += 1
+        new_bucket = risk_bucket_column(new_score)
+        if new_bucket:
+            delta[new_bucket] += 1
+
+    def apply(self, db: Session) -> None:
+        """
+        Add the accumulated deltas to each touched department row and to
+        the "all" row (not committed).  A missing row is created from the
+        delta, i.e. treated as all zeros.
+        """
+        total: Counter = Counter()
+        by_scope: Dict[str, Counter] = {}
+        for scope, delta in self._deltas.items():
+            delta = Counter({k: v for k, v in delta.items() if v})
+            if delta:
+                by_scope[scope] = delta
+                total.update(delta)
+        if total:
+            by_scope[ALL_SCOPE] = total
+
+        now = datetime.utcnow()
+        for scope, delta in by_scope.items():
+            values = {
+                column: getattr(CohortAggregate, column) + value
+                for column, value in delta.items()
+            }
+            result = db.execute(
+                update(CohortAggregate)
+                .where(CohortAggregate.scope == scope)
+                .values(**values, updated_at=now)
+            )
+            if result.rowcount == 0:
+                db.add(CohortAggregate(scope=scope, **{**_zero_row(), **delta}))
+        db.flush()
+        self._deltas.clear()
+
+
+def _zero_row() -> Dict[str, Any]:
+    return {column: 0 for column in COUNTER_COLUMNS}
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Full rebuild
+# ─────────────────────────────────────────────────────────────────────────────
+
+def rebuild_cohort_aggregates(db: Session) -> int:
+    """
+    Recompute every scope from the source tables with three grouped
+    queries and upsert the rows (not committed).  Returns the row count.
+    """
+    rows: Dict[str, Dict[str, Any]] = {dept.value: _zero_row() for dept in Department}
+
+    for department, count in (
+        db.query(Student.department, func.count(Student.id)).group_by(Student.department)
+    ):
+        rows[_scope(department)]["student_count"] = count
+
+    metric_sums = [func.coalesce(func.sum(getattr(StudentMetric, c)), 0.0) for c in METRIC_SUM_COLUMNS]
+    for department, count, *sums in (
+        db.query(Student.department, func.count(StudentMetric.id), *metric_sums)
+        .join(StudentMetric, StudentMetric.student_id == Student.id)
+        .group_by(Student.department)
+    ):
+        row = rows[_scope(department)]
+        row["metrics_count"] = count
+        row.update(zip(METRIC_SUM_COLUMNS.values(), (float(s) for s in sums)))
+
+    score = RiskScore.risk_score
+    level_counts = [
+        func.sum(case((RiskScore.risk_level == level, 1), else_=0)) for level in LEVEL_COLUMNS
+    ]
+    bucket_counts = [
+        func.sum(case((and_(score >= i * 10, score < (i + 1) * 10), 1), else_=0))
+        for i in range(HISTOGRAM_BUCKETS)
+    ]
+    for department, count, score_sum, *counts in (
+        db.query(
+            Student.department, func.count(RiskScore.id), func.coalesce(func.sum(score), 0.0),
+            *level_counts, *bucket_counts,
+        )
+        .join(RiskScore, RiskScore.student_id == Student.id)
+        .group_by(Student.department)
+    ):
+        row = rows[_scope(department)]
+        row["scored_count"] = count
+        row["risk_score_sum"] = float(score_sum)
+        row.update(zip([*LEVEL_COLUMNS.values(), *BUCKET_COLUMNS], (int(c or 0) for c in counts)))
+
+    total = Counter()
+    for row in rows.values():
+        total.update(row)
+    rows[ALL_SCOPE] = {column: total[column] for column in COUNTER_COLUMNS}
+
+    now = datetime.utcnow()
+    bulk_upsert(
+        db, CohortAggregate,
+        [{"scope": scope, **row, "updated_at": now} for scope, row in rows.items()],
+        ["scope"],
+    )
+    return len(rows)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Reads
+# ─────────────────────────────────────────────────────────────────────────────
+
+def get_cohort_aggregates(db: Session) -> Dict[str, CohortAggregate]:
+    """Every aggregate row keyed by scope (one query, at most 8 rows)."""
+    return {row.scope: row for row in db.query(CohortAggregate).all()}
+
+
+def get_cohort_aggregate(db: Session, scope: str = ALL_SCOPE) -> CohortAggregate:
+    """The row for *scope*; an unsaved all-zero row if it does not exist yet."""
+    row = db.query(CohortAggregate).filter(CohortAggregate.scope == scope).first()
+    return row or CohortAggregate(scope=scope, **_zero_row())
+
+
+def average(row: CohortAggregate, sum_column: str) -> float:
+    """Mean behind a sum column: metric sums over metrics_count, risk over scored_count."""
+    count = row.scored_count if sum_column == "risk_score_sum" else row.metrics_count
+    return getattr(row, sum_column) / count if count else 0.0
+
+
+def level_distribution(row: CohortAggregate) -> Dict[str, int]:
+    return {level.value: getattr(row, column) for level, column in LEVEL_COLUMNS.items()}
+
+
+def histogram(row: CohortAggregate) -> List[int]:
+    return [getattr(row, column) for column in BUCKET_COLUMNS]
@@ -0,0 +1,227 @@
+"""
+Columnar (Parquet / Arrow IPC) snapshots of the risk data.
+
+``write_table`` streams one of the snapshot tables — students,
+student_metrics, risk_scores, risk_history — from a ``yield_per`` select
+into a Parquet or Arrow IPC file one record batch at a time;
+``export_snapshot`` writes all of them into a directory.
+``import_student_metrics`` reads the student_metrics file back (or any
+file with the same columns) and upserts it batch by batch.
+
+pyarrow is an optional dependency: it is imported on first use and
+``ColumnarUnavailable`` is raised when it is not installed.
+"""
+
+from __future__ import annotations
+
+import enum
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, List, Tuple, Union
+
+from sqlalchemy import JSON, Boolean, DateTime, Enum as SQLEnum, Float, Integer, select
+from sqlalchemy.orm import Session
+
+from app.database import bulk_upsert
+from app.models import RiskHistory, RiskScore, Student, StudentMetric
+from app.services.cohort_aggregates import rebuild_cohort_aggregates
+from app.services.student_profiles import invalidate_profiles
+
+SNAPSHOT_BATCH = 10_000  # rows per record batch
+
+SNAPSHOT_TABLES = {
+    "students": Student,
+    "student_metrics": StudentMetric,
+    "risk_scores": RiskScore,
+    "risk_history": RiskHistory,
+}
+
+FORMATS = {
+    "parquet": (".parquet", "application/vnd.apache.parquet"),
+    "arrow": (".arrow", "application/vnd.apache.arrow.file"),
+}
+
+# Columns an imported student_metrics file must carry
+METRIC_IMPORT_COLUMNS = [
+    "student_id",
+    "attendance_rate", "engagement_score", "academic_performance_index",
+    "login_gap_days", "failure_ratio", "financial_risk_flag",
+    "commute_risk_score", "semester_performance_trend",
+]
+METRIC_OPTIONAL_COLUMNS = ["last_interaction"]
+
+Sink = Union[str, Path, BinaryIO]
+
+
+class ColumnarUnavailable(RuntimeError):
+    """pyarrow is not installed."""
+
+
+def _pyarrow() -> Tuple[Any, Any]:
+    try:
+        import pyarrow as pa
+        import pyarrow.ipc  # noqa: F401 — registers pa.ipc
+        import pyarrow.parquet as pq
+    except ImportError as exc:
+        raise ColumnarUnavailable("Columnar export requires pyarrow (pip install pyarrow)") from exc
+    return pa, pq
+
+
+def _check_format(fmt: str) -> None:
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format '{fmt}'. Expected one of: {', '.join(FORMATS)}")
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Export
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _arrow_type(pa: Any, column_type: Any) -> Any:
+    # Enum subclasses String, so it must be checked first
+    if isinstance(column_type, (SQLEnum, JSON)):
+        return pa.string()
+    if isinstance(column_type, Boolean):
+        return pa.bool_()
+    if isinstance(column_type, Integer):
+        return pa.int64()
+    if isinstance(column_type, Float):
+        return pa.float64()
+    if isinstance(column_type, DateTime):
+        return pa.timestamp("us")
+    return pa.string()
+
+
+def _arrow_value(value: Any) -> Any:
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return value
+
+
+def table_schema(table_name: str) -> Any:
+    """Arrow schema of a snapshot table (same column names as the DB table)."""
+    pa, _ = _pyarrow()
+    columns = SNAPSHOT_TABLES[table_name].__table__.columns
+    return pa.schema([pa.field(c.name, _arrow_type(pa, c.type), nullable=c.nullable) for c in columns])
+
+
+def _record_batches(db: Session, table_name: str, schema: Any) -> Iterator[Any]:
+    pa, _ = _pyarrow()
+    table = SNAPSHOT_TABLES[table_name].__table__
+    stmt = (
+        select(*table.columns)
+        .order_by(*table.primary_key.columns)
+        .execution_options(yield_per=SNAPSHOT_BATCH)
+    )
+    for partition in db.execute(stmt).partitions():
+        arrays = [
+            pa.array([_arrow_value(row[i]) for row in partition], type=field.type)
+            for i, field in enumerate(schema)
+        ]
+        yield pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def write_table(db: Session, table_name: str, sink: Sink, fmt: str = "parquet") -> int:
+    """
+    Write snapshot table *table_name* to *sink* as *fmt*.
+
+    Returns:
+        Rows written
+
+    Raises:
+        ValueError: unknown table or format
+        ColumnarUnavailable: pyarrow is not installed
+    """
+    if table_name not in SNAPSHOT_TABLES:
+        raise ValueError(f"Unknown table '{table_name}'. Expected one of: {', '.join(SNAPSHOT_TABLES)}")
+    _check_format(fmt)
+    pa, pq = _pyarrow()
+    schema = table_schema(table_name)
+
+    if fmt == "parquet":
+        writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    else:
+        writer = pa.ipc.new_file(sink, schema)
+
+    rows = 0
+    with writer:
+        for batch in _record_batches(db, table_name, schema):
+            writer.write_batch(batch)
+            rows += batch.num_rows
+    return rows
+
+
+def export_snapshot(db: Session, directory: Union[str, Path], fmt: str = "parquet") -> Dict[str, int]:
+    """Write every snapshot table into *directory*; returns rows written per table."""
+    _check_format(fmt)
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    extension = FORMATS[fmt][0]
+    return {
+        name: write_table(db, name, directory / f"{name}{extension}", fmt)
+        for name in SNAPSHOT_TABLES
+    }
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Import
+# ─────────────────────────────────────────────────────────────────────────────
+
+def read_batches(source: Sink, fmt: str = "parquet") -> Iterator[Any]:
+    """Record batches of a Parquet or Arrow IPC file."""
+    _check_format(fmt)
+    pa, pq = _pyarrow()
+    if fmt == "parquet":
+        yield from pq.ParquetFile(source).iter_batches(batch_size=SNAPSHOT_BATCH)
+    else:
+        reader = pa.ipc.open_file(source)
+        for i in range(reader.num_record_batches):
+            yield reader.get_batch(i)
+
+
+def import_student_metrics(db: Session, source: Sink, fmt: str = "parquet") -> Dict[str, Any]:
+    """
+    Upsert ``student_metrics`` from a columnar file (not committed).
+
+    Rows for unknown students or with a missing required value are
+    skipped.  Cohort aggregates are rebuilt afterwards and the imported
+    students' profile documents dropped.
+
+    Raises:
+        ValueError: unknown format or missing required columns
+        ColumnarUnavailable: pyarrow is not installed
+    """
+    rows_read = imported = unknown = invalid = 0
+    now = datetime.utcnow()
+
+    for batch in read_batches(source, fmt):
+        names = set(batch.schema.names)
+        missing = [c for c in METRIC_IMPORT_COLUMNS if c not in names]
+        if missing:
+            raise ValueError(f"Missing required columns: {', '.join(missing)}")
+        columns = METRIC_IMPORT_COLUMNS + [c for c in METRIC_OPTIONAL_COLUMNS if c in names]
+        values = [batch.column(batch.schema.get_field_index(c)).to_pylist() for c in columns]
+        records = [dict(zip(columns, row)) for row in zip(*values)]
+        rows_read += len(records)
+
+        complete = [r for r in records if all(r[c] is not None for c in METRIC_IMPORT_COLUMNS)]
+        invalid += len(records) - len(complete)
+
+        ids = {r["student_id"] for r in complete}
+        known = set(db.scalars(select(Student.id).where(Student.id.in_(ids)))) if ids else set()
+        rows: List[Dict[str, Any]] = [{**r, "updated_at": now} for r in complete if r["student_id"] in known]
+        unknown += len(complete) - len(rows)
+
+        bulk_upsert(db, StudentMetric, rows, ["student_id"])
+        invalidate_profiles(db, [r["student_id"] for r in rows])
+        imported += len(rows)
+
+    rebuild_cohort_aggregates(db)
+    return {
+        "rows_read": rows_read,
+        "imported": imported,
+        "skipped_unknown_students": unknown,
+        "skipped_invalid": invalid,
+    }
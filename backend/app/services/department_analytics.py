@@ -0,0 +1,72 @@
+"""
+Per-department statistics shared by the department breakdown endpoints.
+
+``department_stats`` answers counts, averages and high-risk totals for
+every department with one GROUP BY over students ⟕ student_metrics ⟕
+risk_scores; ``department_risk_trends`` adds the recent daily average risk
+per department with a second GROUP BY on (department, day).
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Tuple
+
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session
+
+from app.models import Department, RiskHistory, RiskLevel, RiskScore, Student, StudentMetric
+
+TREND_DAYS = 7
+
+
+def _department_stats_select():
+    return (
+        select(
+            Student.department,
+            func.count(Student.id).label("total"),
+            func.count(StudentMetric.id).label("with_metrics"),
+            func.count(RiskScore.id).label("scored"),
+            func.avg(RiskScore.risk_score).label("avg_risk"),
+            func.sum(case((RiskScore.risk_level == RiskLevel.HIGH, 1), else_=0)).label("high_risk"),
+            func.avg(StudentMetric.attendance_rate).label("avg_attendance"),
+            func.avg(StudentMetric.academic_performance_index).label("avg_performance"),
+        )
+        .outerjoin(StudentMetric, StudentMetric.student_id == Student.id)
+        .outerjoin(RiskScore, RiskScore.student_id == Student.id)
+        .group_by(Student.department)
+    )
+
+
+def department_stats(db: Session) -> Dict[Department, Dict[str, Any]]:
+    """
+    Statistics for each department that has students, in ``Department``
+    declaration order.
+
+    Keys: total (students), with_metrics, scored, avg_risk, high_risk,
+    avg_attendance, avg_performance.  Averages are None when nothing in
+    the department has the underlying row.
+    """
+    rows = {
+        # SUM() comes back as Decimal on MySQL
+        row.department: {**row._mapping, "high_risk": int(row.high_risk)}
+        for row in db.execute(_department_stats_select())
+    }
+    return {dept: rows[dept] for dept in Department if dept in rows}
+
+
+def department_risk_trends(db: Session, days: int = TREND_DAYS) -> Dict[Department, List[Tuple[str, float]]]:
+    """Daily (date, average risk) points from risk history over the last *days*, per department."""
+    day = func.date(RiskHistory.recorded_at)
+    stmt = (
+        select(Student.department, day.label("day"), func.avg(RiskHistory.risk_score).label("avg"))
+        .join(Student, RiskHistory.student_id == Student.id)
+        .where(RiskHistory.recorded_at >= datetime.utcnow() - timedelta(days=days))
+        .group_by(Student.department, day)
+        .order_by(Student.department, day)
+    )
+    trends: Dict[Department, List[Tuple[str, float]]] = defaultdict(list)
+    for row in db.execute(stmt):
+        trends[row.department].append((str(row.day), float(row.avg)))
+    return trends
@@ -4,26 +4,34 @@ Feature Engineering Service — DB-driven.
 All features are computed from real DB tables (StudentRawAttendance,
 StudentRawMarks, StudentRawAssignments). Results are upserted into
 StudentMetric. No synthetic data, no NaN propagation.
+
+Per-student running counts live in StudentFeatureAggregate: uploads add
+their new rows to it (update_features_incremental), so refreshing a
+student's metrics never rescans the raw history.
 """
 
 from __future__ import annotations
 
 import math
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Optional
 
 import pandas as pd
 from loguru import logger
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import bindparam, func, select, update
 
+from app.database import bulk_upsert
 from app.models import (
     Student,
+    StudentFeatureAggregate,
     StudentMetric,
     StudentRawAttendance,
     StudentRawMarks,
     StudentRawAssignments,
 )
+from app.services.cohort_aggregates import CohortDeltas, lock_cohort_aggregates
+from app.services.student_profiles import invalidate_profiles
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -49,10 +57,382 @@ def _clamp(value: float, lo: float = 0.0, hi: float = 100.0) -> float:
 # DB-driven feature computation
 # ─────────────────────────────────────────────────────────────────────────────
 
-def compute_and_save_features(student_id: str, db: Session) -> StudentMetric:
+PRESENT_STATUSES = ["Present", "present", "P", "PRESENT"]
+FEATURE_CHUNK_SIZE = 1000  # student IDs per grouped aggregate query
+
+# StudentFeatureAggregate counters that raw-row deltas add to
+_DELTA_COLUMNS = [
+    "attendance_total",
+    "attendance_present",
+    "marks_rows",
+    "marks_count",
+    "marks_pct_sum",
+    "marks_fail_count",
+    "assignments_total",
+    "assignments_submitted",
+    "assignments_scored",
+    "assignments_score_pct_sum",
+]
+
+
+def _login_gap_days(engagement_score: float) -> int:
+    """Login gap proxy derived from engagement."""
+    if engagement_score > 70:
+        return 1
+    elif engagement_score > 50:
+        return 3
+    elif engagement_score > 30:
+        return 7
+    return 14
+
+
+def _chunks(ids: List[str]):
+    for start in range(0, len(ids), FEATURE_CHUNK_SIZE):
+        yield ids[start:start + FEATURE_CHUNK_SIZE]
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Raw rows → running aggregates
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _marks_pct(marks: pd.DataFrame) -> pd.DataFrame:
+    """Rows with max_marks > 0 and their percentage (column ``pct``)."""
+    max_marks = pd.to_numeric(marks["max_marks"], errors="coerce")
+    valid = marks[max_marks > 0]
+    pct = pd.to_numeric(valid["marks_obtained"], errors="coerce") / max_marks[valid.index] * 100
+    return valid.assign(pct=pct.fillna(0.0))
+
+
+def _attendance_counts(attendance: pd.DataFrame) -> pd.DataFrame:
+    """Per-student attendance counters for a frame of raw attendance rows."""
+    present = attendance["status"].isin(PRESENT_STATUSES)
+    return pd.DataFrame({
+        "attendance_total": attendance.groupby("student_id").size(),
+        "attendance_present": present.groupby(attendance["student_id"]).sum(),
+    })
+
+
+def _marks_counts(marks: pd.DataFrame) -> pd.DataFrame:
+    """Per-student marks counters for a frame of raw marks rows."""
+    valid = _marks_pct(marks)
+    grouped = valid.groupby("student_id")["pct"]
+    counts = pd.DataFrame({
+        "marks_count": grouped.size(),
+        "marks_pct_sum": grouped.sum(),
+        "marks_fail_count": (valid["pct"] < 40.0).groupby(valid["student_id"]).sum(),
+    })
+    counts = counts.reindex(marks["student_id"].unique()).fillna(0)
+    counts["marks_rows"] = marks.groupby("student_id").size()
+    return counts
+
+
+def _marks_first_half(marks: pd.DataFrame) -> pd.DataFrame:
     """
-    Compute all features for *student_id* from raw DB tables and upsert
-    into StudentMetric.  Returns the updated StudentMetric row.
+    Sum / count / last id of each student's oldest floor(n / 2) valid marks
+    rows.  *marks* must hold the full history ordered by id.
+    """
+    valid = _marks_pct(marks)
+    sid = valid["student_id"]
+    position = valid.groupby("student_id").cumcount()
+    first = valid[position < valid.groupby("student_id")["pct"].transform("size") // 2]
+    grouped = first.groupby("student_id")
+    return pd.DataFrame({
+        "marks_first_half_count": grouped.size(),
+        "marks_first_half_sum": grouped["pct"].sum(),
+        "marks_first_half_last_id": grouped["id"].max(),
+    }).reindex(sid.unique()).fillna(0)
+
+
+def _assignment_counts(assignments: pd.DataFrame) -> pd.DataFrame:
+    """Per-student assignment counters for a frame of raw assignment rows."""
+    submitted = assignments["submitted"].fillna(False).astype(bool)
+    score = pd.to_numeric(assignments["score"], errors="coerce")
+    max_score = pd.to_numeric(assignments["max_score"], errors="coerce")
+    scored = submitted & (max_score > 0) & score.notna()
+    score_pct = (score / max_score * 100).where(scored, 0.0)
+    sid = assignments["student_id"]
+    return pd.DataFrame({
+        "assignments_total": assignments.groupby("student_id").size(),
+        "assignments_submitted": submitted.groupby(sid).sum(),
+        "assignments_scored": scored.groupby(sid).sum(),
+        "assignments_score_pct_sum": score_pct.groupby(sid).sum(),
+    })
+
+
+def _raw_frame(db: Session, columns: List[Any], student_ids: List[str], model: Any) -> pd.DataFrame:
+    rows = db.query(*columns).filter(
+        model.student_id.in_(student_ids)
+    ).order_by(model.student_id, model.id).all()
+    return pd.DataFrame([tuple(r) for r in rows], columns=[c.key for c in columns])
+
+
+def rebuild_feature_aggregates(student_ids: Iterable[str], db: Session) -> int:
+    """
+    Recompute StudentFeatureAggregate rows for *student_ids* from their full
+    raw history (one pass per chunk).  Unknown student IDs are ignored.
+    Returns the number of aggregate rows written.
+    """
+    ids = list(dict.fromkeys(student_ids))
+    now = datetime.utcnow()
+    rows: List[Dict[str, Any]] = []
+
+    for chunk in _chunks(ids):
+        known = [r.id for r in db.query(Student.id).filter(Student.id.in_(chunk)).all()]
+        if not known:
+            continue
+
+        attendance = _raw_frame(
+            db, [StudentRawAttendance.student_id, StudentRawAttendance.status],
+            known, StudentRawAttendance,
+        )
+        marks = _raw_frame(
+            db, [StudentRawMarks.id, StudentRawMarks.student_id,
+                 StudentRawMarks.marks_obtained, StudentRawMarks.max_marks],
+            known, StudentRawMarks,
+        )
+        assignments = _raw_frame(
+            db, [StudentRawAssignments.student_id, StudentRawAssignments.submitted,
+                 StudentRawAssignments.score, StudentRawAssignments.max_score],
+            known, StudentRawAssignments,
+        )
+
+        counts = pd.concat([
+            _attendance_counts(attendance),
+            _marks_counts(marks),
+            _marks_first_half(marks),
+            _assignment_counts(assignments),
+        ], axis=1).reindex(known)
+        columns = [*_DELTA_COLUMNS, "marks_first_half_count", "marks_first_half_sum",
+                   "marks_first_half_last_id"]
+        counts = counts.reindex(columns=columns).fillna(0)
+
+        for sid, values in counts.iterrows():
+            row = {c: _as_counter(c, values[c]) for c in columns}
+            row.update(student_id=sid, updated_at=now)
+            rows.append(row)
+
+    bulk_upsert(db, StudentFeatureAggregate, rows, ["student_id"])
+    return len(rows)
+
+
+def _as_counter(column: str, value: Any) -> Any:
+    """Integer counters stay integers; sums stay floats."""
+    return float(value) if column.endswith("_sum") else int(value)
+
+
+def _apply_aggregate_deltas(deltas: pd.DataFrame, db: Session) -> None:
+    """Add per-student counter deltas to existing aggregate rows (one executemany)."""
+    table = StudentFeatureAggregate.__table__
+    stmt = (
+        update(table)
+        .where(table.c.student_id == bindparam("b_student_id"))
+        .values(
+            updated_at=bindparam("b_updated_at"),
+            **{c: table.c[c] + bindparam(f"d_{c}") for c in _DELTA_COLUMNS},
+        )
+    )
+    now = datetime.utcnow()
+    params = []
+    for sid, values in deltas.iterrows():
+        param = {f"d_{c}": _as_counter(c, values[c]) for c in _DELTA_COLUMNS}
+        param.update(b_student_id=sid, b_updated_at=now)
+        params.append(param)
+    if params:
+        db.execute(stmt, params)
+
+
+def _advance_marks_first_half(student_ids: List[str], db: Session) -> None:
+    """
+    Move each student's first-half boundary forward to floor(marks_count / 2)
+    after new marks arrive.  Only the rows crossing the boundary are read.
+    """
+    agg = StudentFeatureAggregate
+    m = StudentRawMarks
+    for chunk in _chunks(student_ids):
+        ranked = (
+            select(
+                m.student_id, m.id, m.marks_obtained, m.max_marks,
+                func.row_number().over(partition_by=m.student_id, order_by=m.id).label("rn"),
+            )
+            .join(agg, agg.student_id == m.student_id)
+            .where(
+                m.student_id.in_(chunk),
+                m.max_marks > 0,
+                m.id > agg.marks_first_half_last_id,
+            )
+            .subquery()
+        )
+        crossing = db.query(ranked).join(
+            agg, agg.student_id == ranked.c.student_id
+        ).filter(
+            ranked.c.rn <= agg.marks_count / 2 - agg.marks_first_half_count
+        ).all()
+        if not crossing:
+            continue
+
+        frame = pd.DataFrame(
+            [(r.student_id, r.id, r.marks_obtained, r.max_marks) for r in crossing],
+            columns=["student_id", "id", "marks_obtained", "max_marks"],
+        )
+        table = agg.__table__
+        grouped = _marks_pct(frame).groupby("student_id")
+        db.execute(
+            update(table)
+            .where(table.c.student_id == bindparam("b_student_id"))
+            .values(
+                marks_first_half_count=table.c.marks_first_half_count + bindparam("d_count"),
+                marks_first_half_sum=table.c.marks_first_half_sum + bindparam("d_sum"),
+                marks_first_half_last_id=bindparam("b_last_id"),
+            ),
+            [
+                {"b_student_id": sid, "d_count": int(n), "d_sum": float(s), "b_last_id": int(last)}
+                for sid, n, s, last in zip(
+                    grouped.size().index, grouped.size(), grouped["pct"].sum(), grouped["id"].max(),
+                )
+            ],
+        )
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Running aggregates → StudentMetric
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _refresh_metrics(student_ids: List[str], db: Session) -> int:
+    """
+    Derive StudentMetric rows from the running aggregates (two reads and
+    one bulk upsert per chunk), folding the old → new metric change into
+    the cohort aggregates and dropping the stale profile documents.  The
+    old metric values are read with a locking read under
+    ``lock_cohort_aggregates`` so concurrent refreshes cannot both diff
+    against the same snapshot.  Returns the number of metric rows written.
+    """
+    agg = StudentFeatureAggregate
+    now = datetime.utcnow()
+    rows: List[Dict[str, Any]] = []
+    deltas = CohortDeltas()
+    lock_cohort_aggregates(db)
+
+    for chunk in _chunks(student_ids):
+        current = {
+            m.student_id: m
+            for m in db.query(StudentMetric.student_id, *_METRIC_STATE)
+            .filter(StudentMetric.student_id.in_(chunk))
+            .with_for_update()
+        }
+        known = db.query(
+            Student.id,
+            Student.department,
+            agg.attendance_total, agg.attendance_present,
+            agg.marks_rows, agg.marks_count, agg.marks_pct_sum, agg.marks_fail_count,
+            agg.marks_first_half_count, agg.marks_first_half_sum,
+            agg.assignments_total, agg.assignments_submitted,
+            agg.assignments_scored, agg.assignments_score_pct_sum,
+        ).outerjoin(
+            agg, agg.student_id == Student.id
+        ).filter(Student.id.in_(chunk)).all()
+
+        for k in known:
+            metric = current.get(k.id)
+            old = metric if metric is not None and metric.attendance_rate is not None else None
+            row = _metric_row(k, old, now)
+            deltas.metric_changed(k.department, old._mapping if old else None, row)
+            rows.append(row)
+
+    bulk_upsert(db, StudentMetric, rows, ["student_id"])
+    deltas.apply(db)
+    invalidate_profiles(db, [row["student_id"] for row in rows])
+    return len(rows)
+
+
+# StudentMetric columns _metric_row falls back on and the cohort deltas diff
+_METRIC_STATE = [
+    StudentMetric.attendance_rate,
+    StudentMetric.engagement_score,
+    StudentMetric.academic_performance_index,
+    StudentMetric.failure_ratio,
+    StudentMetric.semester_performance_trend,
+    StudentMetric.financial_risk_flag,
+    StudentMetric.commute_risk_score,
+]
+
+
+def _metric_row(k: Any, m: Any, now: datetime) -> Dict[str, Any]:
+    """StudentMetric values for one joined (student, aggregate) row *k* and its current metric *m* (or None)."""
+    has_metric = m is not None
+
+    if k.attendance_total:
+        attendance_rate = _clamp((k.attendance_present / k.attendance_total) * 100)
+    else:
+        # Fall back to existing metric or neutral default
+        attendance_rate = _safe(m.attendance_rate, 75.0) if has_metric else 75.0
+
+    if k.marks_rows:
+        count = k.marks_count or 0
+        academic_performance_index = _safe(k.marks_pct_sum / count) if count else 0.0
+        failure_ratio = _safe(k.marks_fail_count / count) if count else 0.0
+        # semester_performance_trend: recent half avg - old half avg
+        if count >= 2:
+            first_n = k.marks_first_half_count
+            old_avg = k.marks_first_half_sum / first_n
+            new_avg = (k.marks_pct_sum - k.marks_first_half_sum) / (count - first_n)
+            semester_performance_trend = _safe(new_avg - old_avg)
+        else:
+            semester_performance_trend = 0.0
+    elif has_metric:
+        academic_performance_index = _safe(m.academic_performance_index, 65.0)
+        failure_ratio = _safe(m.failure_ratio, 0.1)
+        semester_performance_trend = _safe(m.semester_performance_trend, 0.0)
+    else:
+        academic_performance_index = 65.0
+        failure_ratio = 0.1
+        semester_performance_trend = 0.0
+
+    if k.assignments_total:
+        submission_rate = k.assignments_submitted / k.assignments_total
+        scored = k.assignments_scored or 0
+        avg_score_pct = k.assignments_score_pct_sum / scored if scored else 0.0
+        engagement_score = _clamp(submission_rate * 50 + _safe(avg_score_pct) * 0.5)
+    else:
+        engagement_score = _safe(m.engagement_score, 70.0) if has_metric else 70.0
+
+    login_gap_days = _login_gap_days(engagement_score)
+    return {
+        "student_id": k.id,
+        "attendance_rate": attendance_rate,
+        "academic_performance_index": academic_performance_index,
+        "engagement_score": engagement_score,
+        "failure_ratio": failure_ratio,
+        "semester_performance_trend": semester_performance_trend,
+        "login_gap_days": login_gap_days,
+        # Preserve prior financial / commute flags
+        "financial_risk_flag": bool(m.financial_risk_flag) if has_metric else False,
+        "commute_risk_score": m.commute_risk_score if has_metric else 1,
+        "last_interaction": now - timedelta(days=login_gap_days),
+        "updated_at": now,
+    }
+
+
+def _expire_metrics(db: Session) -> None:
+    """The bulk upserts bypass the ORM, so drop any stale in-session state."""
+    for obj in list(db.identity_map.values()):
+        if isinstance(obj, (StudentMetric, StudentFeatureAggregate)):
+            db.expire(obj)
+        elif isinstance(obj, Student):
+            db.expire(obj, ["metrics"])
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Public entry points
+# ─────────────────────────────────────────────────────────────────────────────
+
+def compute_features_bulk(student_ids: Iterable[str], db: Session) -> int:
+    """
+    Compute features for many students from their full raw history and
+    upsert them into StudentMetric with one bulk statement per chunk.
+
+    Rebuilds the running aggregates first, so this is also the repair path
+    if StudentFeatureAggregate ever drifts.  Unknown student IDs are
+    ignored.  Returns the number of StudentMetric rows written.
 
     Feature definitions
     -------------------
@@ -68,141 +448,93 @@ def compute_and_save_features(student_id: str, db: Session) -> StudentMetric:
     financial_risk_flag : False by default (no financial table yet)
     commute_risk_score  : 1 by default (no commute table yet)
     """
-    logger.info(f"Computing features for student {student_id}")
+    ids = list(dict.fromkeys(student_ids))
+    if not ids:
+        return 0
+
+    db.flush()  # raw rows added in this session must be visible to the aggregates
+    rebuild_feature_aggregates(ids, db)
+    written = _refresh_metrics(ids, db)
+    _expire_metrics(db)
+    logger.info(f"Features computed for {written} students")
+    return written
+
+
+def update_features_incremental(
+    db: Session,
+    attendance: Optional[pd.DataFrame] = None,
+    marks: Optional[pd.DataFrame] = None,
+    assignments: Optional[pd.DataFrame] = None,
+) -> int:
+    """
+    Refresh StudentMetric after new raw rows were inserted, in O(new rows).
 
-    # ── Attendance rate ──────────────────────────────────────────────────────
-    total_att = db.query(func.count(StudentRawAttendance.id)).filter(
-        StudentRawAttendance.student_id == student_id
-    ).scalar() or 0
+    Each frame holds only the newly inserted rows (already added to the
+    session):
+        attendance  : student_id, status
+        marks       : student_id, marks_obtained, max_marks
+        assignments : student_id, submitted, score, max_score
 
-    present_att = db.query(func.count(StudentRawAttendance.id)).filter(
-        StudentRawAttendance.student_id == student_id,
-        StudentRawAttendance.status.in_(["Present", "present", "P", "PRESENT"]),
-    ).scalar() or 0
+    Their counts are added to the students' running aggregates; a student
+    without an aggregate row yet is rebuilt once from raw history instead.
+    Returns the number of StudentMetric rows written.
+    """
+    parts = []
+    if attendance is not None and len(attendance):
+        parts.append(_attendance_counts(attendance))
+    if marks is not None and len(marks):
+        parts.append(_marks_counts(marks))
+    if assignments is not None and len(assignments):
+        parts.append(_assignment_counts(assignments))
+    if not parts:
+        return 0
+
+    deltas = pd.concat(parts, axis=1).reindex(columns=_DELTA_COLUMNS).fillna(0)
+    ids = [str(sid) for sid in deltas.index]
+    db.flush()
+
+    tracked = set()
+    for chunk in _chunks(ids):
+        tracked.update(
+            r.student_id for r in db.query(StudentFeatureAggregate.student_id).filter(
+                StudentFeatureAggregate.student_id.in_(chunk)
+            ).all()
+        )
 
-    if total_att > 0:
-        attendance_rate = _clamp((present_att / total_att) * 100)
-    else:
-        # Fall back to existing metric or neutral default
-        existing = db.query(StudentMetric).filter(
-            StudentMetric.student_id == student_id
-        ).first()
-        attendance_rate = _safe(existing.attendance_rate, 75.0) if existing else 75.0
-
-    # ── Marks / Academic performance ────────────────────────────────────────
-    marks_rows = db.query(
-        StudentRawMarks.marks_obtained, StudentRawMarks.max_marks
-    ).filter(StudentRawMarks.student_id == student_id).all()
-
-    if marks_rows:
-        pcts = [
-            _safe(r.marks_obtained / r.max_marks * 100, 0.0)
-            for r in marks_rows
-            if _safe(r.max_marks, 1.0) > 0
-        ]
-        academic_performance_index = _safe(sum(pcts) / len(pcts) if pcts else 0.0)
-
-        # failure_ratio: marks < 40 %
-        failed = sum(1 for p in pcts if p < 40.0)
-        failure_ratio = _safe(failed / len(pcts)) if pcts else 0.0
+    untracked = [sid for sid in ids if sid not in tracked]
+    if untracked:
+        rebuild_feature_aggregates(untracked, db)  # history already includes the new rows
 
-        # semester_performance_trend: recent half avg - old half avg
-        if len(pcts) >= 2:
-            mid = len(pcts) // 2
-            old_avg = sum(pcts[:mid]) / mid
-            new_avg = sum(pcts[mid:]) / (len(pcts) - mid)
-            semester_performance_trend = _safe(new_avg - old_avg)
-        else:
-            semester_performance_trend = 0.0
-    else:
-        existing = db.query(StudentMetric).filter(
-            StudentMetric.student_id == student_id
-        ).first()
-        if existing:
-            academic_performance_index = _safe(existing.academic_performance_index, 65.0)
-            failure_ratio = _safe(existing.failure_ratio, 0.1)
-            semester_performance_trend = _safe(existing.semester_performance_trend, 0.0)
-        else:
-            academic_performance_index = 65.0
-            failure_ratio = 0.1
-            semester_performance_trend = 0.0
+    if tracked:
+        _apply_aggregate_deltas(deltas[deltas.index.isin(tracked)], db)
+        if marks is not None and len(marks):
+            _advance_marks_first_half(
+                [sid for sid in ids if sid in tracked and deltas.at[sid, "marks_count"] > 0], db,
+            )
 
-    # ── Engagement score ─────────────────────────────────────────────────────
-    assign_rows = db.query(
-        StudentRawAssignments.submitted,
-        StudentRawAssignments.score,
-        StudentRawAssignments.max_score,
-    ).filter(StudentRawAssignments.student_id == student_id).all()
-
-    if assign_rows:
-        total_assign = len(assign_rows)
-        submitted_count = sum(1 for r in assign_rows if r.submitted)
-        submission_rate = submitted_count / total_assign if total_assign > 0 else 0.0
-
-        scored = [
-            _safe(r.score / r.max_score * 100, 0.0)
-            for r in assign_rows
-            if r.submitted and _safe(r.max_score, 1.0) > 0 and r.score is not None
-        ]
-        avg_score_pct = sum(scored) / len(scored) if scored else 0.0
-
-        engagement_score = _clamp(submission_rate * 50 + avg_score_pct * 0.5)
-    else:
-        existing = db.query(StudentMetric).filter(
-            StudentMetric.student_id == student_id
-        ).first()
-        engagement_score = _safe(existing.engagement_score, 70.0) if existing else 70.0
+    written = _refresh_metrics(ids, db)
+    _expire_metrics(db)
+    logger.info(f"Features refreshed incrementally for {written} students")
+    return written
 
-    # ── Login gap (proxy from engagement) ────────────────────────────────────
-    if engagement_score > 70:
-        login_gap_days = 1
-    elif engagement_score > 50:
-        login_gap_days = 3
-    elif engagement_score > 30:
-        login_gap_days = 7
-    else:
-        login_gap_days = 14
-
-    # ── Preserve prior financial / commute flags ──────────────────────────────
-    existing = db.query(StudentMetric).filter(
-        StudentMetric.student_id == student_id
-    ).first()
-    financial_risk_flag: bool = existing.financial_risk_flag if existing else False
-    commute_risk_score: int = existing.commute_risk_score if existing else 1
-    last_interaction = datetime.utcnow() - timedelta(days=login_gap_days)
-
-    # ── Upsert StudentMetric ─────────────────────────────────────────────────
-    if existing:
-        existing.attendance_rate = attendance_rate
-        existing.academic_performance_index = academic_performance_index
-        existing.engagement_score = engagement_score
-        existing.failure_ratio = failure_ratio
-        existing.semester_performance_trend = semester_performance_trend
-        existing.login_gap_days = login_gap_days
-        existing.financial_risk_flag = financial_risk_flag
-        existing.commute_risk_score = commute_risk_score
-        existing.last_interaction = last_interaction
-        existing.updated_at = datetime.utcnow()
-        metric = existing
-    else:
-        metric = StudentMetric(
-            student_id=student_id,
-            attendance_rate=attendance_rate,
-            academic_performance_index=academic_performance_index,
-            engagement_score=engagement_score,
-            failure_ratio=failure_ratio,
-            semester_performance_trend=semester_performance_trend,
-            login_gap_days=login_gap_days,
-            financial_risk_flag=financial_risk_flag,
-            commute_risk_score=commute_risk_score,
-            last_interaction=last_interaction,
-        )
-        db.add(metric)
 
-    db.flush()  # make row visible in the same transaction
+def compute_and_save_features(student_id: str, db: Session) -> StudentMetric:
+    """
+    Compute all features for *student_id* from raw DB tables and upsert
+    into StudentMetric.  Returns the updated StudentMetric row.
+
+    Single-student form of compute_features_bulk (see there for the
+    feature definitions).
+    """
+    logger.info(f"Computing features for student {student_id}")
+
+    if not compute_features_bulk([student_id], db):
+        raise ValueError(f"Student {student_id} not found")
+
+    metric = db.query(StudentMetric).filter(StudentMetric.student_id == student_id).one()
     logger.info(
-        f"  Features saved: attendance={attendance_rate:.1f}%, "
-        f"api={academic_performance_index:.1f}, engagement={engagement_score:.1f}"
+        f"  Features saved: attendance={metric.attendance_rate:.1f}%, "
+        f"api={metric.academic_performance_index:.1f}, engagement={metric.engagement_score:.1f}"
     )
     return metric
 
@@ -0,0 +1,419 @@
+"""
+Bulk ingestion of raw upload rows (attendance, marks, assignments).
+
+Validates student IDs with one set lookup, coerces every column with
+vectorised pandas operations and inserts in executemany chunks — no
+per-row SELECT and no ORM object per row.  Rejected rows are reported
+with their DataFrame row index.
+
+CSV uploads are streamed: the spooled upload file is parsed
+``settings.upload_chunk_rows`` rows at a time and every chunk is
+committed before the next is read, so peak memory is bounded by the
+chunk size rather than the file size.  Uploads through the faculty
+dashboard are spooled to disk and processed by ``run_upload_job`` on the
+background job pool.
+"""
+
+from __future__ import annotations
+
+import codecs
+import glob
+import os
+import shutil
+import tempfile
+from contextlib import nullcontext
+from typing import Any, BinaryIO, Callable, ContextManager, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import pandas as pd
+from loguru import logger
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.models import (
+    Student,
+    StudentRawAssignments,
+    StudentRawAttendance,
+    StudentRawMarks,
+)
+from app.schemas import UploadSummary
+from app.services.feature_engineering import update_features_incremental
+from app.services.jobs import JobContext
+from app.services.realtime_prediction import compute_risk_scores_batch
+from app.services.response_cache import bump_data_generation
+
+INGEST_CHUNK_SIZE = 5000     # rows per executemany INSERT
+LOOKUP_CHUNK_SIZE = 1000     # student IDs per IN (...) lookup
+MAX_REPORTED_ERRORS = 1000   # error messages kept for a streamed upload
+ENCODING_SAMPLE_BYTES = 1024 * 1024
+
+RAW_MODELS = {
+    "attendance": StudentRawAttendance,
+    "marks": StudentRawMarks,
+    "assignments": StudentRawAssignments,
+}
+
+_TRUTHY = ("true", "1", "yes", "y")
+
+
+def known_student_ids(student_ids: Iterable[str], db: Session) -> Set[str]:
+    """Return the subset of *student_ids* present in the students table."""
+    ids = list(dict.fromkeys(student_ids))
+    known: Set[str] = set()
+    for start in range(0, len(ids), LOOKUP_CHUNK_SIZE):
+        known.update(
+            r.id for r in db.query(Student.id).filter(
+                Student.id.in_(ids[start:start + LOOKUP_CHUNK_SIZE])
+            ).all()
+        )
+    return known
+
+
+def _text(df: pd.DataFrame, column: str, default: str, max_len: int) -> pd.Series:
+    if column not in df.columns:
+        return pd.Series(default, index=df.index)
+    return df[column].fillna(default).astype(str).str.strip().str.slice(0, max_len)
+
+
+def _invalid_number(raw: pd.Series, parsed: pd.Series) -> pd.Series:
+    """Non-blank input that did not parse as a number."""
+    blank = raw.isna() | (raw.astype(str).str.strip() == "")
+    return parsed.isna() & ~blank
+
+
+def _coerce(df: pd.DataFrame, data_type: str) -> Tuple[pd.DataFrame, pd.Series]:
+    """
+    Build the insert frame for *data_type* and a per-row rejection reason
+    ("" for valid rows).
+    """
+    reasons = pd.Series("", index=df.index)
+
+    def reject(mask: pd.Series, messages: pd.Series) -> None:
+        mask = mask & (reasons == "")
+        reasons[mask] = messages[mask]
+
+    if data_type == "attendance":
+        dates = pd.to_datetime(df["date"], errors="coerce", format="mixed")
+        reject(dates.isna(), "invalid date '" + df["date"].astype(str) + "' — skipped")
+        frame = pd.DataFrame({
+            "date": dates,
+            "subject": _text(df, "subject", "General", 200),
+            "status": _text(df, "status", "Present", 20),
+        })
+
+    elif data_type == "marks":
+        obtained = pd.to_numeric(df["marks_obtained"], errors="coerce")
+        maximum = pd.to_numeric(df["max_marks"], errors="coerce")
+        reject(obtained.isna(), "invalid marks_obtained '" + df["marks_obtained"].astype(str) + "' — skipped")
+        reject(_invalid_number(df["max_marks"], maximum),
+               "invalid max_marks '" + df["max_marks"].astype(str) + "' — skipped")
+        frame = pd.DataFrame({
+            "subject": _text(df, "subject", "General", 200),
+            "exam_type": _text(df, "exam_type", "Internal", 100),
+            "marks_obtained": obtained,
+            "max_marks": maximum.where(maximum.notna() & (maximum != 0), 100.0),
+        })
+
+    else:  # assignments
+        submitted = df["submitted"].astype(str).str.strip().str.lower().isin(_TRUTHY)
+        raw_score = df["score"] if "score" in df.columns else pd.Series(None, index=df.index)
+        score = pd.to_numeric(raw_score, errors="coerce")
+        reject(_invalid_number(raw_score, score), "invalid score '" + raw_score.astype(str) + "' — skipped")
+        if "max_score" in df.columns:
+            max_score = pd.to_numeric(df["max_score"], errors="coerce")
+        else:
+            max_score = pd.Series(10.0, index=df.index)
+        frame = pd.DataFrame({
+            "subject": _text(df, "subject", "General", 200),
+            "assignment_name": _text(df, "assignment_name", "Assignment", 300),
+            "submitted": submitted,
+            "score": score.astype(object).where(score.notna(), None),
+            "max_score": max_score.where(max_score.notna() & (max_score != 0), 10.0),
+        })
+
+    return frame, reasons
+
+
+def ingest_raw_rows(df: pd.DataFrame, data_type: str, db: Session) -> Dict[str, Any]:
+    """
+    Validate, coerce and bulk-insert the raw rows of an upload.
+
+    Args:
+        df: Upload with normalised (lower-case) column names
+        data_type: "attendance", "marks" or "assignments"
+        db: Active session; rows are inserted but not committed
+
+    Returns:
+        Dict with rows_processed, affected_ids, new_rows (the accepted rows
+        as a frame, for incremental feature refresh), errors and
+        rejected_rows (row indexes)
+    """
+    model = RAW_MODELS[data_type]
+
+    student_ids = df["student_id"].astype("string").str.strip()
+    missing_id = student_ids.isna() | (student_ids == "")
+    known = known_student_ids(student_ids[~missing_id].unique(), db)
+
+    frame, reasons = _coerce(df, data_type)
+    unknown = ~missing_id & ~student_ids.isin(known)
+    reasons = reasons.mask(unknown, "student '" + student_ids.fillna("") + "' not in DB — skipped")
+    reasons = reasons.mask(missing_id, "missing student_id — skipped")
+
+    accepted = reasons == ""
+    frame.insert(0, "student_id", student_ids)
+    frame = frame[accepted]
+
+    records = frame.to_dict("records")
+    table = model.__table__
+    for start in range(0, len(records), INGEST_CHUNK_SIZE):
+        db.execute(insert(table), records[start:start + INGEST_CHUNK_SIZE])
+
+    rejected = reasons[~accepted]
+    logger.info(f"Ingested {len(records)} {data_type} rows ({len(rejected)} rejected)")
+    return {
+        "rows_processed": len(records),
+        "affected_ids": set(frame["student_id"]),
+        "new_rows": frame,
+        "errors": [f"Row {idx}: {reason}" for idx, reason in rejected.items()],
+        "rejected_rows": [int(idx) for idx in rejected.index],
+    }
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Streaming CSV uploads
+# ─────────────────────────────────────────────────────────────────────────────
+
+class UploadValidationError(ValueError):
+    """The upload is structurally invalid (e.g. missing required columns)."""
+
+
+def normalise_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """Lowercase and strip column names."""
+    df.columns = [str(c).strip().lower().replace(" ", "_") for c in df.columns]
+    return df
+
+
+def sniff_encoding(fileobj: BinaryIO) -> str:
+    """UTF-8 if the first MB of *fileobj* decodes as UTF-8, else latin-1."""
+    sample = fileobj.read(ENCODING_SAMPLE_BYTES)
+    fileobj.seek(0)
+    try:
+        # Incremental decode so a multi-byte char cut at the sample edge is fine
+        codecs.getincrementaldecoder("utf-8")().decode(sample, final=False)
+        return "utf-8"
+    except UnicodeDecodeError:
+        return "latin-1"
+
+
+def iter_csv_chunks(fileobj: BinaryIO, chunk_rows: Optional[int] = None) -> Iterator[pd.DataFrame]:
+    """
+    Parse a (spooled) CSV file *chunk_rows* rows at a time, with normalised
+    column names.  The row index continues across chunks.
+    """
+    chunk_rows = chunk_rows or get_settings().upload_chunk_rows
+    fileobj.seek(0)
+    encoding = sniff_encoding(fileobj)
+    with pd.read_csv(fileobj, encoding=encoding, chunksize=chunk_rows) as reader:
+        for chunk in reader:
+            yield normalise_columns(chunk)
+
+
+def ingest_csv_stream(
+    fileobj: BinaryIO,
+    data_type: str,
+    required: Set[str],
+    db: Session,
+    chunk_rows: Optional[int] = None,
+    on_chunk: Optional[Callable[[Dict[str, Any]], None]] = None,
+    stage: Optional[Callable[[str], ContextManager]] = None,
+) -> Dict[str, Any]:
+    """
+    Stream a CSV upload into the raw tables chunk by chunk.
+
+    Each chunk is ingested, folded into the affected students' features
+    and committed before the next chunk is parsed.  *on_chunk* receives a
+    progress dict after every commit; *stage(name)*, if given, wraps the
+    "ingest", "features" and "persistence" steps (used for job timings).
+
+    Raises:
+        UploadValidationError: required columns are missing (nothing written)
+
+    Returns:
+        Dict with rows_read, rows_processed, affected_ids, errors (first
+        MAX_REPORTED_ERRORS), rejected_rows and chunks
+    """
+    rows_read = 0
+    rows_processed = 0
+    affected_ids: Set[str] = set()
+    errors: List[str] = []
+    rejected_rows: List[int] = []
+    chunks = 0
+    stage = stage or (lambda name: nullcontext())
+
+    for chunk in iter_csv_chunks(fileobj, chunk_rows):
+        if chunks == 0:
+            missing = required - set(chunk.columns)
+            if missing:
+                raise UploadValidationError(
+                    f"Missing required columns: {missing}. Required: {required}"
+                )
+
+        try:
+            with stage("ingest"):
+                ingested = ingest_raw_rows(chunk, data_type, db)
+            with stage("features"):
+                update_features_incremental(db, **{data_type: ingested["new_rows"]})
+            with stage("persistence"):
+                db.commit()
+            bump_data_generation()
+        except Exception:
+            db.rollback()
+            logger.error(
+                f"Upload chunk {chunks + 1} failed after {rows_processed} rows were committed"
+            )
+            raise
+
+        chunks += 1
+        rows_read += len(chunk)
+        rows_processed += ingested["rows_processed"]
+        affected_ids |= ingested["affected_ids"]
+        errors.extend(ingested["errors"][:MAX_REPORTED_ERRORS - len(errors)])
+        rejected_rows.extend(ingested["rejected_rows"])
+
+        progress = {
+            "chunk": chunks,
+            "rows_read": rows_read,
+            "rows_processed": rows_processed,
+            "rows_rejected": len(rejected_rows),
+        }
+        logger.info(
+            f"Upload {data_type} chunk {chunks}: {rows_read} rows read, "
+            f"{rows_processed} ingested, {len(rejected_rows)} rejected"
+        )
+        if on_chunk:
+            on_chunk(progress)
+
+    return {
+        "rows_read": rows_read,
+        "rows_processed": rows_processed,
+        "affected_ids": affected_ids,
+        "errors": errors,
+        "rejected_rows": rejected_rows,
+        "chunks": chunks,
+    }
+
+
+def csv_columns(fileobj: BinaryIO) -> Set[str]:
+    """Normalised header of a CSV upload (the file is rewound afterwards)."""
+    fileobj.seek(0)
+    encoding = sniff_encoding(fileobj)
+    header = normalise_columns(pd.read_csv(fileobj, encoding=encoding, nrows=0))
+    fileobj.seek(0)
+    return set(header.columns)
+
+
+SPOOL_PREFIX = "upload-"
+SPOOL_SUFFIX = ".csv"
+
+
+def spool_upload(fileobj: BinaryIO) -> str:
+    """Copy an upload to a temp file the background job can read; returns its path."""
+    spool_dir = get_settings().job_spool_dir or None
+    fileobj.seek(0)
+    with tempfile.NamedTemporaryFile(
+        "wb", suffix=SPOOL_SUFFIX, prefix=SPOOL_PREFIX, dir=spool_dir, delete=False,
+    ) as spooled:
+        shutil.copyfileobj(fileobj, spooled)
+    return spooled.name
+
+
+def remove_spooled_uploads() -> int:
+    """
+    Delete every spooled upload left in the spool directory; returns the count.
+
+    Call at startup, before any job runs: a spooled file is removed by
+    ``run_upload_job`` when its job ends, so one that is still there
+    belongs to a job interrupted by the previous process
+    (see ``fail_interrupted_jobs``).
+    """
+    spool_dir = get_settings().job_spool_dir or tempfile.gettempdir()
+    removed = 0
+    for path in glob.glob(os.path.join(spool_dir, f"{SPOOL_PREFIX}*{SPOOL_SUFFIX}")):
+        try:
+            os.remove(path)
+            removed += 1
+        except OSError:
+            logger.warning(f"Could not remove spooled upload {path}")
+    return removed
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Upload jobs
+# ─────────────────────────────────────────────────────────────────────────────
+
+def run_upload_job(
+    db: Session,
+    ctx: JobContext,
+    path: str,
+    data_type: str,
+    required: Set[str],
+) -> Dict[str, Any]:
+    """
+    Background half of a CSV upload: stream the spooled file into the raw
+    tables and features, then rescore the affected students.
+
+    Stage timings are recorded on *ctx* as ingest, features, inference and
+    persistence.  The spooled file is removed when the job ends; the
+    returned UploadSummary dict becomes the job result.
+    """
+    try:
+        with open(path, "rb") as fileobj:
+            ingested = ingest_csv_stream(
+                fileobj, data_type, required, db,
+                on_chunk=lambda progress: ctx.report(**progress),
+                stage=ctx.stage,
+            )
+    finally:
+        try:
+            os.remove(path)
+        except OSError:
+            logger.warning(f"Could not remove spooled upload {path}")
+
+    affected_ids = ingested["affected_ids"]
+    ctx.add_errors(ingested["errors"])
+    ctx.report(students_total=len(affected_ids), students_scored=0)
+
+    recalcs = 0
+    if affected_ids:
+        try:
+            scored = compute_risk_scores_batch(
+                db, affected_ids,
+                stage=ctx.stage,
+                on_progress=lambda done, total: ctx.report(students_scored=done),
+            )
+        except RuntimeError as exc:  # prediction service not initialised
+            ctx.add_errors([f"risk recompute skipped: {exc}"])
+        else:
+            recalcs = scored["processed"]
+            if scored["processed"] < scored["total"]:
+                ctx.add_errors([
+                    f"{scored['total'] - scored['processed']} student(s) failed risk recompute"
+                ])
+
+    rejected_rows = ingested["rejected_rows"]
+    msg = (
+        f"Processed {ingested['rows_processed']} rows for {len(affected_ids)} students; "
+        f"{recalcs} risk scores updated."
+    )
+    if rejected_rows:
+        msg += f" {len(rejected_rows)} row(s) skipped (see 'errors' field)."
+    logger.info(msg)
+
+    return UploadSummary(
+        rows_processed=ingested["rows_processed"],
+        students_affected=len(affected_ids),
+        recalculations_triggered=recalcs,
+        errors=ctx.errors[:50],  # full (capped) list is on the job row
+        rejected_rows=rejected_rows[:MAX_REPORTED_ERRORS],
+        message=msg,
+    ).model_dump()
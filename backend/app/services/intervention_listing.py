@@ -0,0 +1,115 @@
+"""
+Paginated intervention listing with the student and risk columns joined in.
+
+Interventions are ordered newest first by (created_at, id) and each page
+is one SELECT over interventions ⋈ students ⟕ risk_scores continuing from
+an opaque cursor — no per-row lookups and no OFFSET, so a page costs the
+same however deep it is.  ``count_by_status`` gives the per-status totals
+behind the paged lists with one GROUP BY.
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.orm import Session
+
+from app.models import Department, Intervention, InterventionStatus, RiskScore, Student
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+
+def parse_statuses(raw: Optional[str]) -> List[InterventionStatus]:
+    """Comma-separated status values or names; unknown entries are ignored."""
+    if not raw:
+        return []
+    statuses = []
+    for part in raw.split(","):
+        part = part.strip().lower().replace(" ", "_")
+        for status in InterventionStatus:
+            if part in (status.value, status.name.lower()) and status not in statuses:
+                statuses.append(status)
+    return statuses
+
+
+def encode_cursor(created_at: datetime, intervention_id: int) -> str:
+    """Opaque cursor for the row *after* (created_at, id)."""
+    raw = json.dumps([created_at.isoformat(), intervention_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Raises:
+        ValueError: the cursor was not produced by ``encode_cursor``
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, intervention_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(created_at), int(intervention_id)
+    except Exception as exc:
+        raise ValueError(f"Invalid cursor '{cursor}'") from exc
+
+
+def list_interventions(
+    db: Session,
+    statuses: Sequence[InterventionStatus] = (),
+    department: Optional[Department] = None,
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    One page of interventions, newest first.
+
+    Rows carry the ``Intervention`` plus ``student_name`` and
+    ``risk_level`` (None for unscored students).
+
+    Returns:
+        (rows, next_cursor) — next_cursor is None on the last page
+
+    Raises:
+        ValueError: invalid *cursor*
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+    stmt = (
+        select(Intervention, Student.name.label("student_name"), RiskScore.risk_level)
+        .join(Student, Student.id == Intervention.student_id)
+        .outerjoin(RiskScore, RiskScore.student_id == Intervention.student_id)
+    )
+    if statuses:
+        stmt = stmt.where(Intervention.status.in_(statuses))
+    if department:
+        stmt = stmt.where(Student.department == department)
+    if cursor:
+        stmt = stmt.where(tuple_(Intervention.created_at, Intervention.id) < tuple_(*decode_cursor(cursor)))
+
+    stmt = stmt.order_by(Intervention.created_at.desc(), Intervention.id.desc()).limit(limit + 1)
+    rows = db.execute(stmt).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1].Intervention
+    return rows, encode_cursor(last.created_at, last.id)
+
+
+def count_by_status(
+    db: Session,
+    statuses: Sequence[InterventionStatus] = (),
+    department: Optional[Department] = None,
+) -> Dict[InterventionStatus, int]:
+    """Interventions per status under the ``list_interventions`` filters (one GROUP BY query)."""
+    stmt = select(Intervention.status, func.count(Intervention.id))
+    if statuses:
+        stmt = stmt.where(Intervention.status.in_(statuses))
+    if department:
+        stmt = stmt.join(Student, Student.id == Intervention.student_id).where(Student.department == department)
+
+    counts = {status: 0 for status in InterventionStatus}
+    counts.update(db.execute(stmt.group_by(Intervention.status)).all())
+    return counts
@@ -0,0 +1,93 @@
+"""
+Set-based auto-intervention sweep.
+
+Every HIGH-risk student should have an open (PENDING / IN_PROGRESS)
+intervention.  Risk persistence used to check that one student at a time,
+so a recalculation that flagged thousands of students issued thousands of
+point queries.  ``sweep_high_risk_interventions`` reads the HIGH
+candidates with a correlated EXISTS flag for an open intervention (one
+query per batch against ``risk_scores``) and inserts the uncovered
+students' counseling interventions in bulk.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Dict, Iterable, List
+
+from loguru import logger
+from sqlalchemy import exists, insert, select
+from sqlalchemy.orm import Session
+
+from app.models import (
+    Intervention,
+    InterventionStatus,
+    InterventionType,
+    RiskLevel,
+    RiskScore,
+    Student,
+)
+
+SWEEP_BATCH = 1000
+OPEN_STATUSES = (InterventionStatus.PENDING, InterventionStatus.IN_PROGRESS)
+
+
+def _high_risk_candidates(ids: List[str]):
+    """
+    HIGH RiskScore rows among *ids* with the advisor and a ``covered`` flag
+    (an open intervention exists) — one pass, no per-student lookups.
+    """
+    has_open = exists().where(
+        Intervention.student_id == RiskScore.student_id,
+        Intervention.status.in_(OPEN_STATUSES),
+    )
+    return (
+        select(
+            RiskScore.student_id,
+            RiskScore.risk_score,
+            Student.advisor_id,
+            has_open.label("covered"),
+        )
+        .join(Student, Student.id == RiskScore.student_id)
+        .where(RiskScore.student_id.in_(ids), RiskScore.risk_level == RiskLevel.HIGH)
+    )
+
+
+def sweep_high_risk_interventions(db: Session, student_ids: Iterable[str]) -> Dict[str, int]:
+    """
+    Open a PENDING counseling intervention for every student in
+    *student_ids* whose stored RiskScore is HIGH and who has no open one.
+
+    Call it after the scores are written; not committed.  Returns
+    ``{"high_risk": n, "already_open": n, "created": n}`` counted over the
+    candidates whose stored level is HIGH; other ids are ignored.
+    """
+    ids = list(dict.fromkeys(student_ids))
+    now = datetime.utcnow()
+    high_risk = already_open = created = 0
+    for start in range(0, len(ids), SWEEP_BATCH):
+        candidates = db.execute(_high_risk_candidates(ids[start:start + SWEEP_BATCH])).all()
+        rows = [
+            {
+                "student_id": c.student_id,
+                "intervention_type": InterventionType.COUNSELING,
+                "status": InterventionStatus.PENDING,
+                "assigned_to": c.advisor_id or "Unassigned",
+                "notes": (
+                    f"Auto-alert: risk score reached {c.risk_score:.1f}% (High Risk). "
+                    "Immediate counseling recommended."
+                ),
+                "created_at": now,
+                "updated_at": now,
+            }
+            for c in candidates if not c.covered
+        ]
+        if rows:
+            db.execute(insert(Intervention), rows)
+        high_risk += len(candidates)
+        already_open += len(candidates) - len(rows)
+        created += len(rows)
+
+    if created:
+        logger.info(f"Auto-interventions created for {created} high-risk students")
+    return {"high_risk": high_risk, "already_open": already_open, "created": created}
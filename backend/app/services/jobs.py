@@ -0,0 +1,183 @@
+"""
+In-process background jobs with their state persisted in the ``jobs`` table.
+
+Work runs on a small thread pool (``settings.job_workers``) and each job
+opens its own session.  The worker writes progress, per-stage timings and
+errors to the Job row as it goes, so GET /api/jobs/{id} can report on it
+from any request.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from loguru import logger
+from sqlalchemy.orm import Session
+
+from app import database
+from app.config import get_settings
+from app.models import Job, JobStatus
+
+MAX_JOB_ERRORS = 200  # error messages kept on a job row
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=max(1, get_settings().job_workers),
+                thread_name_prefix="job-worker",
+            )
+        return _executor
+
+
+def shutdown_job_workers(wait: bool = True) -> None:
+    """Stop the worker pool (called on application shutdown)."""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=wait)
+            _executor = None
+
+
+def _update_job(job_id: str, **fields: Any) -> None:
+    """Write job fields in a short-lived session of their own."""
+    db = database.SessionLocal()
+    try:
+        db.query(Job).filter(Job.id == job_id).update(fields)
+        db.commit()
+    finally:
+        db.close()
+
+
+class JobContext:
+    """Handle given to a running job for reporting progress and timings."""
+
+    def __init__(self, job_id: str):
+        self.job_id = job_id
+        self.progress: Dict[str, Any] = {}
+        self.stage_timings: Dict[str, float] = {}
+        self.errors: List[str] = []
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Add the wall time of the block to stage *name*."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            self.stage_timings[name] = round(self.stage_timings.get(name, 0.0) + elapsed, 4)
+
+    def add_errors(self, errors: Iterable[str]) -> None:
+        for message in errors:
+            if len(self.errors) >= MAX_JOB_ERRORS:
+                break
+            self.errors.append(message)
+
+    def report(self, **progress: Any) -> None:
+        """Merge *progress* into the job's counters and persist them."""
+        self.progress.update(progress)
+        _update_job(self.job_id, **self.snapshot())
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "progress": dict(self.progress),
+            "stage_timings": dict(self.stage_timings),
+            "errors": list(self.errors),
+        }
+
+
+JobFunction = Callable[[Session, JobContext], Optional[Dict[str, Any]]]
+
+
+def create_job(db: Session, job_type: str, params: Optional[Dict[str, Any]] = None) -> Job:
+    """Insert a queued job row and return it."""
+    job = Job(
+        id=str(uuid.uuid4()),
+        job_type=job_type,
+        status=JobStatus.QUEUED,
+        params=params or {},
+        progress={},
+        stage_timings={},
+        errors=[],
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def submit_job(job_id: str, fn: JobFunction) -> Future:
+    """
+    Run ``fn(db, ctx)`` for *job_id* on the worker pool.
+
+    The return value of *fn* is stored as the job result; an exception
+    fails the job with its message.
+    """
+    return _get_executor().submit(_run_job, job_id, fn)
+
+
+def _run_job(job_id: str, fn: JobFunction) -> None:
+    ctx = JobContext(job_id)
+    _update_job(job_id, status=JobStatus.RUNNING, started_at=datetime.utcnow())
+    logger.info(f"Job {job_id} started")
+
+    db = database.SessionLocal()
+    try:
+        result = fn(db, ctx)
+    except Exception as exc:
+        db.rollback()
+        logger.error(f"Job {job_id} failed: {traceback.format_exc()}")
+        _update_job(
+            job_id,
+            status=JobStatus.FAILED,
+            error=str(exc),
+            finished_at=datetime.utcnow(),
+            **ctx.snapshot(),
+        )
+    else:
+        logger.info(f"Job {job_id} succeeded — stage timings {ctx.stage_timings}")
+        _update_job(
+            job_id,
+            status=JobStatus.SUCCEEDED,
+            result=result,
+            finished_at=datetime.utcnow(),
+            **ctx.snapshot(),
+        )
+    finally:
+        db.close()
+
+
+def fail_interrupted_jobs(db: Session) -> int:
+    """
+    Mark jobs left queued or running by a previous process as failed.
+
+    Their worker threads died with that process, so they would otherwise
+    report "running" forever.
+    """
+    count = (
+        db.query(Job)
+        .filter(Job.status.in_([JobStatus.QUEUED, JobStatus.RUNNING]))
+        .update(
+            {
+                Job.status: JobStatus.FAILED,
+                Job.error: "Interrupted by server restart",
+                Job.finished_at: datetime.utcnow(),
+            },
+            synchronize_session=False,
+        )
+    )
+    db.commit()
+    return count
@@ -0,0 +1,52 @@
+"""
+Bounded offloading of blocking work from async request handlers.
+
+The upload and import handlers are ``async`` (they receive multipart
+files) but their CSV parsing, SQLAlchemy I/O and model inference are
+blocking.  ``run_blocking`` moves such work onto a dedicated thread pool
+of ``settings.upload_workers`` threads, so at most that many uploads run
+at once and the rest queue.  The event loop stays free for health checks,
+and the dashboards keep Starlette's own threadpool for their sync
+handlers.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Optional, TypeVar
+
+from app.config import get_settings
+
+T = TypeVar("T")
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=max(1, get_settings().upload_workers),
+                thread_name_prefix="upload-worker",
+            )
+        return _executor
+
+
+def shutdown_upload_workers(wait: bool = True) -> None:
+    """Stop the upload pool (called on application shutdown)."""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=wait)
+            _executor = None
+
+
+async def run_blocking(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run ``fn(*args, **kwargs)`` on the upload pool and await its result."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), partial(fn, *args, **kwargs))
@@ -0,0 +1,123 @@
+"""
+Process-pool risk recomputation across CPU cores.
+
+Model inference and SHAP are CPU-bound and hold the GIL, so the batch
+path in ``realtime_prediction`` is limited to one core.  This engine
+shards the metric frame across a ``ProcessPoolExecutor``: every worker
+receives the active model once (via the pool initializer) and scores
+whole shards, and the parent process is the single writer that persists
+each shard in bulk as results stream back.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Any, Dict, Iterable, List, Optional
+
+import pandas as pd
+from loguru import logger
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.services import realtime_prediction as rp
+from app.services.response_cache import bump_data_generation
+from app.services.risk_model import RiskModel
+from app.services.shap_explainer import SHAPExplainer
+
+
+def resolve_worker_count(workers: Optional[int] = None) -> int:
+    """*workers*, else ``settings.scoring_workers``; 0 means one per CPU core."""
+    if workers is None:
+        workers = get_settings().scoring_workers
+    if workers <= 0:
+        workers = os.cpu_count() or 1
+    return workers
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Worker side
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _init_worker(risk_model: RiskModel, with_shap: bool, model_version_id: int) -> None:
+    """Pool initializer: register the model in this worker process once."""
+    shap_explainer: Optional[SHAPExplainer] = None
+    if with_shap:
+        try:
+            shap_explainer = SHAPExplainer(risk_model.calibrated_model)
+        except Exception as exc:
+            logger.warning(f"SHAP init failed in scoring worker {os.getpid()}: {exc}")
+    rp.init_prediction_service(risk_model, shap_explainer, model_version_id)
+
+
+def _score_shard(shard: pd.DataFrame) -> List[Dict[str, Any]]:
+    return rp._score_chunk(rp._require_model(), shard)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Parent side
+# ─────────────────────────────────────────────────────────────────────────────
+
+def compute_risk_scores_parallel(
+    db: Session,
+    student_ids: Optional[Iterable[str]] = None,
+    workers: Optional[int] = None,
+    chunk_size: int = rp.BATCH_CHUNK_SIZE,
+) -> Dict[str, Any]:
+    """
+    Risk computation for many students on a process pool.
+
+    Same contract and return value as ``compute_risk_scores_batch`` (plus
+    ``workers``).  Falls back to the serial batch path when only one
+    worker is configured or the work fits in a single shard.
+    """
+    model = rp._require_model()
+    workers = resolve_worker_count(workers)
+    started = time.perf_counter()
+
+    frame = rp._load_metric_frame(db, student_ids)
+    total = len(frame)
+    if workers <= 1 or total <= chunk_size:
+        return {**rp._score_metric_frame(db, model, frame, started, chunk_size), "workers": 1}
+
+    distribution = rp._empty_distribution()
+    processed = 0
+    interventions_created = 0
+    shards = [frame.iloc[start:start + chunk_size] for start in range(0, total, chunk_size)]
+
+    executor = ProcessPoolExecutor(
+        max_workers=min(workers, len(shards)),
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(model, rp.get_shap_explainer() is not None, rp._active_model_version_id),
+    )
+    with executor:
+        pending = {executor.submit(_score_shard, shard): len(shard) for shard in shards}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                size = pending.pop(future)
+                try:
+                    results = future.result()
+                    sweep = rp._save_risk_results(results, db)
+                    db.commit()
+                    bump_data_generation()
+                except Exception as exc:
+                    db.rollback()
+                    logger.error(f"Parallel shard of {size} students failed: {exc}")
+                    continue
+
+                for r in results:
+                    distribution[r["risk_level"]] += 1
+                processed += len(results)
+                interventions_created += sweep["created"]
+                logger.info(f"Parallel progress: {processed}/{total}")
+
+    summary = rp._batch_summary(total, processed, distribution, started, interventions_created)
+    logger.info(
+        f"Parallel batch complete: {processed}/{total} students on {workers} workers "
+        f"in {summary['elapsed_seconds']:.2f}s ({summary['students_per_second']:.0f} students/s)"
+    )
+    return {**summary, "workers": workers}
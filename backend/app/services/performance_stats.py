@@ -0,0 +1,82 @@
+"""
+Cohort aggregates for the /api/performance endpoints.
+
+Every cohort-level number those endpoints need — metric averages, the mean
+per-student GPA, risk-level counts and the at-risk sub-group — comes from
+one SELECT over students ⋈ student_metrics ⟕ risk_scores, optionally
+filtered to a department.  Nothing is loaded into Python per student.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Optional
+
+from sqlalchemy import Numeric, case, cast, func, select
+from sqlalchemy.orm import Session
+
+from app.models import Department, RiskLevel, RiskScore, Student, StudentMetric
+
+AT_RISK_LEVELS = (RiskLevel.HIGH, RiskLevel.MODERATE)
+
+_api = StudentMetric.academic_performance_index
+# Per-student GPA on a 4.0 scale, rounded like ``performance._gpa_from_index``
+_gpa = func.round(cast(case((_api / 25.0 > 4.0, 4.0), else_=_api / 25.0), Numeric(4, 2)), 2)
+_at_risk = RiskScore.risk_level.in_(AT_RISK_LEVELS)
+
+
+def _count_where(condition):
+    """Rows matching *condition* — portable in place of ``COUNT(*) FILTER (WHERE ...)``."""
+    return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+
+_STAT_COLUMNS = [
+    func.count(Student.id).label("total"),
+    func.avg(_api).label("avg_performance"),
+    func.avg(_gpa).label("avg_gpa"),
+    func.avg(StudentMetric.attendance_rate).label("avg_attendance"),
+    func.avg(StudentMetric.engagement_score).label("avg_engagement"),
+    func.avg(StudentMetric.failure_ratio).label("avg_failure_ratio"),
+    func.avg(StudentMetric.semester_performance_trend).label("avg_trend"),
+    _count_where(RiskScore.risk_level == RiskLevel.HIGH).label("high_risk"),
+    _count_where(RiskScore.risk_level == RiskLevel.MODERATE).label("moderate_risk"),
+    _count_where(_at_risk).label("at_risk"),
+    func.avg(case((_at_risk, _api), else_=None)).label("at_risk_avg_performance"),
+]
+
+_FLOAT_STATS = [c.name for c in _STAT_COLUMNS if c.name.startswith("avg_")] + ["at_risk_avg_performance"]
+_COUNT_STATS = ["high_risk", "moderate_risk", "at_risk"]
+
+
+def _cohort_select():
+    return (
+        select(*_STAT_COLUMNS)
+        .select_from(Student)
+        .join(StudentMetric, StudentMetric.student_id == Student.id)
+        .outerjoin(RiskScore, RiskScore.student_id == Student.id)
+    )
+
+
+def _as_dict(row: Any) -> Dict[str, Any]:
+    stats = dict(row._mapping)
+    for name in _FLOAT_STATS:
+        if stats[name] is not None:
+            stats[name] = float(stats[name])
+    for name in _COUNT_STATS:
+        stats[name] = int(stats[name])  # SUM() comes back as Decimal on MySQL
+    return stats
+
+
+def cohort_performance_stats(db: Session, department: Optional[Department] = None) -> Dict[str, Any]:
+    """
+    Aggregates for students with metrics, optionally in one *department*.
+
+    Keys: total, avg_performance, avg_gpa, avg_attendance, avg_engagement,
+    avg_failure_ratio, avg_trend, high_risk, moderate_risk, at_risk and
+    at_risk_avg_performance.  Averages are None when ``total`` is 0;
+    ``at_risk_avg_performance`` also when no student is at risk.
+    """
+    stmt = _cohort_select()
+    if department:
+        stmt = stmt.where(Student.department == department)
+    return _as_dict(db.execute(stmt).one())
+
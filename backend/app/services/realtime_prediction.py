@@ -8,17 +8,22 @@ Clamps scores 0–100, appends risk history only on meaningful change.
 from __future__ import annotations
 
 import math
+import threading
+import time
+from contextlib import nullcontext
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, ContextManager, Dict, Iterable, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 from loguru import logger
+from sqlalchemy import insert, select
 from sqlalchemy.orm import Session
 
+from app.config import get_settings
+from app.database import bulk_upsert
 from app.models import (
-    Intervention,
-    InterventionStatus,
-    InterventionType,
+    Department,
     ModelVersion,
     RiskHistory,
     RiskLevel,
@@ -27,8 +32,13 @@ from app.models import (
     Student,
     StudentMetric,
 )
+from app.services.cohort_aggregates import CohortDeltas, lock_cohort_aggregates
+from app.services.intervention_sweeper import sweep_high_risk_interventions
+from app.services.response_cache import bump_data_generation
 from app.services.risk_model import RiskModel
+from app.services.shap_cache import SHAPExplanationCache
 from app.services.shap_explainer import SHAPExplainer
+from app.services.student_profiles import invalidate_profiles, refresh_profiles
 
 # ─────────────────────────────────────────────────────────────────────────────
 # Module-level singletons (loaded once at startup via init_prediction_service)
@@ -36,8 +46,27 @@ from app.services.shap_explainer import SHAPExplainer
 _risk_model: Optional[RiskModel] = None
 _shap_explainer: Optional[SHAPExplainer] = None
 _active_model_version_id: Optional[int] = None
+_shap_cache = SHAPExplanationCache(get_settings().shap_cache_size)
+
+# ModelVersion.id → (model, explainer); each artifact is unpickled at most once
+_model_registry: Dict[int, Tuple[RiskModel, Optional[SHAPExplainer]]] = {}
+_registry_lock = threading.Lock()
 
 SCORE_CHANGE_THRESHOLD = 0.5  # don't append history if delta is tiny
+BATCH_CHUNK_SIZE = 1000       # students scored per predict_proba call
+SHAP_TOP_N = 5                # factors stored per explanation
+
+# StudentMetric columns consumed by the model, in training order
+METRIC_COLUMNS = [
+    "attendance_rate",
+    "engagement_score",
+    "academic_performance_index",
+    "login_gap_days",
+    "failure_ratio",
+    "financial_risk_flag",
+    "commute_risk_score",
+    "semester_performance_trend",
+]
 
 
 def init_prediction_service(
@@ -50,6 +79,9 @@ def init_prediction_service(
     _risk_model = risk_model
     _shap_explainer = shap_explainer
     _active_model_version_id = model_version_id
+    with _registry_lock:
+        _model_registry[model_version_id] = (risk_model, shap_explainer)
+    _shap_cache.clear()  # cached explanations belong to the previous model
     logger.info(f"Prediction service initialized — model_version_id={model_version_id}")
 
 
@@ -58,6 +90,36 @@ def get_shap_explainer() -> Optional[SHAPExplainer]:
     return _shap_explainer
 
 
+def get_registered_model(
+    model_version: ModelVersion,
+) -> Tuple[RiskModel, Optional[SHAPExplainer]]:
+    """
+    Return the (model, explainer) pair for *model_version*, loading its
+    artifact from disk only the first time the version is requested.
+    """
+    entry = _model_registry.get(model_version.id)
+    if entry is not None:
+        return entry
+
+    with _registry_lock:
+        entry = _model_registry.get(model_version.id)
+        if entry is None:
+            risk_model = RiskModel()
+            risk_model.load(model_version.model_path)
+            try:
+                shap_explainer: Optional[SHAPExplainer] = SHAPExplainer(risk_model.calibrated_model)
+            except Exception as exc:
+                logger.warning(f"SHAP init failed for model version {model_version.id}: {exc}")
+                shap_explainer = None
+            entry = _model_registry[model_version.id] = (risk_model, shap_explainer)
+            logger.info(f"Model version {model_version.id} loaded into registry")
+    return entry
+
+
+def get_shap_cache_stats() -> Dict[str, Any]:
+    """Hit / miss / eviction counters of the SHAP explanation cache."""
+    return _shap_cache.stats()
+
 
 def _require_model() -> RiskModel:
     if _risk_model is None:
@@ -89,47 +151,77 @@ def _clamp(value: float) -> float:
 # Core prediction
 # ─────────────────────────────────────────────────────────────────────────────
 
-def _get_model_feature_names():
-    """Return the feature names the loaded model expects."""
-    if _risk_model and _risk_model.calibrated_model and hasattr(_risk_model.calibrated_model, 'feature_names_in_'):
-        return list(_risk_model.calibrated_model.feature_names_in_)
+def _get_model_feature_names(model: Optional[RiskModel] = None):
+    """Return the feature names *model* (default: the loaded singleton) expects."""
+    model = model or _risk_model
+    if model and model.calibrated_model and hasattr(model.calibrated_model, 'feature_names_in_'):
+        return list(model.calibrated_model.feature_names_in_)
     return None
 
 
-def _metric_to_dataframe(metric: StudentMetric) -> pd.DataFrame:
-    """Convert a StudentMetric row to a single-row DataFrame for inference.
+def _numeric(values: pd.Series, default: float) -> pd.Series:
+    """Column-wise ``_safe_float``: coerce to float, replacing NaN / inf with *default*."""
+    series = pd.to_numeric(values, errors="coerce").replace([np.inf, -np.inf], np.nan)
+    return series.fillna(default).astype(float)
 
+
+def _metrics_frame_to_features(
+    metrics: pd.DataFrame,
+    model: Optional[RiskModel] = None,
+) -> pd.DataFrame:
+    """Convert a frame of StudentMetric columns to the model's feature matrix.
+
+    Vectorised counterpart of the per-row mapping: every column is coerced
+    once, so building features for N students is a handful of NumPy ops.
     Dynamically maps DB columns to whatever features the trained model expects.
     """
-    model_features = _get_model_feature_names()
+    attendance = _numeric(metrics["attendance_rate"], 75.0)
+    engagement = _numeric(metrics["engagement_score"], 70.0)
+    api = _numeric(metrics["academic_performance_index"], 65.0)
+    columns = {
+        "attendance_rate": attendance,
+        "engagement_score": engagement,
+        "academic_performance_index": api,
+        "login_gap_days": _numeric(metrics["login_gap_days"], 3).astype(int),
+        "failure_ratio": _numeric(metrics["failure_ratio"], 0.1),
+        "financial_risk_flag": metrics["financial_risk_flag"].fillna(False).astype(bool).astype(int),
+        "commute_risk_score": _numeric(metrics["commute_risk_score"], 1).astype(int),
+        "semester_performance_trend": _numeric(metrics["semester_performance_trend"], 0.0),
+    }
 
+    model_features = _get_model_feature_names(model)
     if model_features:
-        feature_map = {
-            "attendance_rate": _safe_float(metric.attendance_rate, 75.0),
-            "lms_score": _safe_float(metric.engagement_score, 70.0),
-            "avg_assignment_score": _safe_float(metric.academic_performance_index, 65.0) * 10,
-            "avg_quiz_score": _safe_float(metric.semester_performance_trend, 50.0),
-            "engagement_score": _safe_float(metric.engagement_score, 70.0),
-            "academic_performance_index": _safe_float(metric.academic_performance_index, 65.0),
-            "login_gap_days": int(_safe_float(metric.login_gap_days, 3)),
-            "failure_ratio": _safe_float(metric.failure_ratio, 0.1),
-            "financial_risk_flag": int(bool(metric.financial_risk_flag)),
-            "commute_risk_score": int(_safe_float(metric.commute_risk_score, 1)),
-            "semester_performance_trend": _safe_float(metric.semester_performance_trend, 0.0),
-        }
-        row = {f: feature_map.get(f, 0.0) for f in model_features}
-        return pd.DataFrame([row])
-
-    return pd.DataFrame([{
-        "attendance_rate": _safe_float(metric.attendance_rate, 75.0),
-        "engagement_score": _safe_float(metric.engagement_score, 70.0),
-        "academic_performance_index": _safe_float(metric.academic_performance_index, 65.0),
-        "login_gap_days": int(_safe_float(metric.login_gap_days, 3)),
-        "failure_ratio": _safe_float(metric.failure_ratio, 0.1),
-        "financial_risk_flag": int(bool(metric.financial_risk_flag)),
-        "commute_risk_score": int(_safe_float(metric.commute_risk_score, 1)),
-        "semester_performance_trend": _safe_float(metric.semester_performance_trend, 0.0),
-    }])
+        columns.update({
+            "lms_score": engagement,
+            "avg_assignment_score": api * 10,
+            "avg_quiz_score": _numeric(metrics["semester_performance_trend"], 50.0),
+        })
+        return pd.DataFrame(
+            {f: columns.get(f, 0.0) for f in model_features},
+            index=metrics.index,
+        )
+
+    return pd.DataFrame(
+        {c: columns[c] for c in METRIC_COLUMNS},
+        index=metrics.index,
+    )
+
+
+def _metric_to_dataframe(metric: StudentMetric) -> pd.DataFrame:
+    """Convert a StudentMetric row to a single-row DataFrame for inference."""
+    return _metrics_frame_to_features(
+        pd.DataFrame([{c: getattr(metric, c) for c in METRIC_COLUMNS}])
+    )
+
+
+def metrics_to_features(
+    metrics: Dict[str, Any],
+    model: Optional[RiskModel] = None,
+) -> pd.DataFrame:
+    """Single-row feature frame for a dict of StudentMetric values."""
+    return _metrics_frame_to_features(
+        pd.DataFrame([{c: metrics.get(c) for c in METRIC_COLUMNS}]), model,
+    )
 
 
 def compute_risk_from_metrics_dict(metrics: Dict[str, Any]) -> Dict[str, Any]:
@@ -165,6 +257,29 @@ def compute_risk_from_metrics_dict(metrics: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
+def compute_risks_from_metrics_frame(metrics: pd.DataFrame) -> List[Dict[str, Any]]:
+    """
+    Vectorised ``compute_risk_from_metrics_dict`` (no DB): score every row of
+    a frame of StudentMetric columns with one predict_proba call.  Returns
+    one result dict per row, in row order.
+    """
+    model = _require_model()
+    X = _metrics_frame_to_features(metrics)
+    raw_scores = np.nan_to_num(model.predict_risk_scores(X), nan=50.0)
+    risk_scores = np.clip(np.round(raw_scores, 2), 0.0, 100.0)
+
+    results: List[Dict[str, Any]] = []
+    for raw, risk_score in zip(raw_scores.tolist(), risk_scores.tolist()):
+        risk_trend, risk_value = RiskModel.calculate_risk_trend(risk_score, None)
+        results.append({
+            "risk_score": round(risk_score, 2),
+            "risk_level": RiskModel._get_risk_level(raw).value,
+            "risk_trend": risk_trend.value,
+            "risk_value": risk_value,
+        })
+    return results
+
+
 def compute_student_risk(
     student_id: str,
     db: Session,
@@ -200,23 +315,7 @@ def compute_student_risk(
     risk_trend, risk_value = RiskModel.calculate_risk_trend(risk_score, prev_score)
 
     # SHAP explanation
-    shap_factors: List[Any] = []
-    if _shap_explainer:
-        try:
-            shap_factors = _shap_explainer.explain(X, top_n=5)
-        except Exception as exc:
-            logger.warning(f"SHAP explanation failed for {student_id}: {exc}")
-
-    shap_explanation = {
-        "top_factors": [
-            {
-                "feature": f.feature,
-                "impact": round(_safe_float(f.impact), 4),
-                "direction": f.direction,
-            }
-            for f in shap_factors
-        ]
-    }
+    shap_explanation = _explain(X, student_id)
 
     result: Dict[str, Any] = {
         "student_id": student_id,
@@ -230,136 +329,379 @@ def compute_student_risk(
     }
 
     if save_to_db:
-        _save_risk_result(result, prev_score, db)
+        _save_risk_result(result, prev_score, db, student.department)
 
     logger.info(f"Risk computed: {student_id} → {risk_score:.1f} ({risk_level.value})")
     return result
 
 
-def _save_risk_result(
-    result: Dict[str, Any],
-    prev_score: Optional[float],
-    db: Session,
-) -> None:
-    """Upsert RiskScore and conditionally append RiskHistory."""
-    student_id = result["student_id"]
-
-    # Upsert current risk score
-    existing = db.query(RiskScore).filter(RiskScore.student_id == student_id).first()
-    if existing:
-        existing.risk_score = result["risk_score"]
-        existing.risk_level = result["risk_level"]
-        existing.risk_trend = result["risk_trend"]
-        existing.risk_value = result["risk_value"]
-        existing.shap_explanation = result["shap_explanation"]
-        existing.model_version_id = result["model_version_id"]
-        existing.predicted_at = datetime.utcnow()
-        existing.updated_at = datetime.utcnow()
-    else:
-        db.add(RiskScore(
-            student_id=student_id,
-            risk_score=result["risk_score"],
-            risk_level=result["risk_level"],
-            risk_trend=result["risk_trend"],
-            risk_value=result["risk_value"],
-            shap_explanation=result["shap_explanation"],
-            model_version_id=result["model_version_id"],
-        ))
-
-    # Append risk history only when score changed meaningfully
-    score_changed = (
-        prev_score is None
-        or abs(result["risk_score"] - prev_score) >= SCORE_CHANGE_THRESHOLD
-    )
-    if score_changed:
-        db.add(RiskHistory(
-            student_id=student_id,
-            risk_score=result["risk_score"],
-            risk_level=result["risk_level"],
-            model_version_id=result["model_version_id"],
-        ))
+def explain_features(
+    X: pd.DataFrame,
+    label: str = "features",
+    model_version_id: Optional[int] = None,
+    shap_explainer: Optional[SHAPExplainer] = None,
+) -> Dict[str, Any]:
+    """
+    SHAP top factors for a single-row model feature frame, in storage form
+    (cached).  Defaults to the active model's explainer.
+    """
+    if model_version_id is None:
+        model_version_id, shap_explainer = _active_model_version_id, _shap_explainer
 
-    db.flush()
+    key = _shap_cache.key(model_version_id, SHAP_TOP_N, X.to_numpy()[0])
+    cached = _shap_cache.get(key)
+    if cached is not None:
+        return cached
 
-    # Auto-create intervention for high-risk students
-    _trigger_intervention(student_id, result["risk_level"], result["risk_score"], result.get("advisor_id"), db)
+    shap_factors: List[Any] = []
+    if shap_explainer:
+        try:
+            shap_factors = shap_explainer.explain(X, top_n=SHAP_TOP_N)
+        except Exception as exc:
+            logger.warning(f"SHAP explanation failed for {label}: {exc}")
+            return {"top_factors": []}
+
+    explanation = {
+        "top_factors": [
+            {
+                "feature": f.feature,
+                "impact": round(_safe_float(f.impact), 4),
+                "direction": f.direction,
+            }
+            for f in shap_factors
+        ]
+    }
+    if explanation["top_factors"]:
+        _shap_cache.put(key, explanation)
+    return explanation
 
 
-def _trigger_intervention(
-    student_id: str,
-    risk_level: RiskLevel,
-    risk_score: float,
-    advisor_id: Optional[str],
+def explain_metric(metric: StudentMetric, label: str = "features") -> Dict[str, Any]:
+    """Cached SHAP top factors for a StudentMetric row, in storage form."""
+    return explain_features(_metric_to_dataframe(metric), label)
+
+
+def _explain(X: pd.DataFrame, student_id: str) -> Dict[str, Any]:
+    """SHAP top factors for one student's feature row, in storage form."""
+    return explain_features(X, student_id)
+
+
+def _explain_batch(X: pd.DataFrame) -> List[Dict[str, Any]]:
+    """
+    SHAP top factors for every row of *X*, in storage form.  Rows already
+    in the cache are served from it; the misses go through one matrix call.
+    """
+    values = X.to_numpy()
+    keys = [_shap_cache.key(_active_model_version_id, SHAP_TOP_N, row) for row in values]
+    explanations: List[Optional[Dict[str, Any]]] = [_shap_cache.get(k) for k in keys]
+    missing = [i for i, e in enumerate(explanations) if e is None]
+    if not missing:
+        return explanations
+
+    batch = None
+    if _shap_explainer:
+        try:
+            batch = _shap_explainer.explain_batch(X.iloc[missing], top_n=SHAP_TOP_N)
+        except Exception as exc:
+            logger.warning(f"Batch SHAP explanation failed for {len(missing)} rows: {exc}")
+
+    for pos, i in enumerate(missing):
+        if batch is None:
+            explanations[i] = {"top_factors": []}
+        else:
+            explanations[i] = batch.to_storage(pos)
+            _shap_cache.put(keys[i], explanations[i])
+    return explanations
+
+
+def _save_risk_result(
+    result: Dict[str, Any],
+    prev_score: Optional[float],
     db: Session,
+    department: Optional[Department] = None,
 ) -> None:
-    """Auto-create a PENDING counseling intervention if student is HIGH risk."""
-    if risk_level != RiskLevel.HIGH:
-        return
-
-    existing = db.query(Intervention).filter(
-        Intervention.student_id == student_id,
-        Intervention.status.in_([InterventionStatus.PENDING, InterventionStatus.IN_PROGRESS]),
-    ).first()
-    if existing:
-        return
-
-    db.add(Intervention(
-        student_id=student_id,
-        intervention_type=InterventionType.COUNSELING,
-        status=InterventionStatus.PENDING,
-        assigned_to=advisor_id or "Unassigned",
-        notes=(
-            f"Auto-alert: risk score reached {risk_score:.1f}% (High Risk). "
-            "Immediate counseling recommended."
-        ),
-    ))
-    logger.info(f"Auto-intervention created for high-risk student {student_id}")
+    """
+    Persist one scored student through ``_save_risk_results`` and rebuild
+    its profile document in place.
+    """
+    if department is None:
+        department = db.query(Student.department).filter(Student.id == result["student_id"]).scalar()
+    _save_risk_results([{
+        **result,
+        "prev_score": prev_score,
+        "department": department,
+        "advisor_id": result.get("advisor_id"),
+    }], db, refresh_documents=True)
 
 
 # ─────────────────────────────────────────────────────────────────────────────
 # Batch computation
 # ─────────────────────────────────────────────────────────────────────────────
 
-def compute_all_risk_scores(db: Session) -> Dict[str, Any]:
+def _load_metric_frame(
+    db: Session,
+    student_ids: Optional[Iterable[str]] = None,
+) -> pd.DataFrame:
     """
-    Compute risk for every student that has feature metrics.
-    Skips students whose score hasn't changed meaningfully.
+    Pull StudentMetric rows (plus advisor and previous score) as one
+    columnar frame — no ORM entity hydration, one query per ID chunk.
     """
-    _require_model()  # fail early if not initialized
-    students = db.query(Student).join(StudentMetric).all()
-    total = len(students)
-    if total == 0:
-        logger.warning("No students with metrics found")
-        return {"total": 0, "processed": 0, "risk_distribution": {}}
+    columns = ["student_id", *METRIC_COLUMNS, "advisor_id", "department", "prev_score"]
+    query = (
+        db.query(
+            StudentMetric.student_id,
+            *[getattr(StudentMetric, c) for c in METRIC_COLUMNS],
+            Student.advisor_id,
+            Student.department,
+            RiskScore.risk_score.label("prev_score"),
+        )
+        .join(Student, Student.id == StudentMetric.student_id)
+        .outerjoin(RiskScore, RiskScore.student_id == StudentMetric.student_id)
+        .order_by(StudentMetric.student_id)
+    )
 
-    processed = 0
-    distribution = {
-        RiskLevel.HIGH: 0,
-        RiskLevel.MODERATE: 0,
-        RiskLevel.STABLE: 0,
-        RiskLevel.SAFE: 0,
+    if student_ids is None:
+        rows = query.all()
+    else:
+        ids = list(dict.fromkeys(student_ids))
+        rows = []
+        for start in range(0, len(ids), BATCH_CHUNK_SIZE):
+            rows.extend(
+                query.filter(
+                    StudentMetric.student_id.in_(ids[start:start + BATCH_CHUNK_SIZE])
+                ).all()
+            )
+
+    return pd.DataFrame([tuple(r) for r in rows], columns=columns)
+
+
+def _score_chunk(model: RiskModel, chunk: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Score a chunk of metric rows with one predict_proba call."""
+    X = _metrics_frame_to_features(chunk)
+    raw_scores = np.nan_to_num(model.predict_risk_scores(X), nan=50.0)
+    explanations = _explain_batch(X)
+
+    results: List[Dict[str, Any]] = []
+    for pos, (student_id, advisor_id, department, prev) in enumerate(
+        zip(chunk["student_id"], chunk["advisor_id"], chunk["department"], chunk["prev_score"])
+    ):
+        raw = float(raw_scores[pos])
+        risk_score = _clamp(round(raw, 2))
+        prev_score = None if pd.isna(prev) else float(prev)
+        risk_trend, risk_value = RiskModel.calculate_risk_trend(risk_score, prev_score)
+
+        results.append({
+            "student_id": student_id,
+            "risk_score": round(risk_score, 2),
+            "risk_level": RiskModel._get_risk_level(raw),
+            "risk_trend": risk_trend,
+            "risk_value": risk_value,
+            "shap_explanation": explanations[pos],
+            "model_version_id": _active_model_version_id,
+            "advisor_id": advisor_id,
+            "department": department,
+            "prev_score": prev_score,
+        })
+    return results
+
+
+def _save_risk_results(
+    results: List[Dict[str, Any]],
+    db: Session,
+    refresh_documents: bool = False,
+) -> Dict[str, int]:
+    """
+    Persist a scored chunk set-wise: one read of the previous scores (for
+    the cohort deltas), one RiskScore upsert, one RiskHistory insert for
+    the scores that moved by SCORE_CHANGE_THRESHOLD or more, one cohort
+    aggregate update per touched department and an intervention sweep over
+    the chunk's HIGH students.  The chunk's profile documents are dropped
+    (rebuilt on first view), or rebuilt in place with *refresh_documents*.
+    Returns the sweep summary.
+    """
+    if not results:
+        return sweep_high_risk_interventions(db, [])
+
+    student_ids = [r["student_id"] for r in results]
+    lock_cohort_aggregates(db)
+    previous = {
+        row.student_id: row
+        for row in db.execute(
+            select(RiskScore.student_id, RiskScore.risk_score, RiskScore.risk_level)
+            .where(RiskScore.student_id.in_(student_ids))
+            .with_for_update()
+        )
     }
 
-    for student in students:
-        try:
-            r = compute_student_risk(student.id, db, save_to_db=True)
-            distribution[r["risk_level"]] += 1
-            processed += 1
-        except Exception as exc:
-            logger.error(f"Failed risk computation for {student.id}: {exc}")
+    now = datetime.utcnow()
+    scores: List[Dict[str, Any]] = []
+    history: List[Dict[str, Any]] = []
+    deltas = CohortDeltas()
+    for result in results:
+        old = previous.get(result["student_id"])
+        deltas.risk_changed(
+            result["department"],
+            old.risk_score if old else None,
+            old.risk_level if old else None,
+            result["risk_score"],
+            result["risk_level"],
+        )
+        scores.append({
+            "student_id": result["student_id"],
+            "risk_score": result["risk_score"],
+            "risk_level": result["risk_level"],
+            "risk_trend": result["risk_trend"],
+            "risk_value": result["risk_value"],
+            "shap_explanation": result["shap_explanation"],
+            "model_version_id": result["model_version_id"],
+            "predicted_at": now,
+            "updated_at": now,
+        })
+
+        prev_score = result["prev_score"]
+        if prev_score is None or abs(result["risk_score"] - prev_score) >= SCORE_CHANGE_THRESHOLD:
+            history.append({
+                "student_id": result["student_id"],
+                "risk_score": result["risk_score"],
+                "risk_level": result["risk_level"],
+                "model_version_id": result["model_version_id"],
+                "recorded_at": now,
+            })
+
+    db.flush()
+    bulk_upsert(db, RiskScore, scores, ["student_id"])
+    if history:
+        db.execute(insert(RiskHistory), history)
+    deltas.apply(db)
+    sweep = sweep_high_risk_interventions(
+        db, [r["student_id"] for r in results if r["risk_level"] == RiskLevel.HIGH]
+    )
+    _expire_risk_state(db, set(student_ids))
+    if refresh_documents:
+        refresh_profiles(db, student_ids)
+    else:
+        invalidate_profiles(db, student_ids)
+    return sweep
 
-        if processed % 50 == 0:
-            logger.info(f"Batch progress: {processed}/{total}")
 
-    db.commit()
-    logger.info(f"Batch complete: {processed}/{total} students processed")
+def _expire_risk_state(db: Session, student_ids: set) -> None:
+    """Expire session objects the set-based writes above bypassed."""
+    for obj in list(db.identity_map.values()):
+        if isinstance(obj, RiskScore) and obj.student_id in student_ids:
+            db.expire(obj)
+        elif isinstance(obj, Student) and obj.id in student_ids:
+            db.expire(obj, ["risk_score", "risk_history", "interventions"])
+
+
+def _empty_distribution() -> Dict[RiskLevel, int]:
+    return {level: 0 for level in (
+        RiskLevel.HIGH, RiskLevel.MODERATE, RiskLevel.STABLE, RiskLevel.SAFE,
+    )}
+
+
+def _batch_summary(
+    total: int,
+    processed: int,
+    distribution: Dict[RiskLevel, int],
+    started: float,
+    interventions_created: int = 0,
+) -> Dict[str, Any]:
+    elapsed = time.perf_counter() - started if total else 0.0
+    throughput = processed / elapsed if elapsed > 0 else 0.0
     return {
         "total": total,
         "processed": processed,
         "risk_distribution": {k.value: v for k, v in distribution.items()},
+        "interventions_created": interventions_created,
+        "elapsed_seconds": round(elapsed, 3),
+        "students_per_second": round(throughput, 1),
     }
 
 
+def compute_risk_scores_batch(
+    db: Session,
+    student_ids: Optional[Iterable[str]] = None,
+    chunk_size: int = BATCH_CHUNK_SIZE,
+    stage: Optional[Callable[[str], ContextManager]] = None,
+    on_progress: Optional[Callable[[int, int], None]] = None,
+) -> Dict[str, Any]:
+    """
+    Vectorised risk computation for many students.
+
+    Loads all metric rows in one columnar query, scores them with one
+    predict_proba call per *chunk_size* rows and persists each chunk in
+    bulk (committing per chunk).  Restrict to *student_ids* if given.
+
+    *stage(name)*, if given, wraps the "inference" and "persistence" steps;
+    *on_progress(processed, total)* is called after every chunk.
+    """
+    model = _require_model()
+    started = time.perf_counter()
+    frame = _load_metric_frame(db, student_ids)
+    return _score_metric_frame(db, model, frame, started, chunk_size, stage, on_progress)
+
+
+def _score_metric_frame(
+    db: Session,
+    model: RiskModel,
+    frame: pd.DataFrame,
+    started: float,
+    chunk_size: int = BATCH_CHUNK_SIZE,
+    stage: Optional[Callable[[str], ContextManager]] = None,
+    on_progress: Optional[Callable[[int, int], None]] = None,
+) -> Dict[str, Any]:
+    """Serial scoring loop of ``compute_risk_scores_batch`` over a loaded frame."""
+    stage = stage or (lambda name: nullcontext())
+    total = len(frame)
+    distribution = _empty_distribution()
+    if total == 0:
+        logger.warning("No students with metrics found")
+        return _batch_summary(0, 0, distribution, started)
+
+    processed = 0
+    interventions_created = 0
+    for start in range(0, total, chunk_size):
+        chunk = frame.iloc[start:start + chunk_size]
+        try:
+            with stage("inference"):
+                results = _score_chunk(model, chunk)
+            with stage("persistence"):
+                sweep = _save_risk_results(results, db)
+                db.commit()
+            bump_data_generation()
+        except Exception as exc:
+            db.rollback()
+            logger.error(f"Batch chunk {start}-{start + len(chunk)} failed: {exc}")
+            continue
+
+        for r in results:
+            distribution[r["risk_level"]] += 1
+        processed += len(results)
+        interventions_created += sweep["created"]
+        logger.info(f"Batch progress: {processed}/{total}")
+        if on_progress:
+            on_progress(processed, total)
+
+    summary = _batch_summary(total, processed, distribution, started, interventions_created)
+    logger.info(
+        f"Batch complete: {processed}/{total} students processed "
+        f"in {summary['elapsed_seconds']:.2f}s ({summary['students_per_second']:.0f} students/s)"
+    )
+    return summary
+
+
+def compute_all_risk_scores(db: Session) -> Dict[str, Any]:
+    """
+    Compute risk for every student that has feature metrics — on a process
+    pool when ``settings.scoring_workers`` allows more than one worker.
+    """
+    from app.services.parallel_scoring import compute_risk_scores_parallel, resolve_worker_count
+
+    if resolve_worker_count() > 1:
+        return compute_risk_scores_parallel(db)
+    return compute_risk_scores_batch(db)
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # Legacy class wrapper (used by existing scripts / tests)
 # ─────────────────────────────────────────────────────────────────────────────
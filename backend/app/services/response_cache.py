@@ -0,0 +1,158 @@
+"""
+Response cache for read-heavy dashboard endpoints.
+
+Responses of the paths given to ``ResponseCacheMiddleware`` are cached by
+(path, query string) and tagged with the data generation they were built
+from.  Writers of students, metrics and risk scores — uploads, analysis
+persist, recalculation — call ``bump_data_generation()`` after they
+commit, which makes every older entry stale at once.  Each cached body
+carries an ETag, so a client revalidating with If-None-Match gets a 304.
+
+The generation counter is per process, matching the single-worker
+deployment (uvicorn --workers 1) and the SHAP cache.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app.config import get_settings
+
+_generation = 0
+_generation_lock = threading.Lock()
+
+
+def bump_data_generation() -> int:
+    """Invalidate every cached response; call after committing data changes."""
+    global _generation
+    with _generation_lock:
+        _generation += 1
+        return _generation
+
+
+def current_generation() -> int:
+    return _generation
+
+
+class CachedResponse:
+    __slots__ = ("generation", "body", "media_type", "etag")
+
+    def __init__(self, generation: int, body: bytes, media_type: Optional[str]):
+        self.generation = generation
+        self.body = body
+        self.media_type = media_type
+        self.etag = f'"{generation}-{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+class ResponseCache:
+    """Bounded LRU of rendered responses, valid for one data generation."""
+
+    def __init__(self, max_size: int):
+        """
+        Args:
+            max_size: Maximum number of cached responses (0 disables caching)
+        """
+        self.max_size = max(0, int(max_size))
+        self._entries: "OrderedDict[Tuple[str, str], CachedResponse]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    def get(self, key: Tuple[str, str], generation: int) -> Optional[CachedResponse]:
+        """The entry for *key* if it was built at *generation*, else None (a miss)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.generation != generation:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: Tuple[str, str], entry: CachedResponse) -> None:
+        if self.max_size == 0:
+            return
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def record_not_modified(self) -> None:
+        with self._lock:
+            self.not_modified += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.not_modified = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit / miss / 304 counters for monitoring."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "generation": _generation,
+                "hits": self.hits,
+                "misses": self.misses,
+                "not_modified": self.not_modified,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+response_cache = ResponseCache(get_settings().response_cache_size)
+
+
+def get_response_cache_stats() -> Dict[str, Any]:
+    return response_cache.stats()
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+class ResponseCacheMiddleware(BaseHTTPMiddleware):
+    """Serve GETs of *paths* from ``response_cache`` with ETag revalidation."""
+
+    def __init__(self, app: Any, paths: Iterable[str], cache: ResponseCache = response_cache):
+        super().__init__(app)
+        self.paths = frozenset(paths)
+        self.cache = cache
+
+    async def dispatch(self, request: Request, call_next: Any) -> Response:
+        if request.method != "GET" or request.url.path not in self.paths:
+            return await call_next(request)
+
+        key = (request.url.path, str(request.query_params))
+        generation = current_generation()
+        entry = self.cache.get(key, generation)
+        status = "HIT"
+        if entry is None:
+            response = await call_next(request)
+            if response.status_code != 200:
+                return response
+            body = b"".join([chunk async for chunk in response.body_iterator])
+            # Tagged with the generation read before rendering, so a write
+            # that lands meanwhile makes this entry stale rather than hiding it
+            entry = CachedResponse(generation, body, response.headers.get("content-type"))
+            self.cache.put(key, entry)
+            status = "MISS"
+
+        headers = {"ETag": entry.etag, "Cache-Control": "no-cache", "X-Cache": status}
+        if _etag_matches(request.headers.get("if-none-match"), entry.etag):
+            self.cache.record_not_modified()
+            return Response(status_code=304, headers=headers)
+        return Response(entry.body, headers={**headers, "Content-Type": entry.media_type or "application/json"})
@@ -19,8 +19,11 @@ from app.models import (
     ModelVersion, Intervention, InterventionStatus
 )
 from app.services.risk_model import RiskModel, ModelVersionManager
+from app.services.cohort_aggregates import CohortDeltas, lock_cohort_aggregates
 from app.services.feature_engineering import FeatureEngineer
+from app.services.response_cache import bump_data_generation
 from app.services.shap_explainer import SHAPExplainer
+from app.services.student_profiles import refresh_profiles
 from app.config import get_settings
 
 settings = get_settings()
@@ -309,6 +312,18 @@ class RealTimeRiskService:
             raise ValueError("No active model found")
         
         # Update or create risk score
+        lock_cohort_aggregates(self.db)
+        if student.risk_score:
+            self.db.refresh(student.risk_score, with_for_update=True)
+        deltas = CohortDeltas()
+        existing = student.risk_score
+        deltas.risk_changed(
+            student.department,
+            existing.risk_score if existing else None,
+            existing.risk_level if existing else None,
+            risk_prediction['risk_score'],
+            risk_prediction['risk_level'],
+        )
         if student.risk_score:
             student.risk_score.risk_score = risk_prediction['risk_score']
             student.risk_score.risk_level = risk_prediction['risk_level']
@@ -349,7 +364,10 @@ class RealTimeRiskService:
         )
         
         # Commit changes
+        deltas.apply(self.db)
+        refresh_profiles(self.db, [student_id])
         self.db.commit()
+        bump_data_generation()
         
         logger.info(
             f"Risk computed for {student_id}: "
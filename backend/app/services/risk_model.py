@@ -197,7 +197,23 @@ class RiskModel:
             'risk_level': risk_level,
             'risk_value': risk_value
         }
-    
+
+    def predict_risk_scores(self, X: pd.DataFrame) -> np.ndarray:
+        """
+        Predict risk scores (0-100) for every row of X in a single call.
+
+        Args:
+            X: Feature DataFrame (N rows)
+
+        Returns:
+            Array of N calibrated risk scores
+        """
+        if self.calibrated_model is None:
+            raise ValueError("Model not trained. Call train() first.")
+
+        probabilities = self.calibrated_model.predict_proba(X)
+        return probabilities[:, 1] * 100
+
     @staticmethod
     def _get_risk_level(risk_score: float) -> RiskLevel:
         """
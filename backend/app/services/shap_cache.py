@@ -0,0 +1,82 @@
+"""
+Content-addressed cache for SHAP explanations.
+
+Explanations depend only on the model and the feature vector, so they are
+keyed by (model version, top_n, quantised feature row).  Bounded LRU,
+sized by ``settings.shap_cache_size``; thread-safe for the worker pool.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+import numpy as np
+
+
+class SHAPExplanationCache:
+    """Bounded LRU cache of storage-form SHAP explanations."""
+
+    def __init__(self, max_size: int, decimals: int = 4):
+        """
+        Args:
+            max_size: Maximum number of cached explanations (0 disables caching)
+            decimals: Feature values are rounded to this many decimals for the key
+        """
+        self.max_size = max(0, int(max_size))
+        self.decimals = decimals
+        self._entries: "OrderedDict[Hashable, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def key(self, model_version_id: Optional[int], top_n: int, row: np.ndarray) -> Tuple:
+        """Build the cache key for one feature row."""
+        quantised = np.round(np.asarray(row, dtype=float), self.decimals) + 0.0  # fold -0.0
+        return (model_version_id, top_n, quantised.tobytes())
+
+    def get(self, key: Hashable) -> Optional[Dict[str, Any]]:
+        """Return a copy of the cached explanation, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return _copy(entry)
+
+    def put(self, key: Hashable, explanation: Dict[str, Any]) -> None:
+        """Store an explanation, evicting the least recently used entries."""
+        if self.max_size == 0:
+            return
+        with self._lock:
+            self._entries[key] = _copy(explanation)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop every entry (e.g. when a new model is registered)."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit / miss / eviction counters for monitoring."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+def _copy(explanation: Dict[str, Any]) -> Dict[str, Any]:
+    return {"top_factors": [dict(f) for f in explanation.get("top_factors", [])]}
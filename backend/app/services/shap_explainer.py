@@ -13,6 +13,46 @@ from loguru import logger
 from app.schemas import SHAPFactor
 
 
+class BatchExplanation:
+    """
+    Compact top-N SHAP factors for a batch of rows.
+
+    Holds parallel (N, top_n) arrays — feature indices, absolute impacts and
+    a positive-direction mask — so callers can persist explanations without
+    building one SHAPFactor per factor.
+    """
+
+    def __init__(
+        self,
+        feature_names: List[str],
+        indices: np.ndarray,
+        impacts: np.ndarray,
+        positive: np.ndarray,
+    ):
+        self.feature_names = [SHAPExplainer._format_feature_name(f) for f in feature_names]
+        self.indices = indices
+        self.impacts = impacts
+        self.positive = positive
+
+    def __len__(self) -> int:
+        return len(self.indices)
+
+    def to_storage(self, row: int) -> Dict[str, Any]:
+        """Storage-form explanation (``{"top_factors": [...]}``) for one row."""
+        return {
+            'top_factors': [
+                {
+                    'feature': self.feature_names[idx],
+                    'impact': round(float(impact), 3),
+                    'direction': 'positive' if positive else 'negative',
+                }
+                for idx, impact, positive in zip(
+                    self.indices[row], self.impacts[row], self.positive[row]
+                )
+            ]
+        }
+
+
 class SHAPExplainer:
     """
     SHAP TreeExplainer for XGBoost model interpretability.
@@ -77,53 +117,90 @@ class SHAPExplainer:
         Returns:
             List of SHAPFactor objects with top contributing features
         """
+        batch = self.explain_batch(X.iloc[:1], top_n=top_n)
+        if batch is None:
+            return []
+
+        return [
+            SHAPFactor(**factor)
+            for factor in batch.to_storage(0)['top_factors']
+        ]
+
+    def explain_batch(
+        self,
+        X: pd.DataFrame,
+        top_n: int = 5
+    ) -> Optional["BatchExplanation"]:
+        """
+        Generate SHAP explanations for every row of X with one matrix call.
+
+        Top-N selection uses ``np.argpartition`` per row; ties on the
+        boundary resolve to the earlier feature, matching a stable sort.
+        
+        Args:
+            X: Feature DataFrame (N rows)
+            top_n: Number of top features to keep per row
+            
+        Returns:
+            BatchExplanation with (N, top_n) factor arrays, or None on failure
+        """
         if self.explainer is None:
             logger.warning("SHAP explainer not initialized")
-            return []
+            return None
         
         try:
-            # Calculate SHAP values
             shap_values = self.explainer.shap_values(X)
             
-            # Get feature names
-            feature_names = X.columns.tolist()
-            
-            # For binary classification, shap_values may be 2D or 3D
+            # For binary classification, shap_values may be a per-class list
+            # or a 3D (rows, features, classes) array — use class 1 (dropout)
             if isinstance(shap_values, list):
-                # Multi-class output (use class 1 for dropout)
-                shap_values_dropout = shap_values[1][0]
+                values = np.asarray(shap_values[1])
             else:
-                # Single output
-                shap_values_dropout = shap_values[0]
+                values = np.asarray(shap_values)
+                if values.ndim == 3:
+                    values = values[:, :, 1]
+            values = values.reshape(len(X), -1)
             
-            # Create feature importance list
-            feature_impacts = []
-            for feature, impact in zip(feature_names, shap_values_dropout):
-                feature_impacts.append({
-                    'feature': feature,
-                    'impact': abs(float(impact)),
-                    'direction': 'positive' if impact > 0 else 'negative'
-                })
+            n_rows, n_features = values.shape
+            k = min(top_n, n_features)
+            if n_rows == 0 or k == 0:
+                return BatchExplanation(
+                    X.columns.tolist(),
+                    np.empty((n_rows, 0), dtype=int),
+                    np.empty((n_rows, 0)),
+                    np.empty((n_rows, 0), dtype=bool),
+                )
             
-            # Sort by absolute impact (descending)
-            feature_impacts.sort(key=lambda x: x['impact'], reverse=True)
+            magnitude = np.abs(values)
             
-            # Take top N
-            top_factors = feature_impacts[:top_n]
+            # k-th largest magnitude per row, then select everything above it
+            # plus the lowest-index features equal to it until k are chosen
+            kth_idx = np.argpartition(-magnitude, k - 1, axis=1)[:, k - 1:k]
+            kth = np.take_along_axis(magnitude, kth_idx, axis=1)
+            above = magnitude > kth
+            equal = magnitude == kth
+            needed = k - above.sum(axis=1, keepdims=True)
+            selected = above | (equal & (np.cumsum(equal, axis=1) <= needed))
+            candidates = np.nonzero(selected)[1].reshape(n_rows, k)
             
-            # Convert to SHAPFactor objects
-            return [
-                SHAPFactor(
-                    feature=self._format_feature_name(factor['feature']),
-                    impact=round(factor['impact'], 3),
-                    direction=factor['direction']
-                )
-                for factor in top_factors
-            ]
+            # Order the k candidates by descending magnitude (stable)
+            order = np.argsort(
+                -np.take_along_axis(magnitude, candidates, axis=1),
+                axis=1,
+                kind='stable',
+            )
+            indices = np.take_along_axis(candidates, order, axis=1)
+            
+            return BatchExplanation(
+                X.columns.tolist(),
+                indices,
+                np.take_along_axis(magnitude, indices, axis=1),
+                np.take_along_axis(values, indices, axis=1) > 0,
+            )
             
         except Exception as e:
             logger.error(f"Failed to generate SHAP explanation: {e}")
-            return []
+            return None
     
     @staticmethod
     def _format_feature_name(feature: str) -> str:
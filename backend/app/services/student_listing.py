@@ -0,0 +1,157 @@
+"""
+Keyset-paginated student listing.
+
+Pages are ordered by (risk_score, student_id) and continue from an opaque
+cursor holding the last row's key, so every page is an index range scan
+of the same cost — no OFFSET.  Filters on department, section, risk level
+and advisor are served by the composite indexes on students / risk_scores.
+Only students with a risk score are listed (the sort key must be set).
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+from typing import Any, List, Optional, Tuple
+
+from sqlalchemy import select, tuple_
+from sqlalchemy.orm import Session
+
+from app.models import Department, RiskLevel, RiskScore, Section, Student, StudentMetric
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Lenient filter parsing (unknown values ignore the filter rather than 422)
+# ─────────────────────────────────────────────────────────────────────────────
+
+def parse_department(raw: Optional[str]) -> Optional[Department]:
+    """Match a department by value or name, then by partial value."""
+    if not raw:
+        return None
+    for dept in Department:
+        if dept.value.lower() == raw.lower() or dept.name.lower() == raw.lower():
+            return dept
+    for dept in Department:
+        if raw.lower() in dept.value.lower():
+            return dept
+    return None
+
+
+def parse_risk_level(raw: Optional[str]) -> Optional[RiskLevel]:
+    """Match a risk level by value or name."""
+    if not raw:
+        return None
+    for rl in RiskLevel:
+        if rl.value.lower() == raw.lower() or rl.name.lower() == raw.lower():
+            return rl
+    return None
+
+
+def parse_section(raw: Optional[str]) -> Optional[Section]:
+    """Match a section by value."""
+    if not raw:
+        return None
+    for section in Section:
+        if section.value.lower() == raw.strip().lower():
+            return section
+    return None
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Cursors
+# ─────────────────────────────────────────────────────────────────────────────
+
+def encode_cursor(risk_score: float, student_id: str) -> str:
+    """Opaque cursor for the row *after* (risk_score, student_id)."""
+    raw = json.dumps([risk_score, student_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[float, str]:
+    """
+    Raises:
+        ValueError: the cursor was not produced by ``encode_cursor``
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        risk_score, student_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return float(risk_score), str(student_id)
+    except Exception as exc:
+        raise ValueError(f"Invalid cursor '{cursor}'") from exc
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Query
+# ─────────────────────────────────────────────────────────────────────────────
+
+def list_students_page(
+    db: Session,
+    department: Optional[Department] = None,
+    section: Optional[Section] = None,
+    risk_level: Optional[RiskLevel] = None,
+    advisor: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    descending: bool = True,
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    One page of students ordered by (risk_score, id), highest risk first
+    unless *descending* is False.
+
+    Returns:
+        (rows, next_cursor) — column rows and the cursor for the following
+        page, or None on the last page
+
+    Raises:
+        ValueError: invalid *cursor*
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    key = tuple_(RiskScore.risk_score, RiskScore.student_id)
+
+    stmt = (
+        select(
+            Student.id,
+            Student.name,
+            Student.avatar,
+            Student.department,
+            Student.course,
+            Student.section,
+            Student.advisor_id,
+            RiskScore.risk_score,
+            RiskScore.risk_level,
+            RiskScore.risk_trend,
+            RiskScore.risk_value,
+            RiskScore.updated_at,
+            StudentMetric.attendance_rate,
+            StudentMetric.engagement_score,
+            StudentMetric.academic_performance_index,
+        )
+        .join(RiskScore, RiskScore.student_id == Student.id)
+        .outerjoin(StudentMetric, StudentMetric.student_id == Student.id)
+    )
+
+    if department:
+        stmt = stmt.where(Student.department == department)
+    if section:
+        stmt = stmt.where(Student.section == section)
+    if risk_level:
+        stmt = stmt.where(RiskScore.risk_level == risk_level)
+    if advisor:
+        stmt = stmt.where(Student.advisor_id == advisor)
+    if cursor:
+        after = tuple_(*decode_cursor(cursor))
+        stmt = stmt.where(key < after if descending else key > after)
+
+    if descending:
+        stmt = stmt.order_by(RiskScore.risk_score.desc(), RiskScore.student_id.desc())
+    else:
+        stmt = stmt.order_by(RiskScore.risk_score.asc(), RiskScore.student_id.asc())
+
+    rows = db.execute(stmt.limit(limit + 1)).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1].risk_score, rows[-1].id)
@@ -0,0 +1,206 @@
+"""
+Precomputed faculty profile documents.
+
+``GET /api/faculty/students/{id}`` used to assemble the profile from the
+student, metrics, risk score, the last 30 history rows, the stored SHAP
+JSON and every intervention on each request.  The assembled
+FacultyStudentProfile is now stored per student in ``student_profiles``
+and the view is a single primary-key read.
+
+Single-student risk persistence (``_save_risk_result``) and the
+intervention endpoints call ``refresh_profiles`` in their transaction.
+Batch scoring (``_save_risk_results``), feature refreshes and bulk imports,
+which touch many students that are rarely viewed, call
+``invalidate_profiles`` instead; a missing document is built on first read.
+"""
+
+from __future__ import annotations
+
+import math
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import delete, desc, func, select
+from sqlalchemy.orm import Session, selectinload
+
+from app.database import bulk_upsert
+from app.models import (
+    Intervention,
+    RiskHistory,
+    RiskLevel,
+    RiskTrend,
+    Student,
+    StudentProfileDocument,
+)
+from app.schemas import FacultyStudentProfile
+
+PROFILE_HISTORY_LIMIT = 30
+PROFILE_BATCH = 500
+
+
+def _safe(value, default=0.0):
+    try:
+        v = float(value)
+        return default if (math.isnan(v) or math.isinf(v)) else v
+    except (TypeError, ValueError):
+        return default
+
+
+def build_profile(
+    student: Student,
+    history: Iterable[RiskHistory],
+    interventions: Iterable[Intervention],
+) -> FacultyStudentProfile:
+    """Assemble the faculty profile from a student with metrics / risk score loaded."""
+    m = student.metrics
+    r = student.risk_score
+
+    shap_factors = []
+    if r and r.shap_explanation and isinstance(r.shap_explanation, dict):
+        shap_factors = [
+            {
+                "feature": f.get("feature", ""),
+                "impact": _safe(f.get("impact", 0.0)),
+                "direction": f.get("direction", "positive"),
+            }
+            for f in r.shap_explanation.get("top_factors", [])
+        ]
+
+    return FacultyStudentProfile(
+        id=student.id,
+        name=student.name,
+        avatar=student.avatar or student.name[:2].upper(),
+        department=student.department.value if student.department else "",
+        course=student.course,
+        section=student.section.value if student.section else "",
+        advisor=student.advisor_id,
+        created_at=student.created_at,
+        # features
+        attendance_rate=_safe(m.attendance_rate if m else 0.0),
+        engagement_score=_safe(m.engagement_score if m else 0.0),
+        academic_performance_index=_safe(m.academic_performance_index if m else 0.0),
+        failure_ratio=_safe(m.failure_ratio if m else 0.0),
+        semester_performance_trend=_safe(m.semester_performance_trend if m else 0.0),
+        login_gap_days=int(_safe(m.login_gap_days if m else 3, 3)),
+        financial_risk_flag=bool(m.financial_risk_flag if m else False),
+        commute_risk_score=int(_safe(m.commute_risk_score if m else 1, 1)),
+        # risk
+        risk_score=_safe(r.risk_score if r else 0.0),
+        risk_level=(r.risk_level.value if r else RiskLevel.SAFE.value),
+        risk_trend=(r.risk_trend.value if r else RiskTrend.STABLE.value),
+        risk_value=(r.risk_value if r else "Stable"),
+        risk_history=[
+            {"risk_score": _safe(h.risk_score), "risk_level": h.risk_level.value, "recorded_at": h.recorded_at}
+            for h in history
+        ],
+        shap_factors=shap_factors,
+        interventions=[
+            {
+                "id": i.id,
+                "intervention_type": i.intervention_type.value,
+                "status": i.status.value,
+                "assigned_to": i.assigned_to,
+                "notes": i.notes,
+                "created_at": i.created_at,
+            }
+            for i in interventions
+        ],
+    )
+
+
+def _recent_history(db: Session, student_ids: List[str]) -> Dict[str, List[Any]]:
+    """The last PROFILE_HISTORY_LIMIT history rows per student, newest first."""
+    ranked = select(
+        RiskHistory.student_id,
+        RiskHistory.risk_score,
+        RiskHistory.risk_level,
+        RiskHistory.recorded_at,
+        func.row_number().over(
+            partition_by=RiskHistory.student_id,
+            order_by=(desc(RiskHistory.recorded_at), desc(RiskHistory.id)),
+        ).label("rank"),
+    ).where(RiskHistory.student_id.in_(student_ids)).subquery()
+
+    history: Dict[str, List[Any]] = defaultdict(list)
+    for row in db.execute(
+        select(ranked).where(ranked.c.rank <= PROFILE_HISTORY_LIMIT).order_by(ranked.c.student_id, ranked.c.rank)
+    ):
+        history[row.student_id].append(row)
+    return history
+
+
+def _profile_rows(db: Session, student_ids: List[str], now: datetime) -> List[Dict[str, Any]]:
+    """student_profiles rows for *student_ids*: three reads, whatever the count."""
+    students = (
+        db.query(Student)
+        .options(selectinload(Student.metrics), selectinload(Student.risk_score))
+        .filter(Student.id.in_(student_ids))
+        .populate_existing()
+        .all()
+    )
+    if not students:
+        return []
+    history = _recent_history(db, student_ids)
+    interventions: Dict[str, List[Intervention]] = defaultdict(list)
+    for i in db.query(Intervention).filter(Intervention.student_id.in_(student_ids)).order_by(Intervention.id):
+        interventions[i.student_id].append(i)
+
+    return [
+        {
+            "student_id": s.id,
+            "document": build_profile(s, history[s.id], interventions[s.id]).model_dump(mode="json"),
+            "built_at": now,
+        }
+        for s in students
+    ]
+
+
+def refresh_profiles(db: Session, student_ids: Iterable[str]) -> int:
+    """
+    Rebuild the stored profile of each student in *student_ids* (unknown ids
+    are ignored) in the caller's transaction, PROFILE_BATCH students per
+    upsert.  Returns the number of documents written.
+    """
+    ids = list(dict.fromkeys(student_ids))
+    if not ids:
+        return 0
+    db.flush()
+
+    now = datetime.utcnow()
+    written = 0
+    for start in range(0, len(ids), PROFILE_BATCH):
+        rows = _profile_rows(db, ids[start:start + PROFILE_BATCH], now)
+        bulk_upsert(db, StudentProfileDocument, rows, ["student_id"])
+        written += len(rows)
+    return written
+
+
+def invalidate_profiles(db: Session, student_ids: Optional[Iterable[str]] = None) -> None:
+    """Drop the stored profiles of *student_ids* (all when None); reads rebuild them."""
+    stmt = delete(StudentProfileDocument)
+    if student_ids is None:
+        db.execute(stmt)
+        return
+    ids = list(dict.fromkeys(student_ids))
+    for start in range(0, len(ids), PROFILE_BATCH):
+        db.execute(stmt.where(StudentProfileDocument.student_id.in_(ids[start:start + PROFILE_BATCH])))
+
+
+def get_profile_document(db: Session, student_id: str) -> Optional[Dict[str, Any]]:
+    """
+    The stored profile of *student_id*, building and committing it on a miss.
+    Returns None if the student does not exist.
+    """
+    document = db.execute(
+        select(StudentProfileDocument.document).where(StudentProfileDocument.student_id == student_id)
+    ).scalar()
+    if document is not None:
+        return document
+
+    rows = _profile_rows(db, [student_id], datetime.utcnow())
+    if not rows:
+        return None
+    bulk_upsert(db, StudentProfileDocument, rows, ["student_id"])
+    db.commit()
+    return rows[0]["document"]
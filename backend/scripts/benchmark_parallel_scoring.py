@@ -0,0 +1,85 @@
+"""
+Benchmark full risk recalculation: serial batch path vs. process pool.
+
+Loads the active ModelVersion, then recomputes every student's risk once
+per worker count and prints a speedup report against the serial path.
+All runs share one outer transaction that is rolled back at the end (the
+per-chunk commits only release savepoints), so the benchmark leaves risk
+scores, history and interventions untouched.
+
+Usage:
+    python scripts/benchmark_parallel_scoring.py --workers 2 4 8
+"""
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.database import engine
+from app.models import ModelVersion
+from app.services.risk_model import RiskModel
+from app.services.shap_explainer import SHAPExplainer
+from app.services.realtime_prediction import init_prediction_service, compute_risk_scores_batch
+from app.services.parallel_scoring import compute_risk_scores_parallel, resolve_worker_count
+from loguru import logger
+
+
+def _enable_sqlite_savepoints() -> None:
+    """pysqlite defers BEGIN and commits on RELEASE SAVEPOINT; let SQLAlchemy drive transactions."""
+    @event.listens_for(engine, "connect")
+    def _no_pysqlite_transactions(dbapi_connection, _):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def _begin(connection):
+        connection.exec_driver_sql("BEGIN")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[0],
+                        help="worker counts to compare with the serial path (0 = one per core)")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="students per shard")
+    args = parser.parse_args()
+
+    if engine.dialect.name == "sqlite":
+        _enable_sqlite_savepoints()
+    connection = engine.connect()
+    outer = connection.begin()
+    db = Session(bind=connection, join_transaction_mode="create_savepoint")
+    try:
+        active = db.query(ModelVersion).filter(ModelVersion.is_active == True).first()
+        if not active:
+            logger.error("No active model version — train a model first")
+            sys.exit(1)
+
+        risk_model = RiskModel()
+        risk_model.load(active.model_path)
+        init_prediction_service(risk_model, SHAPExplainer(risk_model.calibrated_model), model_version_id=active.id)
+
+        serial = compute_risk_scores_batch(db, chunk_size=args.chunk_size)
+        rows = [("serial", 1, serial["elapsed_seconds"], serial["students_per_second"], 1.0)]
+
+        for workers in args.workers:
+            workers = resolve_worker_count(workers)
+            result = compute_risk_scores_parallel(db, workers=workers, chunk_size=args.chunk_size)
+            speedup = serial["elapsed_seconds"] / result["elapsed_seconds"] if result["elapsed_seconds"] else 0.0
+            rows.append(("parallel", result["workers"], result["elapsed_seconds"],
+                         result["students_per_second"], speedup))
+    finally:
+        db.close()
+        outer.rollback()  # discard every score the benchmark wrote
+        connection.close()
+
+    print(f"\nStudents scored: {serial['processed']} (shard size {args.chunk_size})")
+    print(f"{'engine':<10} {'workers':>7} {'seconds':>9} {'students/s':>11} {'speedup':>8}")
+    for mode, workers, seconds, throughput, speedup in rows:
+        print(f"{mode:<10} {workers:>7} {seconds:>9.2f} {throughput:>11.1f} {speedup:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
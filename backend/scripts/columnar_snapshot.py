@@ -0,0 +1,60 @@
+"""
+Export the risk snapshot as Parquet / Arrow IPC, or seed student_metrics from one.
+
+Export writes students, student_metrics, risk_scores and risk_history
+into one file each; import upserts student_metrics from a file with the
+columns of the student_metrics snapshot (pyarrow required).
+
+Usage:
+    python scripts/columnar_snapshot.py export --out snapshots/2026-01-01 --format parquet
+    python scripts/columnar_snapshot.py import-metrics snapshots/2026-01-01/student_metrics.parquet
+"""
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.database import SessionLocal
+from app.services.columnar_snapshot import FORMATS, export_snapshot, import_student_metrics
+from loguru import logger
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export = commands.add_parser("export", help="write every snapshot table")
+    export.add_argument("--out", required=True, help="output directory")
+    export.add_argument("--format", choices=list(FORMATS), default="parquet")
+
+    seed = commands.add_parser("import-metrics", help="upsert student_metrics from a file")
+    seed.add_argument("path")
+    seed.add_argument("--format", choices=list(FORMATS),
+                      help="defaults to the file extension")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if args.command == "export":
+            counts = export_snapshot(db, args.out, args.format)
+            for table, rows in counts.items():
+                logger.info(f"  {table}: {rows} rows")
+            logger.info(f"✓ Snapshot written to {args.out}")
+        else:
+            fmt = args.format or next(
+                (name for name, (ext, _) in FORMATS.items() if args.path.endswith(ext)), "parquet"
+            )
+            summary = import_student_metrics(db, args.path, fmt)
+            db.commit()
+            logger.info(f"✓ Imported student metrics: {summary}")
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Columnar snapshot {args.command} failed: {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -12,6 +12,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 import pandas as pd
 from app.database import SessionLocal
 from app.models import Student, StudentMetric, RiskScore, RiskLevel, RiskTrend, ModelVersion
+from app.services.cohort_aggregates import rebuild_cohort_aggregates
 from app.services.risk_model import RiskModel
 from loguru import logger
 
@@ -127,6 +128,7 @@ def compute_risk_scores():
                 logger.info(f"Processed {computed_count}/{len(students)} students...")
         
         # Commit all risk scores
+        rebuild_cohort_aggregates(db)
         db.commit()
         
         # Print summary
@@ -11,6 +11,7 @@ from app.services.risk_model import RiskModel
 from app.services.shap_explainer import SHAPExplainer
 from app.services.feature_engineering import FeatureEngineer
 from app.models import Student, StudentMetric, RiskScore
+from app.services.cohort_aggregates import rebuild_cohort_aggregates
 import pandas as pd
 from datetime import datetime
 from loguru import logger
@@ -90,6 +91,7 @@ def compute_all_risk_scores():
                 logger.info(f"Processed {count}/{len(students)} students...")
                 db.commit()
         
+        rebuild_cohort_aggregates(db)
         db.commit()
         logger.info(f"✓ Successfully computed risk scores for all {count} students")
         
@@ -8,6 +8,7 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 from app.database import SessionLocal
 from app.models import Student, StudentMetric, RiskScore, ModelVersion, RiskLevel, RiskTrend
+from app.services.cohort_aggregates import rebuild_cohort_aggregates
 from datetime import datetime
 from loguru import logger
 
@@ -110,6 +111,7 @@ def main():
                 logger.info(f"Processed {count} students...")
                 db.commit()
         
+        rebuild_cohort_aggregates(db)
         db.commit()
         logger.info(f"✓ Successfully computed risk scores for {count} students!")
         
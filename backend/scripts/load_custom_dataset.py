@@ -20,6 +20,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from app.database import SessionLocal
 from app.models import Student, StudentMetric, Department, Section
+from app.services.cohort_aggregates import rebuild_cohort_aggregates
 from loguru import logger
 
 
@@ -239,7 +240,8 @@ def load_custom_dataset(csv_path: str, db: SessionLocal):
                 logger.error(f"Failed to process row {idx} (ID: {row.get('ID', 'unknown')}): {e}")
                 continue
         
-        # Commit all changes
+        # Commit all changes; rows were inserted directly, so rebuild the cohort aggregates
+        rebuild_cohort_aggregates(db)
         db.commit()
         logger.info(f"✓ Successfully loaded {students_created} students into database")
         
@@ -21,6 +21,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from app.database import SessionLocal
 from app.models import Student, StudentMetric, Department, Section
+from app.services.cohort_aggregates import rebuild_cohort_aggregates
 from app.services.feature_engineering import FeatureEngineer
 from loguru import logger
 
@@ -168,7 +169,8 @@ def transform_and_load(df: pd.DataFrame, db: SessionLocal, max_students: int = 1
             logger.error(f"Failed to process row {idx}: {e}")
             continue
     
-    # Commit all changes
+    # Commit all changes; rows were inserted directly, so rebuild the cohort aggregates
+    rebuild_cohort_aggregates(db)
     db.commit()
     logger.info(f"✓ Successfully loaded {students_created} students into database")
 
@@ -24,6 +24,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from app.database import SessionLocal
 from app.models import Student, StudentMetric
+from app.services.cohort_aggregates import rebuild_cohort_aggregates
 from loguru import logger
 
 
@@ -128,6 +129,7 @@ def randomize_metrics():
                 db.commit()
                 logger.info(f"  Updated {updated}/{total} students...")
 
+        rebuild_cohort_aggregates(db)
         db.commit()
         logger.info(f"Done! Randomized metrics for {updated} students.")
         logger.info("Now run scripts/run_batch_risk.py to recompute risk scores.")
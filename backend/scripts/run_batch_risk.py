@@ -46,6 +46,7 @@ def main():
         logger.info("=" * 60)
         logger.info(f"Total students: {result['total']}")
         logger.info(f"Processed:      {result['processed']}")
+        logger.info(f"Throughput:     {result['students_per_second']} students/s")
         logger.info("Risk Distribution:")
         for level, count in result['risk_distribution'].items():
             pct = (count / result['processed'] * 100) if result['processed'] > 0 else 0
@@ -7,6 +7,7 @@ from app.models import (
     StudentMetric, StudentCodingProfile
 )
 from app.security import get_password_hash
+from app.services.cohort_aggregates import rebuild_cohort_aggregates
 from datetime import datetime, timedelta
 import random
 
@@ -152,6 +153,7 @@ def seed_data():
         )
         db.add(coding_profile)
         
+        rebuild_cohort_aggregates(db)
         db.commit()
         print("Seeding complete.")
         
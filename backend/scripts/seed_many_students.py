@@ -9,6 +9,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.database import SessionLocal, init_db
 from app.models import Student, StudentMetric, Department, Section, Course, Enrollment, Assessment, StudentAssessment, AttendanceRecord, AttendanceStatus, SubmissionStatus, AssessmentType
+from app.services.cohort_aggregates import rebuild_cohort_aggregates
 
 def seed_many_students(count=100):
     db = SessionLocal()
@@ -138,6 +139,7 @@ def seed_many_students(count=100):
                 db.commit()
                 print(f"Seeded {i} students...")
                 
+        rebuild_cohort_aggregates(db)
         db.commit()
         print("Seeding complete.")
         
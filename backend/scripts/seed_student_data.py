@@ -6,6 +6,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.database import SessionLocal
 from app.models import User, Student, Department, Role, Section, StudentMetric
+from app.services.cohort_aggregates import rebuild_cohort_aggregates
 # Need to import models to ensure tables are created if not present
 from app.database import init_db
 from datetime import datetime
@@ -39,6 +40,7 @@ def seed_student_data():
                     last_interaction=datetime.utcnow()
                 )
                 db.add(metrics)
+                rebuild_cohort_aggregates(db)
                 db.commit()
                 print("Metrics added.")
             return
@@ -75,6 +77,7 @@ def seed_student_data():
         
         # Link user to student
         student_user.student_id = new_student.id
+        rebuild_cohort_aggregates(db)
         db.commit()
         print(f"Linked user {student_user.email} to student {new_student.id} with metrics.")
 
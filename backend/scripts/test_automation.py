@@ -9,6 +9,7 @@ sys.path.append(str(backend_dir))
 from sqlalchemy.orm import Session
 from app.database import SessionLocal, init_db
 from app.models import Student, StudentMetric, Intervention, InterventionType, Department, Section
+from app.services.cohort_aggregates import rebuild_cohort_aggregates
 from app.services.realtime_prediction import compute_student_risk
 import uuid
 from datetime import datetime
@@ -47,6 +48,7 @@ def test_automation():
             last_interaction=datetime.utcnow()
         )
         db.add(metrics)
+        rebuild_cohort_aggregates(db)
         db.commit()
         
         # Compute risk
@@ -5,6 +5,7 @@ Uses SQLite in-memory for fast, isolated tests with no MySQL dependency.
 """
 
 import os
+from contextlib import contextmanager
 
 os.environ["DATABASE_URL"] = "sqlite:///./test.db"
 
@@ -41,6 +42,30 @@ def _patch_app_db(monkeypatch):
     monkeypatch.setattr(db_module, "SessionLocal", TestingSessionLocal)
 
 
+@pytest.fixture(autouse=True)
+def _clear_response_cache():
+    """Cached dashboard responses must not leak between tests' databases."""
+    from app.services.response_cache import response_cache
+    response_cache.clear()
+
+
+@contextmanager
+def _capture_statements():
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+
+
+@pytest.fixture
+def count_queries():
+    """``with count_queries() as statements:`` collects the SQL run on the test engine."""
+    return _capture_statements
+
+
 @pytest.fixture(scope="function")
 def db():
     """Provide a clean database session for each test."""
@@ -172,3 +197,55 @@ def faculty_user(db):
     db.commit()
     db.refresh(user)
     return user
+
+
+@pytest.fixture(scope="session")
+def trained_risk_model():
+    """A small calibrated gradient-boosting model trained on synthetic features."""
+    import numpy as np
+    import pandas as pd
+    from sklearn.calibration import CalibratedClassifierCV
+    from sklearn.ensemble import GradientBoostingClassifier
+
+    from app.services.risk_model import RiskModel
+
+    rng = np.random.default_rng(42)
+    n = 300
+    X = pd.DataFrame({
+        "attendance_rate": rng.uniform(40, 100, n),
+        "engagement_score": rng.uniform(20, 100, n),
+        "academic_performance_index": rng.uniform(2, 10, n),
+        "login_gap_days": rng.integers(0, 15, n),
+        "failure_ratio": rng.uniform(0, 1, n),
+        "financial_risk_flag": rng.integers(0, 2, n),
+        "commute_risk_score": rng.integers(1, 5, n),
+        "semester_performance_trend": rng.uniform(-20, 20, n),
+    })
+    y = ((X["attendance_rate"] < 65) | (X["failure_ratio"] > 0.6)).astype(int)
+
+    model = RiskModel()
+    model.calibrated_model = CalibratedClassifierCV(
+        GradientBoostingClassifier(n_estimators=30, max_depth=2, random_state=42),
+        cv=3,
+    ).fit(X, y)
+    return model
+
+
+@pytest.fixture
+def prediction_service(trained_risk_model, sample_model_version, monkeypatch):
+    """Register the synthetic model as the prediction-service singleton."""
+    import app.services.realtime_prediction as rp
+    from app.services.shap_cache import SHAPExplanationCache
+    from app.services.shap_explainer import SHAPExplainer
+
+    monkeypatch.setattr(rp, "_shap_cache", SHAPExplanationCache(100))
+    monkeypatch.setattr(rp, "_model_registry", {})
+    monkeypatch.setattr(rp, "_risk_model", None)
+    monkeypatch.setattr(rp, "_shap_explainer", None)
+    monkeypatch.setattr(rp, "_active_model_version_id", None)
+    rp.init_prediction_service(
+        trained_risk_model,
+        SHAPExplainer(trained_risk_model.calibrated_model),
+        sample_model_version.id,
+    )
+    return rp
@@ -0,0 +1,95 @@
+"""Tests for the streaming /api/analysis/import pipeline."""
+
+import json
+
+import pandas as pd
+import pytest
+
+from app.routes import analysis
+from app.services.realtime_prediction import compute_risk_from_metrics_dict
+
+
+def _csv(rows):
+    return pd.DataFrame(rows, columns=analysis.REQUIRED_COLUMNS).to_csv(index=False).encode()
+
+
+def _row(i, **overrides):
+    row = {
+        "id": f"AN{i:03d}", "name": f"Student {i}", "department": "CSE",
+        "attendance_rate": 40 + i * 7 % 60, "engagement_score": 30 + i * 11 % 70,
+        "academic_performance_index": 3 + i % 7, "login_gap_days": i % 10,
+        "failure_ratio": (i % 5) / 10, "financial_risk_flag": i % 2,
+        "commute_risk_score": 1 + i % 4, "semester_performance_trend": (i % 9) - 4,
+    }
+    return {**row, **overrides}
+
+
+def _import(client, rows):
+    response = client.post(
+        "/api/analysis/import", files={"file": ("students.csv", _csv(rows), "text/csv")},
+    )
+    assert response.status_code == 200
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+class TestAnalysisImport:
+    def test_chunked_scores_match_single_row_scoring(self, client, prediction_service, monkeypatch):
+        monkeypatch.setattr(analysis, "BATCH_CHUNK_SIZE", 4)
+        rows = [_row(i) for i in range(10)]
+
+        events = _import(client, rows)
+
+        progress = [e for e in events if e.get("phase") == "risk_compute"]
+        assert [e["processed"] for e in progress] == [4, 8, 10]
+        done = events[-1]
+        assert done["type"] == "done"
+        assert done["overview"]["total_students"] == 10
+        for row, student in zip(rows, done["students"]):
+            expected = compute_risk_from_metrics_dict({k: row[k] for k in analysis.METRIC_KEYS})
+            assert student["id"] == row["id"]
+            assert student["riskScore"] == pytest.approx(expected["risk_score"])
+            assert student["riskLevel"] == expected["risk_level"]
+            assert student["avatar"] == "S" + str(row["name"].split()[1][0])
+        assert sum(done["overview"]["risk_distribution"].values()) == 10
+
+    def test_unreadable_rows_are_reported_and_skipped(self, client, prediction_service):
+        rows = [_row(0), _row(1, login_gap_days="soon"), _row(2, attendance_rate=None)]
+
+        events = _import(client, rows)
+
+        errors = [e for e in events if e["type"] == "error"]
+        assert errors == [{"type": "error", "row": 1, "message": "Invalid login_gap_days: 'soon'"}]
+        assert [s["id"] for s in events[-1]["students"]] == ["AN000", "AN002"]
+
+
+class TestRefineDataframe:
+    def test_derives_missing_features_column_wise(self):
+        raw = analysis._normalise_columns(pd.DataFrame({
+            "Student ID": ["R1", "R2", "R3"],
+            "Student Name": ["Ann Lee", "Bo Chan", "Cy Dee"],
+            "Attendance %": [90, None, 130],
+            "MID1 Subject1": [15, 30, None],
+            "MID2 Subject2": [27, None, None],
+            "CGPA": [85, 7.2, None],
+            "Financial Risk": ["No", "yes", None],
+            "Sem1 GPA": [8.0, 0, 6.0],
+            "Sem2 GPA": [6.0, 7.0, 9.0],
+        }))
+
+        refined = analysis._refine_dataframe(raw)
+
+        assert list(refined.columns) == analysis.REQUIRED_COLUMNS
+        assert refined["id"].tolist() == ["R1", "R2", "R3"]
+        assert refined["department"].tolist() == ["CSE"] * 3
+        assert refined["attendance_rate"].tolist() == [90, 100, 100]  # gap → mean 110, clipped
+        assert refined["engagement_score"].tolist() == pytest.approx([70, 100, 70])  # no MID score → default
+        assert refined["academic_performance_index"].tolist() == pytest.approx([8.5, 7.2, 4.61])
+        assert refined["login_gap_days"].tolist() == [8, 5, 8]
+        assert refined["failure_ratio"].tolist() == pytest.approx([0.13, 0.168, 0.323])
+        assert refined["financial_risk_flag"].tolist() == [0, 1, 1]
+        assert refined["commute_risk_score"].tolist() == [1, 1, 1]
+        assert refined["semester_performance_trend"].tolist() == pytest.approx([-25.0, 0.0, 50.0])
+
+    def test_irrelevant_file(self):
+        with pytest.raises(analysis.IrrelevantFileError):
+            analysis._refine_dataframe(pd.DataFrame({"colour": ["red"], "size": [3]}))
@@ -0,0 +1,160 @@
+"""Tests for the materialised cohort aggregates."""
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.dialects import mysql
+
+from app.models import CohortAggregate, Department, RiskLevel, Section, Student, StudentMetric
+from app.services.cohort_aggregates import (
+    ALL_SCOPE, COUNTER_COLUMNS, CohortDeltas, histogram, level_distribution,
+    rebuild_cohort_aggregates, risk_bucket_column,
+)
+
+
+def _add_students(db, count, prefix="CA"):
+    ids = []
+    for i in range(count):
+        sid = f"{prefix}{i:03d}"
+        db.add(Student(
+            id=sid, name=f"Cohort Student {i}", avatar="CS", course="B.Tech",
+            department=Department.CSE if i % 2 else Department.ECE, section=Section.A,
+        ))
+        db.add(StudentMetric(
+            student_id=sid,
+            attendance_rate=40.0 + (i * 7) % 60,
+            engagement_score=30.0 + (i * 11) % 70,
+            academic_performance_index=2.0 + (i % 8),
+            login_gap_days=i % 14,
+            failure_ratio=((i * 13) % 100) / 100,
+            financial_risk_flag=bool(i % 2),
+            commute_risk_score=1 + i % 4,
+            semester_performance_trend=float((i % 9) - 4),
+        ))
+        ids.append(sid)
+    db.commit()
+    return ids
+
+
+def _snapshot(db):
+    db.expire_all()
+    return {
+        row.scope: {column: pytest.approx(getattr(row, column)) for column in COUNTER_COLUMNS}
+        for row in db.query(CohortAggregate).all()
+    }
+
+
+class TestCohortAggregates:
+    def test_bucket_boundaries(self):
+        assert risk_bucket_column(0.0) == "risk_bucket_0"
+        assert risk_bucket_column(9.99) == "risk_bucket_0"
+        assert risk_bucket_column(10.0) == "risk_bucket_1"
+        assert risk_bucket_column(99.9) == "risk_bucket_9"
+        assert risk_bucket_column(100.0) is None
+
+    def test_deltas_match_rebuild_after_scoring(self, db, prediction_service):
+        _add_students(db, 12)
+        rebuild_cohort_aggregates(db)
+        db.commit()
+
+        prediction_service.compute_risk_scores_batch(db, chunk_size=5)
+        prediction_service.compute_risk_scores_batch(db, chunk_size=5)
+        incremental = _snapshot(db)
+
+        rebuild_cohort_aggregates(db)
+        db.commit()
+        rebuilt = _snapshot(db)
+
+        assert incremental == rebuilt
+        assert rebuilt[ALL_SCOPE]["scored_count"] == 12
+
+    def test_rebuild_repairs_deltas_applied_before_any_rebuild(self, db, prediction_service):
+        # load_custom_dataset.py → compute_all_risks.py order on a fresh database:
+        # students inserted directly, then only risk deltas applied
+        _add_students(db, 6)
+        prediction_service.compute_risk_scores_batch(db)
+        drifted = _snapshot(db)[ALL_SCOPE]
+        assert drifted["student_count"] == 0
+        assert drifted["scored_count"] == 6
+
+        # what startup does, even though the table is no longer empty
+        rebuild_cohort_aggregates(db)
+        db.commit()
+        rebuilt = _snapshot(db)[ALL_SCOPE]
+
+        assert rebuilt["student_count"] == 6
+        assert rebuilt["metrics_count"] == 6
+        assert rebuilt["scored_count"] == 6
+
+    def test_apply_creates_missing_rows(self, db):
+        deltas = CohortDeltas()
+        deltas.students_added(Department.CSE, 2)
+        deltas.risk_changed(Department.CSE, None, None, 82.0, RiskLevel.HIGH)
+        deltas.risk_changed(Department.CSE, None, None, 12.0, RiskLevel.SAFE)
+        deltas.apply(db)
+        deltas.risk_changed(Department.CSE, 82.0, RiskLevel.HIGH, 55.0, RiskLevel.MODERATE)
+        deltas.apply(db)
+        db.commit()
+
+        for scope in (Department.CSE.value, ALL_SCOPE):
+            row = db.query(CohortAggregate).filter(CohortAggregate.scope == scope).one()
+            assert row.student_count == 2
+            assert row.scored_count == 2
+            assert row.risk_score_sum == pytest.approx(67.0)
+            assert level_distribution(row)[RiskLevel.HIGH.value] == 0
+            assert level_distribution(row)[RiskLevel.MODERATE.value] == 1
+            assert histogram(row)[1] == 1 and histogram(row)[5] == 1 and histogram(row)[8] == 0
+
+
+    @pytest.mark.parametrize("writer", ["risk", "metrics"])
+    def test_writers_lock_before_reading_old_values(self, db, prediction_service, writer):
+        from app.services.feature_engineering import compute_features_bulk
+
+        ids = _add_students(db, 4)
+        prediction_service.compute_risk_scores_batch(db)
+        statements = []
+        listener = lambda state: statements.append(
+            str(state.statement.compile(dialect=mysql.dialect())) if state.is_select else ""
+        )
+        event.listen(db, "do_orm_execute", listener)
+        try:
+            if writer == "risk":
+                prediction_service.compute_risk_scores_batch(db)
+            else:
+                compute_features_bulk(ids, db)
+        finally:
+            event.remove(db, "do_orm_execute", listener)
+
+        locking = [s for s in statements if s.endswith("FOR UPDATE")]
+        # the "all" aggregate row, then the old RiskScore / StudentMetric values
+        assert "cohort_aggregates" in locking[0]
+        assert ("risk_scores" if writer == "risk" else "student_metrics") in locking[1]
+        assert statements.index(locking[0]) < statements.index(locking[1])
+
+
+class TestCohortAggregateRoutes:
+    def test_overview_reads_aggregates_in_one_query(self, client, db, sample_student, count_queries):
+        rebuild_cohort_aggregates(db)
+        db.commit()
+
+        with count_queries() as statements:
+            response = client.get("/api/analytics/overview")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total_students"] == 1
+        assert data["average_risk_score"] == pytest.approx(35.2)
+        assert data["risk_distribution"][sample_student.risk_score.risk_level.value] == 1
+        assert len(statements) == 1
+
+    def test_created_student_updates_breakdown(self, client, db, sample_model_version):
+        response = client.post("/api/faculty/students/create", json={
+            "id": "CA900", "name": "Manual Student", "department": Department.CSE.value,
+            "section": "A", "course": "B.Tech", "attendance_rate": 70.0,
+            "engagement_score": 60.0, "academic_performance_index": 6.5,
+            "failure_ratio": 0.1,
+        })
+        assert response.status_code == 201
+
+        breakdown = client.get("/api/analytics/department-breakdown").json()
+
+        assert [row["total_students"] for row in breakdown] == [1]
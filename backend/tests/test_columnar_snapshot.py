@@ -0,0 +1,120 @@
+"""Tests for the Parquet / Arrow snapshot export and metrics import."""
+
+import io
+
+import pytest
+
+from app.models import CohortAggregate, Department, RiskScore, Section, Student, StudentMetric
+from app.services import columnar_snapshot
+from app.services.columnar_snapshot import (
+    ColumnarUnavailable, export_snapshot, import_student_metrics, read_batches, write_table,
+)
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+
+def _read_table(source, fmt):
+    return pa.Table.from_batches(list(read_batches(source, fmt)))
+
+
+class TestColumnarExport:
+    @pytest.mark.parametrize("fmt", ["parquet", "arrow"])
+    def test_round_trips_risk_scores(self, db, sample_student, fmt):
+        sink = io.BytesIO()
+
+        rows = write_table(db, "risk_scores", sink, fmt)
+        sink.seek(0)
+        table = _read_table(sink, fmt).to_pylist()
+
+        stored = db.query(RiskScore).one()
+        assert rows == 1
+        assert table[0]["student_id"] == "ST0001"
+        assert table[0]["risk_score"] == pytest.approx(stored.risk_score)
+        assert table[0]["risk_level"] == stored.risk_level.value
+        assert table[0]["updated_at"] == stored.updated_at
+
+    def test_batches_large_tables(self, db, sample_student, monkeypatch):
+        monkeypatch.setattr(columnar_snapshot, "SNAPSHOT_BATCH", 2)
+        for i in range(4):
+            db.add(Student(id=f"CS{i}", name=f"Col {i}", course="B.Tech",
+                           department=Department.CIVIL, section=Section.C))
+        db.commit()
+        sink = io.BytesIO()
+
+        write_table(db, "students", sink, "arrow")
+        sink.seek(0)
+        reader = pa.ipc.open_file(sink)
+
+        assert reader.num_record_batches == 3
+        assert reader.read_all().num_rows == 5
+
+    def test_export_snapshot_writes_every_table(self, db, sample_student, tmp_path):
+        counts = export_snapshot(db, tmp_path, "parquet")
+
+        assert counts == {"students": 1, "student_metrics": 1, "risk_scores": 1, "risk_history": 0}
+        assert sorted(p.name for p in tmp_path.iterdir()) == [
+            "risk_history.parquet", "risk_scores.parquet", "student_metrics.parquet", "students.parquet",
+        ]
+
+    def test_unknown_table(self, db):
+        with pytest.raises(ValueError):
+            write_table(db, "users", io.BytesIO())
+
+
+class TestColumnarImport:
+    def test_seeds_metrics_and_skips_unknown_students(self, db, sample_student):
+        sink = io.BytesIO()
+        write_table(db, "student_metrics", sink, "parquet")
+        sink.seek(0)
+        table = _read_table(sink, "parquet")
+        table = table.set_column(
+            table.schema.get_field_index("attendance_rate"), "attendance_rate", pa.array([42.0]),
+        )
+        extra = table.to_pylist()[0] | {"student_id": "NOPE"}
+        table = pa.Table.from_pylist(table.to_pylist() + [extra], schema=table.schema)
+        source = io.BytesIO()
+        pq.write_table(table, source)
+        source.seek(0)
+
+        summary = import_student_metrics(db, source, "parquet")
+        db.commit()
+
+        assert summary == {"rows_read": 2, "imported": 1, "skipped_unknown_students": 1, "skipped_invalid": 0}
+        assert db.query(StudentMetric).one().attendance_rate == 42.0
+        overall = db.query(CohortAggregate).filter(CohortAggregate.scope == "all").one()
+        assert overall.attendance_sum == pytest.approx(42.0)
+
+    def test_missing_columns(self, db):
+        source = io.BytesIO()
+        pq.write_table(pa.table({"student_id": ["ST0001"]}), source)
+        source.seek(0)
+
+        with pytest.raises(ValueError, match="attendance_rate"):
+            import_student_metrics(db, source, "parquet")
+
+
+class TestColumnarRoutes:
+    def test_export_and_reimport_over_http(self, client, db, sample_student):
+        response = client.get("/api/faculty/export/snapshot",
+                              params={"table": "student_metrics", "format": "arrow"})
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/vnd.apache.arrow.file"
+
+        response = client.post(
+            "/api/faculty/import/metrics",
+            files={"file": ("student_metrics.arrow", response.content, "application/octet-stream")},
+        )
+
+        assert response.status_code == 200
+        assert response.json()["imported"] == 1
+
+    def test_missing_pyarrow_is_503(self, client, sample_student, monkeypatch):
+        def unavailable():
+            raise ColumnarUnavailable("Columnar export requires pyarrow")
+
+        monkeypatch.setattr(columnar_snapshot, "_pyarrow", unavailable)
+
+        response = client.get("/api/faculty/export/snapshot")
+
+        assert response.status_code == 503
@@ -0,0 +1,40 @@
+"""Tests for the bulk_upsert helper."""
+
+import pytest
+
+from app.database import bulk_upsert
+from app.models import CohortAggregate
+
+
+def _rows(*pairs):
+    return [{"scope": scope, "student_count": count, "metrics_count": count} for scope, count in pairs]
+
+
+def _stored(db):
+    db.expire_all()
+    return {row.scope: (row.student_count, row.metrics_count) for row in db.query(CohortAggregate)}
+
+
+class TestBulkUpsert:
+    @pytest.mark.parametrize("dialect", ["sqlite", "unsupported"])
+    def test_inserts_new_and_overwrites_existing(self, db, monkeypatch, dialect):
+        # an unknown dialect name takes the portable select-then-insert/update path
+        monkeypatch.setattr(db.get_bind().dialect, "name", dialect)
+        bulk_upsert(db, CohortAggregate, _rows(("all", 1), ("CSE", 1)), ["scope"])
+        db.commit()
+
+        bulk_upsert(db, CohortAggregate, _rows(("CSE", 5), ("ECE", 2), ("ECE", 3)), ["scope"], chunk_size=2)
+        db.commit()
+
+        assert _stored(db) == {"all": (1, 1), "CSE": (5, 5), "ECE": (3, 3)}
+
+    def test_portable_path_statement_count(self, db, monkeypatch, count_queries):
+        monkeypatch.setattr(db.get_bind().dialect, "name", "unsupported")
+        bulk_upsert(db, CohortAggregate, _rows(("all", 1)), ["scope"])
+
+        with count_queries() as statements:
+            bulk_upsert(db, CohortAggregate, _rows(("all", 2), ("CSE", 4), ("ECE", 6)), ["scope"])
+
+        # key lookup, one executemany UPDATE, one executemany INSERT
+        assert [s.split()[0] for s in statements] == ["SELECT", "UPDATE", "INSERT"]
+        assert _stored(db) == {"all": (2, 2), "CSE": (4, 4), "ECE": (6, 6)}
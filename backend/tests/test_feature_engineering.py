@@ -4,15 +4,18 @@ import pytest
 import pandas as pd
 from datetime import datetime
 
+from app.services.cohort_aggregates import rebuild_cohort_aggregates
 from app.services.feature_engineering import (
     compute_and_save_features,
+    compute_features_bulk,
+    update_features_incremental,
     FeatureEngineer,
     _safe,
     _clamp,
 )
 from app.models import (
-    Student, StudentMetric, StudentRawAttendance, StudentRawMarks,
-    StudentRawAssignments, Department, Section,
+    Student, StudentMetric, StudentFeatureAggregate, StudentRawAttendance,
+    StudentRawMarks, StudentRawAssignments, Department, Section,
 )
 
 
@@ -172,3 +175,183 @@ class TestComputeAndSaveFeatures:
         db.commit()
 
         assert metric.attendance_rate == 100.0
+
+
+def _add_student(db, sid):
+    db.add(Student(
+        id=sid, name=f"Bulk {sid}", avatar="BK",
+        course="B.Tech CS", department=Department.CSE, section=Section.A,
+    ))
+
+
+class TestComputeFeaturesBulk:
+    def _seed(self, db):
+        for sid in ("BF001", "BF002", "BF003"):
+            _add_student(db, sid)
+        db.flush()
+
+        # BF001: attendance + marks with an upward trend
+        for i, status in enumerate(["Present", "P", "Absent", "present"]):
+            db.add(StudentRawAttendance(student_id="BF001", date=datetime(2026, 1, i + 1), status=status))
+        for obtained in (30, 50, 70, 90, 80):
+            db.add(StudentRawMarks(student_id="BF001", marks_obtained=obtained, max_marks=100))
+
+        # BF002: assignments only, plus an existing metric whose flags must survive
+        db.add(StudentMetric(
+            student_id="BF002", attendance_rate=61.0, engagement_score=20.0,
+            academic_performance_index=55.0, login_gap_days=14, failure_ratio=0.3,
+            financial_risk_flag=True, commute_risk_score=3, semester_performance_trend=-2.0,
+        ))
+        db.add(StudentRawAssignments(student_id="BF002", submitted=True, score=8, max_score=10))
+        db.add(StudentRawAssignments(student_id="BF002", submitted=True, score=None, max_score=10))
+        db.add(StudentRawAssignments(student_id="BF002", submitted=False, score=None, max_score=10))
+        db.add(StudentRawAssignments(student_id="BF002", submitted=False, score=None, max_score=10))
+        db.flush()
+
+    def test_features_for_many_students(self, db, sample_model_version):
+        self._seed(db)
+
+        written = compute_features_bulk(["BF001", "BF002", "BF003", "UNKNOWN"], db)
+        db.commit()
+        metrics = {m.student_id: m for m in db.query(StudentMetric).all()}
+
+        assert written == 3
+        bf1 = metrics["BF001"]
+        assert bf1.attendance_rate == pytest.approx(75.0)
+        assert bf1.academic_performance_index == pytest.approx(64.0)
+        assert bf1.failure_ratio == pytest.approx(0.2)
+        assert bf1.semester_performance_trend == pytest.approx(80.0 - 40.0)
+        assert bf1.engagement_score == 70.0  # no assignments → default
+
+        bf2 = metrics["BF002"]
+        assert bf2.engagement_score == pytest.approx(0.5 * 50 + 80.0 * 0.5)
+        assert bf2.login_gap_days == 3
+        assert bf2.attendance_rate == 61.0  # no attendance rows → kept
+        assert bf2.academic_performance_index == 55.0
+        assert bf2.financial_risk_flag is True
+        assert bf2.commute_risk_score == 3
+
+        bf3 = metrics["BF003"]
+        assert (bf3.attendance_rate, bf3.academic_performance_index, bf3.commute_risk_score) == (75.0, 65.0, 1)
+
+    # Expected features from the per-student formulas the bulk path replaced:
+    # (attendance_rate, academic_performance_index, engagement_score,
+    #  failure_ratio, semester_performance_trend, login_gap_days)
+    GOLDEN = {
+        # 3 of 4 present; marks 30,50,70,90,80 → mean 64, one below 40,
+        # recent-half mean 80 minus older-half mean 40; no assignments → 70
+        "BF001": (75.0, 64.0, 70.0, 0.2, 40.0, 3),
+        # no attendance / marks → existing metric kept; 2 of 4 submitted,
+        # one scored 8/10 → 0.5 × 50 + 80 × 0.5
+        "BF002": (61.0, 55.0, 65.0, 0.3, -2.0, 3),
+        # no raw rows and no metric → neutral defaults
+        "BF003": (75.0, 65.0, 70.0, 0.1, 0.0, 3),
+    }
+
+    @pytest.mark.parametrize("path", ["bulk", "single"])
+    def test_matches_per_student_formulas(self, db, sample_model_version, path):
+        self._seed(db)
+        if path == "bulk":
+            compute_features_bulk(list(self.GOLDEN), db)
+        else:
+            for sid in self.GOLDEN:
+                compute_and_save_features(sid, db)
+        db.commit()
+
+        metrics = {m.student_id: _metric_tuple(m) for m in db.query(StudentMetric).all()}
+        assert metrics == {sid: pytest.approx(expected) for sid, expected in self.GOLDEN.items()}
+
+    def test_query_count_independent_of_cohort_size(self, db, sample_model_version, count_queries):
+        def cohort(prefix, size):
+            ids = [f"{prefix}{i:03d}" for i in range(size)]
+            for sid in ids:
+                _add_student(db, sid)
+                db.add(StudentRawMarks(student_id=sid, marks_obtained=55, max_marks=100))
+            db.commit()
+            return ids
+
+        small, large = cohort("BS", 3), cohort("BQ", 40)
+        rebuild_cohort_aggregates(db)  # both runs then update existing aggregate rows
+        db.commit()
+
+        with count_queries() as small_statements:
+            compute_features_bulk(small, db)
+        with count_queries() as large_statements:
+            compute_features_bulk(large, db)
+
+        assert len(small_statements) == len(large_statements)
+        assert db.query(StudentMetric).count() == 43
+
+def _metric_tuple(m):
+    return (
+        m.attendance_rate, m.academic_performance_index, m.engagement_score,
+        m.failure_ratio, m.semester_performance_trend, m.login_gap_days,
+    )
+
+
+class TestIncrementalFeatures:
+    MARKS = [(30, 100), (50, 100), (70, 0), (90, 100), (80, 100), (20, 100), (65, 100)]
+
+    def _upload(self, db, sid, attendance=(), marks=(), assignments=()):
+        """Insert raw rows the way the upload handlers do, then apply the delta."""
+        for status in attendance:
+            db.add(StudentRawAttendance(student_id=sid, date=datetime(2026, 3, 1), status=status))
+        for obtained, max_marks in marks:
+            db.add(StudentRawMarks(student_id=sid, marks_obtained=obtained, max_marks=max_marks))
+        for submitted, score in assignments:
+            db.add(StudentRawAssignments(student_id=sid, submitted=submitted, score=score, max_score=10))
+        update_features_incremental(
+            db,
+            attendance=pd.DataFrame({"student_id": [sid] * len(attendance), "status": list(attendance)}),
+            marks=pd.DataFrame(
+                [(sid, o, m) for o, m in marks], columns=["student_id", "marks_obtained", "max_marks"],
+            ),
+            assignments=pd.DataFrame(
+                [(sid, s, sc, 10.0) for s, sc in assignments],
+                columns=["student_id", "submitted", "score", "max_score"],
+            ),
+        )
+        db.commit()
+
+    def test_deltas_match_full_rebuild(self, db, sample_model_version):
+        _add_student(db, "IN001")
+        db.commit()
+
+        # Several uploads of different sizes so the trend boundary moves
+        self._upload(db, "IN001", attendance=["Present", "Absent"], marks=self.MARKS[:1])
+        self._upload(db, "IN001", marks=self.MARKS[1:4], assignments=[(True, 7.0), (False, None)])
+        self._upload(db, "IN001", attendance=["P"], marks=self.MARKS[4:5])
+        self._upload(db, "IN001", marks=self.MARKS[5:], assignments=[(True, None)])
+        incremental = _metric_tuple(db.query(StudentMetric).one())
+
+        compute_features_bulk(["IN001"], db)
+        db.commit()
+        rebuilt = _metric_tuple(db.query(StudentMetric).one())
+
+        assert incremental == pytest.approx(rebuilt)
+        assert incremental[0] == pytest.approx(200 / 3)
+        assert incremental[4] == pytest.approx((80 + 20 + 65) / 3 - (30 + 50 + 90) / 3)
+
+    def test_history_not_rescanned_once_tracked(self, db, sample_model_version, count_queries):
+        _add_student(db, "IN002")
+        db.commit()
+        self._upload(db, "IN002", attendance=["Present"] * 50)
+
+        with count_queries() as statements:
+            self._upload(db, "IN002", attendance=["Absent"])
+
+        assert not any("FROM student_raw_attendance" in s for s in statements)
+        assert db.query(StudentMetric).one().attendance_rate == pytest.approx(50 / 51 * 100)
+
+    def test_untracked_student_rebuilt_from_history(self, db, sample_model_version):
+        _add_student(db, "IN003")
+        db.flush()
+        for _ in range(3):
+            db.add(StudentRawAttendance(student_id="IN003", date=datetime(2026, 1, 1), status="Absent"))
+        db.commit()
+
+        self._upload(db, "IN003", attendance=["Present"])
+
+        agg = db.query(StudentFeatureAggregate).one()
+        assert (agg.attendance_total, agg.attendance_present) == (4, 1)
+        assert db.query(StudentMetric).one().attendance_rate == pytest.approx(25.0)
@@ -0,0 +1,139 @@
+"""Tests for bulk ingestion of raw upload rows."""
+
+import io
+
+import pandas as pd
+import pytest
+
+from app.models import (
+    Student, StudentMetric, StudentRawAttendance, StudentRawMarks, StudentRawAssignments,
+    Department, Section,
+)
+from app.config import get_settings
+from app.services.ingestion import (
+    UploadValidationError, ingest_csv_stream, ingest_raw_rows, remove_spooled_uploads, spool_upload,
+)
+
+
+@pytest.fixture
+def students(db):
+    for sid in ("IG001", "IG002"):
+        db.add(Student(
+            id=sid, name=f"Ingest {sid}", avatar="IG",
+            course="B.Tech CS", department=Department.CSE, section=Section.A,
+        ))
+    db.commit()
+
+
+class TestIngestRawRows:
+    def test_attendance_rows_inserted_and_rejections_indexed(self, db, students):
+        df = pd.DataFrame({
+            "student_id": ["IG001", "IG002", "NOPE", None, "IG001"],
+            "date": ["2026-01-05", "2026-01-06", "2026-01-07", "2026-01-08", "not a date"],
+            "status": ["Present", " Absent ", "Present", "Present", "Present"],
+        })
+
+        result = ingest_raw_rows(df, "attendance", db)
+        db.commit()
+
+        assert result["rows_processed"] == 2
+        assert result["affected_ids"] == {"IG001", "IG002"}
+        assert result["rejected_rows"] == [2, 3, 4]
+        assert result["errors"] == [
+            "Row 2: student 'NOPE' not in DB — skipped",
+            "Row 3: missing student_id — skipped",
+            "Row 4: invalid date 'not a date' — skipped",
+        ]
+        rows = db.query(StudentRawAttendance).order_by(StudentRawAttendance.id).all()
+        assert [(r.student_id, r.status, r.subject) for r in rows] == [
+            ("IG001", "Present", "General"), ("IG002", "Absent", "General"),
+        ]
+
+    def test_marks_coercion(self, db, students):
+        df = pd.DataFrame({
+            "student_id": ["IG001", "IG001", "IG002"],
+            "marks_obtained": ["45", "abc", 70],
+            "max_marks": [0, 100, 50],
+            "subject": ["Math", "Math", None],
+        })
+
+        result = ingest_raw_rows(df, "marks", db)
+        db.commit()
+
+        assert result["rejected_rows"] == [1]
+        rows = db.query(StudentRawMarks).order_by(StudentRawMarks.id).all()
+        assert [(r.marks_obtained, r.max_marks, r.subject) for r in rows] == [
+            (45.0, 100.0, "Math"), (70.0, 50.0, "General"),
+        ]
+
+    def test_assignments_coercion(self, db, students):
+        df = pd.DataFrame({
+            "student_id": ["IG001", "IG001", "IG002"],
+            "submitted": ["Yes", "no", "TRUE"],
+            "score": [8, None, "x"],
+        })
+
+        result = ingest_raw_rows(df, "assignments", db)
+        db.commit()
+
+        assert result["rejected_rows"] == [2]
+        rows = db.query(StudentRawAssignments).order_by(StudentRawAssignments.id).all()
+        assert [(r.submitted, r.score, r.max_score) for r in rows] == [
+            (True, 8.0, 10.0), (False, None, 10.0),
+        ]
+        assert list(result["new_rows"].columns[:1]) == ["student_id"]
+
+
+class TestIngestCSVStream:
+    CSV = (
+        "Student_ID,Date,Status\n"
+        "IG001,2026-01-05,Present\n"
+        "IG002,2026-01-05,Absent\n"
+        "GHOST,2026-01-05,Present\n"
+        "IG001,2026-01-06,Absent\n"
+        "IG002,2026-01-06,Present\n"
+    )
+
+    def test_chunks_committed_with_progress(self, db, students):
+        progress = []
+
+        result = ingest_csv_stream(
+            io.BytesIO(self.CSV.encode()), "attendance", {"student_id", "date", "status"},
+            db, chunk_rows=2, on_chunk=progress.append,
+        )
+
+        assert result["chunks"] == 3
+        assert result["rows_read"] == 5
+        assert result["rows_processed"] == 4
+        assert result["rejected_rows"] == [2]  # index continues across chunks
+        assert [p["rows_read"] for p in progress] == [2, 4, 5]
+        assert db.query(StudentRawAttendance).count() == 4
+        assert db.query(StudentMetric).filter(StudentMetric.student_id == "IG001").one().attendance_rate == 50.0
+
+    def test_latin1_upload(self, db, students):
+        csv = "student_id,date,status,subject\nIG001,2026-01-05,Present,Économie\n".encode("latin-1")
+
+        result = ingest_csv_stream(io.BytesIO(csv), "attendance", {"student_id", "date", "status"}, db)
+
+        assert result["rows_processed"] == 1
+        assert db.query(StudentRawAttendance).one().subject == "Économie"
+
+    def test_missing_columns_rejected_before_writing(self, db, students):
+        with pytest.raises(UploadValidationError):
+            ingest_csv_stream(
+                io.BytesIO(b"student_id,status\nIG001,Present\n"), "attendance",
+                {"student_id", "date", "status"}, db,
+            )
+        assert db.query(StudentRawAttendance).count() == 0
+
+
+class TestSpooledUploads:
+    def test_startup_removes_spool_files_of_interrupted_jobs(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(get_settings(), "job_spool_dir", str(tmp_path))
+        spooled = [spool_upload(io.BytesIO(b"student_id,status\n")) for _ in range(2)]
+        unrelated = tmp_path / "notes.csv"
+        unrelated.write_text("keep")
+
+        assert remove_spooled_uploads() == 2
+        assert not any(tmp_path.joinpath(p).exists() for p in spooled)
+        assert unrelated.exists()
@@ -0,0 +1,95 @@
+"""Tests for the set-based auto-intervention sweep."""
+
+from app.models import (
+    Department, Intervention, InterventionStatus, InterventionType, RiskLevel, RiskScore,
+    RiskTrend, Section, Student,
+)
+from app.services import intervention_sweeper
+from app.services.intervention_sweeper import sweep_high_risk_interventions
+
+
+def _add_scored(db, model_version_id, count, level=RiskLevel.HIGH, prefix="SW", advisor=None):
+    ids = []
+    for i in range(count):
+        sid = f"{prefix}{i:03d}"
+        db.add(Student(id=sid, name=f"Sweep {i}", course="B.Tech", department=Department.ECE,
+                       section=Section.C, advisor_id=advisor))
+        db.add(RiskScore(student_id=sid, risk_score=80.0 + i % 10, risk_level=level,
+                         risk_trend=RiskTrend.STABLE, risk_value="0",
+                         model_version_id=model_version_id))
+        ids.append(sid)
+    db.commit()
+    return ids
+
+
+class TestInterventionSweep:
+    def test_creates_only_for_uncovered_students(self, db, sample_model_version):
+        ids = _add_scored(db, sample_model_version.id, 4, advisor="FAC009")
+        db.add_all([
+            Intervention(student_id=ids[0], intervention_type=InterventionType.TUTORING,
+                         status=InterventionStatus.PENDING),
+            Intervention(student_id=ids[1], intervention_type=InterventionType.MENTORING,
+                         status=InterventionStatus.IN_PROGRESS),
+            Intervention(student_id=ids[2], intervention_type=InterventionType.COUNSELING,
+                         status=InterventionStatus.COMPLETED),
+        ])
+        db.commit()
+
+        summary = sweep_high_risk_interventions(db, ids)
+        db.commit()
+
+        assert summary == {"high_risk": 4, "already_open": 2, "created": 2}
+        created = (db.query(Intervention)
+                   .filter(Intervention.status == InterventionStatus.PENDING,
+                           Intervention.intervention_type == InterventionType.COUNSELING)
+                   .order_by(Intervention.student_id).all())
+        assert [i.student_id for i in created] == ids[2:]
+        assert created[0].assigned_to == "FAC009"
+        assert created[0].notes.startswith("Auto-alert: risk score reached 82.0% (High Risk).")
+
+    def test_ignores_students_no_longer_high(self, db, sample_model_version):
+        ids = _add_scored(db, sample_model_version.id, 2, level=RiskLevel.MODERATE)
+
+        summary = sweep_high_risk_interventions(db, ids)
+
+        assert summary == {"high_risk": 0, "already_open": 0, "created": 0}
+        assert db.query(Intervention).count() == 0
+
+    def test_summary_counts_only_stored_high_risk(self, db, sample_model_version):
+        high = _add_scored(db, sample_model_version.id, 2, prefix="HI")
+        moderate = _add_scored(db, sample_model_version.id, 2, level=RiskLevel.MODERATE, prefix="MO")
+        db.add(Intervention(student_id=high[0], intervention_type=InterventionType.TUTORING,
+                            status=InterventionStatus.PENDING))
+        db.commit()
+
+        summary = sweep_high_risk_interventions(db, [*high, *moderate, "MISSING"])
+
+        assert summary == {"high_risk": 2, "already_open": 1, "created": 1}
+
+    def test_repeat_sweep_is_idempotent(self, db, sample_model_version):
+        ids = _add_scored(db, sample_model_version.id, 3)
+
+        sweep_high_risk_interventions(db, ids)
+        summary = sweep_high_risk_interventions(db, ids)
+
+        assert summary == {"high_risk": 3, "already_open": 3, "created": 0}
+        assert db.query(Intervention).count() == 3
+        assert {i.assigned_to for i in db.query(Intervention)} == {"Unassigned"}
+
+    def test_one_lookup_and_one_insert_per_batch(self, db, sample_model_version, monkeypatch, count_queries):
+        monkeypatch.setattr(intervention_sweeper, "SWEEP_BATCH", 10)
+        ids = _add_scored(db, sample_model_version.id, 25)
+
+        with count_queries() as statements:
+            summary = sweep_high_risk_interventions(db, ids)
+
+        assert summary["created"] == 25
+        assert len(statements) == 3 * 2
+        assert all("EXISTS" in s for s in statements[::2])
+
+    def test_empty_candidates(self, db, count_queries):
+        with count_queries() as statements:
+            summary = sweep_high_risk_interventions(db, [])
+
+        assert summary == {"high_risk": 0, "already_open": 0, "created": 0}
+        assert statements == []
@@ -0,0 +1,65 @@
+"""Tests for the in-process background job service."""
+
+from datetime import datetime
+
+from app.models import Job, JobStatus
+from app.services.jobs import JobContext, create_job, fail_interrupted_jobs, submit_job
+
+
+class TestJobs:
+    def test_successful_job_records_result_and_timings(self, db):
+        job = create_job(db, "test", {"x": 1})
+        assert job.status == JobStatus.QUEUED
+
+        def work(session, ctx):
+            with ctx.stage("ingest"):
+                ctx.report(rows_read=10)
+            with ctx.stage("ingest"):
+                pass
+            ctx.add_errors(["Row 3: bad"])
+            return {"ok": True}
+
+        submit_job(job.id, work).result(timeout=10)
+
+        db.expire_all()
+        job = db.get(Job, job.id)
+        assert job.status == JobStatus.SUCCEEDED
+        assert job.result == {"ok": True}
+        assert job.progress == {"rows_read": 10}
+        assert list(job.stage_timings) == ["ingest"]
+        assert job.errors == ["Row 3: bad"]
+        assert job.started_at <= job.finished_at
+
+    def test_exception_fails_job(self, db):
+        job = create_job(db, "test")
+
+        def work(session, ctx):
+            ctx.report(chunk=1)
+            raise ValueError("boom")
+
+        submit_job(job.id, work).result(timeout=10)
+
+        db.expire_all()
+        job = db.get(Job, job.id)
+        assert job.status == JobStatus.FAILED
+        assert job.error == "boom"
+        assert job.progress == {"chunk": 1}
+
+    def test_error_list_is_capped(self):
+        ctx = JobContext("unused")
+        ctx.add_errors(f"e{i}" for i in range(1000))
+        assert len(ctx.errors) == 200
+
+    def test_interrupted_jobs_marked_failed(self, db):
+        running = create_job(db, "test")
+        running.status = JobStatus.RUNNING
+        done = create_job(db, "test")
+        done.status = JobStatus.SUCCEEDED
+        done.finished_at = datetime.utcnow()
+        db.commit()
+
+        assert fail_interrupted_jobs(db) == 1
+
+        db.expire_all()
+        assert db.get(Job, running.id).status == JobStatus.FAILED
+        assert db.get(Job, done.id).status == JobStatus.SUCCEEDED
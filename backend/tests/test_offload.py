@@ -0,0 +1,56 @@
+"""Tests for the bounded upload pool."""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.services import offload
+from app.services.offload import run_blocking
+
+
+class TestRunBlocking:
+    def test_runs_off_the_event_loop_within_the_cap(self, monkeypatch):
+        monkeypatch.setattr(offload, "_executor", ThreadPoolExecutor(1, thread_name_prefix="upload-worker"))
+        active = []
+        peak = []
+        lock = threading.Lock()
+
+        def work(seconds):
+            with lock:
+                active.append(1)
+                peak.append(len(active))
+            time.sleep(seconds)
+            with lock:
+                active.pop()
+            return threading.current_thread().name
+
+        async def scenario():
+            ticks = 0
+
+            async def ticker():
+                nonlocal ticks
+                while True:
+                    await asyncio.sleep(0.01)
+                    ticks += 1
+
+            tick_task = asyncio.create_task(ticker())
+            names = await asyncio.gather(run_blocking(work, 0.1), run_blocking(work, seconds=0.1))
+            tick_task.cancel()
+            return names, ticks
+
+        names, ticks = asyncio.run(scenario())
+        offload.shutdown_upload_workers()
+
+        assert all(name.startswith("upload-worker") for name in names)
+        assert max(peak) == 1
+        assert ticks >= 10  # the loop kept running while both jobs were busy
+
+    def test_exceptions_propagate(self):
+        def boom():
+            raise ValueError("bad file")
+
+        with pytest.raises(ValueError, match="bad file"):
+            asyncio.run(run_blocking(boom))
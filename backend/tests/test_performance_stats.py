@@ -0,0 +1,99 @@
+"""Tests for the single-query cohort aggregates behind /api/performance."""
+
+import pytest
+from sqlalchemy.dialects import mysql
+
+from app.models import Department, RiskLevel, RiskScore, RiskTrend, Section, Student, StudentMetric
+from app.services.performance_stats import _cohort_select, cohort_performance_stats
+
+LEVELS = [RiskLevel.HIGH, RiskLevel.MODERATE, RiskLevel.STABLE, RiskLevel.SAFE]
+
+
+def _add_cohort(db, model_version_id, count=10):
+    for i in range(count):
+        sid = f"PS{i:03d}"
+        db.add(Student(
+            id=sid, name=f"Perf Student {i}", avatar="PS", course="B.Tech",
+            department=Department.CSE if i % 2 else Department.CIVIL, section=Section.B,
+        ))
+        db.add(StudentMetric(
+            student_id=sid, attendance_rate=50.0 + i * 4, engagement_score=40.0 + i * 3,
+            academic_performance_index=30.0 + i * 9, login_gap_days=2, failure_ratio=i / 20,
+            financial_risk_flag=False, commute_risk_score=1, semester_performance_trend=float(i - 5),
+        ))
+        if i < 8:  # two students left unscored
+            db.add(RiskScore(
+                student_id=sid, risk_score=10.0 * i, risk_level=LEVELS[i % 4],
+                risk_trend=RiskTrend.STABLE, risk_value=f"{10 * i}%", model_version_id=model_version_id,
+            ))
+    db.commit()
+
+
+def _python_stats(students):
+    total = len(students)
+    at_risk = [s for s in students if s.risk_score and s.risk_score.risk_level in (RiskLevel.HIGH, RiskLevel.MODERATE)]
+    return {
+        "total": total,
+        "avg_performance": sum(s.metrics.academic_performance_index for s in students) / total,
+        "avg_gpa": sum(round(min(4.0, s.metrics.academic_performance_index / 25.0), 2) for s in students) / total,
+        "avg_attendance": sum(s.metrics.attendance_rate for s in students) / total,
+        "avg_engagement": sum(s.metrics.engagement_score for s in students) / total,
+        "avg_failure_ratio": sum(s.metrics.failure_ratio for s in students) / total,
+        "avg_trend": sum(s.metrics.semester_performance_trend for s in students) / total,
+        "high_risk": sum(1 for s in students if s.risk_score and s.risk_score.risk_level == RiskLevel.HIGH),
+        "moderate_risk": sum(1 for s in students if s.risk_score and s.risk_score.risk_level == RiskLevel.MODERATE),
+        "at_risk": len(at_risk),
+        "at_risk_avg_performance": sum(s.metrics.academic_performance_index for s in at_risk) / len(at_risk),
+    }
+
+
+class TestCohortPerformanceStats:
+    def test_matches_per_student_computation(self, db, sample_model_version):
+        _add_cohort(db, sample_model_version.id)
+
+        stats = cohort_performance_stats(db)
+
+        assert stats == pytest.approx(_python_stats(db.query(Student).all()))
+
+    def test_department_filter(self, db, sample_model_version):
+        _add_cohort(db, sample_model_version.id)
+        cse = db.query(Student).filter(Student.department == Department.CSE).all()
+
+        stats = cohort_performance_stats(db, Department.CSE)
+
+        assert stats == pytest.approx(_python_stats(cse))
+
+    def test_empty_cohort(self, db):
+        stats = cohort_performance_stats(db, Department.AEROSPACE)
+
+        assert stats["total"] == 0
+        assert stats["at_risk"] == 0
+        assert stats["avg_performance"] is None
+
+    def test_compiles_for_mysql(self):
+        sql = str(_cohort_select().compile(dialect=mysql.dialect())).upper()
+
+        assert "FILTER" not in sql  # MySQL has no aggregate FILTER clause
+        assert "DECIMAL(4, 2)" in sql  # bare DECIMAL is DECIMAL(10, 0) on MySQL
+
+
+class TestPerformanceRoutes:
+    @pytest.mark.parametrize("path", ["kpis", "trends", "course-detail", "comparative", "ai-insight", "aggregate"])
+    def test_cohort_endpoints_issue_one_query(self, client, db, sample_model_version, path, count_queries):
+        _add_cohort(db, sample_model_version.id)
+
+        with count_queries() as statements:
+            response = client.get(f"/api/performance/{path}", params={"department": "CSE"})
+
+        assert response.status_code == 200
+        assert len(statements) == 1
+
+    def test_kpis_values(self, client, db, sample_model_version):
+        _add_cohort(db, sample_model_version.id)
+
+        data = client.get("/api/performance/kpis").json()
+
+        assert data["total_students"] == 10
+        assert data["high_risk_count"] == 2
+        assert data["moderate_risk_count"] == 2
+        assert data["avg_gpa"] == pytest.approx(round(_python_stats(db.query(Student).all())["avg_gpa"], 2))
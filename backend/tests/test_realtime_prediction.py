@@ -0,0 +1,240 @@
+"""Tests for the real-time and batch risk prediction service."""
+
+import pytest
+
+from app.models import (
+    Student, StudentMetric, RiskScore, RiskHistory, Intervention, ModelVersion,
+    Department, Section, RiskLevel, InterventionStatus, InterventionType,
+)
+from app.services.parallel_scoring import compute_risk_scores_parallel
+
+
+def _add_students(db, count, prefix="BT"):
+    ids = []
+    for i in range(count):
+        sid = f"{prefix}{i:03d}"
+        db.add(Student(
+            id=sid, name=f"Batch Student {i}", avatar="BS",
+            course="B.Tech CS", department=Department.CSE, section=Section.A,
+        ))
+        db.add(StudentMetric(
+            student_id=sid,
+            attendance_rate=40.0 + (i * 7) % 60,
+            engagement_score=30.0 + (i * 11) % 70,
+            academic_performance_index=2.0 + (i % 8),
+            login_gap_days=i % 14,
+            failure_ratio=((i * 13) % 100) / 100,
+            financial_risk_flag=bool(i % 2),
+            commute_risk_score=1 + i % 4,
+            semester_performance_trend=float((i % 9) - 4),
+        ))
+        ids.append(sid)
+    db.commit()
+    return ids
+
+
+class TestBatchRiskComputation:
+    def test_batch_matches_single_student_path(self, db, prediction_service):
+        ids = _add_students(db, 12)
+
+        expected = {
+            sid: prediction_service.compute_student_risk(sid, db, save_to_db=False)
+            for sid in ids
+        }
+        summary = prediction_service.compute_risk_scores_batch(db, chunk_size=5)
+
+        assert summary["total"] == 12
+        assert summary["processed"] == 12
+        assert summary["students_per_second"] > 0
+        for row in db.query(RiskScore).all():
+            exp = expected[row.student_id]
+            assert row.risk_score == pytest.approx(exp["risk_score"])
+            assert row.risk_level == exp["risk_level"]
+            assert row.shap_explanation == exp["shap_explanation"]
+
+    def test_batch_restricted_to_student_ids(self, db, prediction_service):
+        ids = _add_students(db, 6)
+
+        summary = prediction_service.compute_risk_scores_batch(db, student_ids=ids[:2])
+
+        assert summary["processed"] == 2
+        assert {r.student_id for r in db.query(RiskScore).all()} == set(ids[:2])
+
+    def test_history_only_appended_on_change(self, db, prediction_service):
+        _add_students(db, 4)
+
+        prediction_service.compute_all_risk_scores(db)
+        prediction_service.compute_all_risk_scores(db)
+
+        assert db.query(RiskHistory).count() == 4
+
+    def test_high_risk_students_get_one_intervention(self, db, prediction_service):
+        _add_students(db, 20)
+
+        first = prediction_service.compute_all_risk_scores(db)
+        second = prediction_service.compute_all_risk_scores(db)
+
+        high = db.query(RiskScore).filter(RiskScore.risk_level == RiskLevel.HIGH).count()
+        assert high > 0
+        assert db.query(Intervention).count() == high
+        assert first["interventions_created"] == high
+        assert second["interventions_created"] == 0
+
+    def test_empty_cohort(self, db, prediction_service):
+        summary = prediction_service.compute_all_risk_scores(db)
+        assert summary["total"] == 0
+        assert summary["processed"] == 0
+
+
+class TestBatchPersistence:
+    def _scored(self, db, rp, ids):
+        return rp._score_chunk(rp._require_model(), rp._load_metric_frame(db, ids))
+
+    def _writes(self, statements):
+        return [s for s in statements if s.lstrip().upper().startswith(("INSERT", "UPDATE"))
+                and ("risk_scores" in s or "risk_history" in s or "interventions" in s)]
+
+    def test_write_statements_do_not_grow_with_chunk(self, db, prediction_service, count_queries):
+        small = self._scored(db, prediction_service, _add_students(db, 3, prefix="SM"))
+        large = self._scored(db, prediction_service, _add_students(db, 40, prefix="LG"))
+        for results in (small, large):
+            for r in results:
+                r["risk_level"] = RiskLevel.HIGH
+
+        with count_queries() as small_statements:
+            prediction_service._save_risk_results(small, db)
+        with count_queries() as large_statements:
+            prediction_service._save_risk_results(large, db)
+
+        # one upsert, one history insert, one intervention insert
+        assert len(self._writes(small_statements)) == len(self._writes(large_statements)) == 3
+        db.commit()
+        assert db.query(RiskScore).count() == 43
+        assert db.query(RiskHistory).count() == 43
+        assert db.query(Intervention).count() == 43
+
+    def test_open_intervention_is_not_duplicated(self, db, prediction_service):
+        ids = _add_students(db, 2)
+        db.add(Intervention(student_id=ids[0], intervention_type=InterventionType.TUTORING,
+                            status=InterventionStatus.IN_PROGRESS, assigned_to="FAC001"))
+        db.commit()
+        results = self._scored(db, prediction_service, ids)
+        for r in results:
+            r["risk_level"] = RiskLevel.HIGH
+
+        prediction_service._save_risk_results(results, db)
+        db.commit()
+
+        created = db.query(Intervention).filter(Intervention.intervention_type == InterventionType.COUNSELING).all()
+        assert [i.student_id for i in created] == [ids[1]]
+        assert created[0].assigned_to == "Unassigned"
+
+    def test_loaded_risk_scores_see_the_upsert(self, db, sample_student, prediction_service):
+        loaded = db.query(RiskScore).filter_by(student_id="ST0001").one()
+        results = self._scored(db, prediction_service, ["ST0001"])
+        results[0]["risk_score"] = 12.5
+
+        prediction_service._save_risk_results(results, db)
+
+        assert loaded.risk_score == 12.5
+        assert [h.risk_score for h in sample_student.risk_history] == [12.5]
+
+
+class TestParallelRiskComputation:
+    def test_parallel_matches_serial_batch(self, db, prediction_service):
+        ids = _add_students(db, 9)
+        expected = {
+            sid: prediction_service.compute_student_risk(sid, db, save_to_db=False)
+            for sid in ids
+        }
+
+        summary = compute_risk_scores_parallel(db, workers=2, chunk_size=4)
+
+        assert summary["workers"] == 2
+        assert summary["processed"] == 9
+        for row in db.query(RiskScore).all():
+            exp = expected[row.student_id]
+            assert row.risk_score == pytest.approx(exp["risk_score"])
+            assert row.risk_level == exp["risk_level"]
+            assert row.shap_explanation == exp["shap_explanation"]
+        assert db.query(RiskHistory).count() == 9
+
+    def test_single_worker_uses_serial_path(self, db, prediction_service):
+        _add_students(db, 3)
+
+        summary = compute_risk_scores_parallel(db, workers=1)
+
+        assert summary["workers"] == 1
+        assert summary["processed"] == 3
+
+
+class TestSHAPCache:
+    def test_repeat_explanations_served_from_cache(self, db, prediction_service):
+        ids = _add_students(db, 3)
+
+        first = prediction_service.compute_student_risk(ids[0], db, save_to_db=False)
+        second = prediction_service.compute_student_risk(ids[0], db, save_to_db=False)
+        stats = prediction_service.get_shap_cache_stats()
+
+        assert second["shap_explanation"] == first["shap_explanation"]
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+
+    def test_batch_reuses_cached_rows(self, db, prediction_service):
+        ids = _add_students(db, 5)
+        expected = prediction_service.compute_student_risk(ids[0], db, save_to_db=False)
+
+        prediction_service.compute_risk_scores_batch(db)
+        stats = prediction_service.get_shap_cache_stats()
+        stored = db.query(RiskScore).filter(RiskScore.student_id == ids[0]).one()
+
+        assert stats["hits"] == 1
+        assert stats["misses"] == 5
+        assert stored.shap_explanation == expected["shap_explanation"]
+
+    def test_new_model_invalidates_cache(self, db, prediction_service, trained_risk_model):
+        ids = _add_students(db, 1)
+        prediction_service.compute_student_risk(ids[0], db, save_to_db=False)
+        assert prediction_service.get_shap_cache_stats()["size"] == 1
+
+        prediction_service.init_prediction_service(
+            trained_risk_model, prediction_service.get_shap_explainer(), 999,
+        )
+
+        assert prediction_service.get_shap_cache_stats()["size"] == 0
+
+
+class TestModelRegistry:
+    def test_active_model_is_registered_at_init(self, prediction_service, sample_model_version, trained_risk_model):
+        model, explainer = prediction_service.get_registered_model(sample_model_version)
+
+        assert model is trained_risk_model
+        assert explainer is prediction_service.get_shap_explainer()
+
+    def test_artifact_loaded_once_per_version(self, db, prediction_service, trained_risk_model, tmp_path, monkeypatch):
+        import joblib
+        from app.services.risk_model import RiskModel
+
+        path = tmp_path / "model_v2.pkl"
+        joblib.dump(trained_risk_model.calibrated_model, path)
+        mv = ModelVersion(
+            version="v2", model_path=str(path), accuracy=0.9, precision=0.9,
+            recall=0.9, f1_score=0.9, training_samples=300, feature_importance={},
+            is_active=False,
+        )
+        db.add(mv)
+        db.commit()
+
+        loads = []
+        original_load = RiskModel.load
+        monkeypatch.setattr(
+            RiskModel, "load",
+            lambda self, filepath: (loads.append(filepath), original_load(self, filepath))[1],
+        )
+
+        first = prediction_service.get_registered_model(mv)
+        second = prediction_service.get_registered_model(mv)
+
+        assert loads == [str(path)]
+        assert first is second
+        assert first[0].calibrated_model is not None
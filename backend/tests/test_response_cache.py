@@ -0,0 +1,87 @@
+"""Tests for the dashboard response cache."""
+
+import pytest
+
+from app.services.response_cache import (
+    CachedResponse, ResponseCache, bump_data_generation, current_generation, response_cache,
+)
+
+
+class TestResponseCache:
+    def test_entries_expire_with_the_generation(self):
+        cache = ResponseCache(max_size=4)
+        generation = current_generation()
+        cache.put(("/x", ""), CachedResponse(generation, b"{}", "application/json"))
+
+        assert cache.get(("/x", ""), generation).body == b"{}"
+        assert cache.get(("/x", ""), generation + 1) is None
+        assert cache.stats()["hit_rate"] == 0.5
+
+    def test_bounded_lru(self):
+        cache = ResponseCache(max_size=2)
+        for path in ("/a", "/b", "/c"):
+            cache.put((path, ""), CachedResponse(0, path.encode(), None))
+
+        assert cache.get(("/a", ""), 0) is None
+        assert cache.stats()["size"] == 2
+
+    def test_size_zero_disables(self):
+        cache = ResponseCache(max_size=0)
+        cache.put(("/a", ""), CachedResponse(0, b"", None))
+        assert cache.get(("/a", ""), 0) is None
+
+
+class TestCachedEndpoints:
+    @pytest.mark.parametrize("path", ["/api/faculty/overview", "/api/analytics/overview", "/api/engagement/overview"])
+    def test_second_request_is_served_from_cache(self, client, sample_student, path, count_queries):
+        first = client.get(path)
+        with count_queries() as statements:
+            second = client.get(path)
+
+        assert first.headers["x-cache"] == "MISS"
+        assert second.headers["x-cache"] == "HIT"
+        assert second.json() == first.json()
+        assert statements == []
+
+    def test_if_none_match_gets_304(self, client, sample_student):
+        etag = client.get("/api/faculty/overview").headers["etag"]
+
+        response = client.get("/api/faculty/overview", headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response_cache.stats()["not_modified"] == 1
+
+    def test_query_parameters_are_part_of_the_key(self, client, sample_student):
+        client.get("/api/engagement/overview")
+        response = client.get("/api/engagement/overview", params={"department": "CSE"})
+
+        assert response.headers["x-cache"] == "MISS"
+
+    def test_bump_invalidates(self, client, sample_student):
+        etag = client.get("/api/analytics/overview").headers["etag"]
+
+        bump_data_generation()
+        response = client.get("/api/analytics/overview", headers={"If-None-Match": etag})
+
+        assert response.status_code == 200
+        assert response.headers["x-cache"] == "MISS"
+        assert response.headers["etag"] != etag
+
+    def test_recalculation_bumps_generation(self, client, sample_student, prediction_service):
+        before = current_generation()
+
+        response = client.post("/api/faculty/recalculate", json={"student_id": "ST0001"})
+
+        assert response.status_code == 200
+        assert current_generation() > before
+
+    def test_stats_exposed_in_ml_metrics(self, client, sample_student):
+        client.get("/api/analytics/overview")
+        client.get("/api/analytics/overview")
+
+        stats = client.get("/api/analytics/ml-metrics").json()["response_cache"]
+
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == 0.5
@@ -1,6 +1,9 @@
 """Tests for API route handlers."""
 
+import time
+
 import pytest
+
 from app.models import (
     Student, StudentMetric, RiskScore, Intervention,
     Department, Section, RiskLevel, RiskTrend,
@@ -88,6 +91,31 @@ class TestAuthRoutes:
         assert "message" in response.json()
 
 
+def _add_scored_students(db, template, count, start=0, score=lambda i: 30.0):
+    """Clone *template* (with metrics and risk score) as SC### students."""
+    departments = list(Department)
+    sections = list(Section)
+    for i in range(start, start + count):
+        sid = f"SC{i:03d}"
+        db.add(Student(
+            id=sid, name=f"Scored {i}", avatar="SC", course=template.course,
+            department=departments[i % len(departments)], section=sections[i % len(sections)],
+            advisor_id="FAC002" if i % 2 else None,
+        ))
+        db.add(StudentMetric(
+            student_id=sid, attendance_rate=80.0, engagement_score=70.0,
+            academic_performance_index=7.0, login_gap_days=1, failure_ratio=0.1,
+            financial_risk_flag=False, commute_risk_score=1, semester_performance_trend=0.0,
+        ))
+        db.add(RiskScore(
+            student_id=sid, risk_score=score(i),
+            risk_level=RiskLevel.HIGH if score(i) >= 70 else RiskLevel.SAFE,
+            risk_trend=RiskTrend.STABLE, risk_value="Stable",
+            model_version_id=template.risk_score.model_version_id,
+        ))
+    db.commit()
+
+
 class TestStudentsRoutes:
     def test_get_all_students(self, client, sample_student):
         response = client.get("/api/students")
@@ -96,6 +124,80 @@ class TestStudentsRoutes:
         assert isinstance(data, list)
         assert len(data) >= 1
         assert data[0]["id"] == "ST0001"
+        assert data[0]["primaryRiskDriver"] == "Attendance Rate (15%)"
+
+    def test_get_all_students_constant_query_count(self, client, db, sample_student, count_queries):
+        def list_students():
+            with count_queries() as statements:
+                response = client.get("/api/students")
+            assert response.status_code == 200
+            return len(response.json()), len(statements)
+
+        _add_scored_students(db, sample_student, 2)
+        small = list_students()
+        _add_scored_students(db, sample_student, 40, start=2)
+        large = list_students()
+
+        assert small[0] == 3 and large[0] == 43
+        assert small[1] == large[1] == 1
+
+    def test_get_all_students_skips_unscored(self, client, db, sample_student):
+        db.add(Student(
+            id="ST0002", name="No Score", avatar="NS", course="B.Tech CS",
+            department=Department.CSE, section=Section.A,
+        ))
+        db.commit()
+
+        response = client.get("/api/students")
+
+        assert [s["id"] for s in response.json()] == ["ST0001"]
+
+    def test_students_page_walks_cohort_by_cursor(self, client, db, sample_student):
+        _add_scored_students(db, sample_student, 20, score=lambda i: float((i * 37) % 100) // 10 * 10)
+        everyone = sorted(
+            ((r.risk_score, r.student_id) for r in db.query(RiskScore).all()), reverse=True,
+        )
+
+        seen, cursor = [], None
+        while True:
+            params = {"limit": 6, **({"cursor": cursor} if cursor else {})}
+            response = client.get("/api/students/page", params=params)
+            assert response.status_code == 200
+            page = response.json()
+            seen.extend((item["risk_score"], item["id"]) for item in page["items"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+
+        assert seen == everyone  # ties on risk_score broken by id, no gaps or repeats
+
+    def test_students_page_filters_and_ascending_order(self, client, db, sample_student):
+        _add_scored_students(db, sample_student, 12, score=lambda i: 10.0 * (i % 10))
+
+        response = client.get("/api/students/page", params={"risk_level": "High Risk", "order": "asc"})
+        items = response.json()["items"]
+        assert items and all(i["risk_level"] == "High Risk" for i in items)
+        assert [i["risk_score"] for i in items] == sorted(i["risk_score"] for i in items)
+
+        response = client.get("/api/students/page", params={"section": "B", "advisor": "FAC002"})
+        items = response.json()["items"]
+        assert items and all(i["section"] == "B" and i["advisor"] == "FAC002" for i in items)
+
+    def test_students_page_deep_page_uses_keyset(self, client, db, sample_student, count_queries):
+        _add_scored_students(db, sample_student, 10, score=lambda i: float(i))
+        cursor = client.get("/api/students/page", params={"limit": 5}).json()["next_cursor"]
+
+        with count_queries() as statements:
+            response = client.get("/api/students/page", params={"limit": 5, "cursor": cursor})
+
+        assert response.status_code == 200
+        assert len(statements) == 1
+        assert "(risk_scores.risk_score, risk_scores.student_id) < (?, ?)" in statements[0]
+        assert [i["id"] for i in response.json()["items"]] == ["SC005", "SC004", "SC003", "SC002", "SC001"]
+
+    def test_students_page_invalid_cursor(self, client, sample_student):
+        response = client.get("/api/students/page", params={"cursor": "not-a-cursor"})
+        assert response.status_code == 400
 
     def test_get_student_by_id(self, client, sample_student):
         response = client.get("/api/students/ST0001")
@@ -194,6 +296,151 @@ class TestFacultyDashboardRoutes:
         assert response.status_code == 200
         assert "text/csv" in response.headers["content-type"]
 
+    def test_csv_export_streams_in_batches(self, client, db, sample_student, monkeypatch):
+        import csv
+        import io
+        from app.services import student_export
+
+        monkeypatch.setattr(student_export, "EXPORT_BATCH", 4)
+        _add_scored_students(db, sample_student, 9, score=lambda i: float(i * 10))
+
+        with client.stream("GET", "/api/faculty/export") as response:
+            assert response.status_code == 200
+            chunks = list(response.iter_text())
+
+        rows = list(csv.DictReader(io.StringIO("".join(chunks))))
+        assert [r["student_id"] for r in rows][:3] == ["SC008", "SC007", "SC006"]
+        assert len(rows) == 10
+        assert rows[0]["risk_score"] == "80.0"
+        assert rows[0]["department"] == list(Department)[8 % len(Department)].value
+
+    @pytest.mark.parametrize("path", ["/api/faculty/export", "/api/students"])
+    def test_streams_read_on_their_own_session(self, client, sample_student, monkeypatch, path):
+        import app.database as db_module
+
+        opened = []
+        session_factory = db_module.SessionLocal
+
+        def tracking_session():
+            session = session_factory()
+            opened.append(session)
+            return session
+
+        monkeypatch.setattr(db_module, "SessionLocal", tracking_session)
+
+        response = client.get(path)
+
+        assert response.status_code == 200
+        assert "ST0001" in response.text
+        assert len(opened) == 1
+        assert opened[0].get_transaction() is None  # closed once the body was sent
+
+    def test_csv_export_gzip(self, client, sample_student):
+        import gzip
+
+        plain = client.get("/api/faculty/export").content
+        response = client.get("/api/faculty/export", params={"gzip": "true"})
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/gzip"
+        assert response.headers["content-disposition"].endswith(".csv.gz")
+        assert gzip.decompress(response.content) == plain
+
+
+    def test_csv_upload_runs_as_job(self, client, sample_student, prediction_service):
+        csv = (
+            "student_id,date,status\n"
+            "ST0001,2026-01-05,Present\n"
+            "GHOST,2026-01-05,Present\n"
+            "ST0001,2026-01-06,Absent\n"
+        )
+        response = client.post(
+            "/api/faculty/upload/attendance",
+            files={"file": ("attendance.csv", csv, "text/csv")},
+        )
+        assert response.status_code == 202
+        accepted = response.json()
+        assert accepted["status_url"] == f"/api/jobs/{accepted['job_id']}"
+
+        job = _wait_for_job(client, accepted["job_id"])
+        assert job["status"] == "succeeded"
+        assert job["job_type"] == "upload_attendance"
+        assert set(job["stage_timings"]) == {"ingest", "features", "inference", "persistence"}
+        assert job["progress"]["students_scored"] == 1
+        assert job["errors"] == ["Row 1: student 'GHOST' not in DB — skipped"]
+
+        data = job["result"]
+        assert data["rows_processed"] == 2
+        assert data["students_affected"] == 1
+        assert data["recalculations_triggered"] == 1
+        assert data["rejected_rows"] == [1]
+
+    def test_csv_upload_missing_columns_rejected_immediately(self, client, sample_student):
+        response = client.post(
+            "/api/faculty/upload/attendance",
+            files={"file": ("attendance.csv", "student_id,status\nST0001,Present\n", "text/csv")},
+        )
+        assert response.status_code == 422
+        assert "Missing required columns" in response.json()["detail"]
+
+
+class TestUploadIngest:
+    """Blocking bodies of the /api/faculty/upload/* routes in app/routes/upload.py."""
+
+    CSV = b"student_id,marks_obtained,max_marks\nST0001,18,20\nST0001,12,20\n"
+
+    def _upload(self):
+        import io
+
+        from fastapi import UploadFile
+
+        return UploadFile(file=io.BytesIO(self.CSV), filename="marks.csv")
+
+    def test_rows_and_feature_deltas_commit_together(self, db, sample_student):
+        from app.models import StudentFeatureAggregate, StudentRawMarks
+        from app.routes import upload
+
+        result = upload._ingest_marks(self._upload(), db)
+        db.rollback()  # anything not committed is discarded
+
+        assert result["inserted"] == 2
+        assert db.query(StudentRawMarks).count() == 2
+        assert db.query(StudentFeatureAggregate).filter_by(student_id="ST0001").count() == 1
+
+    def test_failed_feature_update_rolls_back_the_chunk(self, db, sample_student, monkeypatch):
+        from fastapi import HTTPException
+
+        from app.models import StudentRawMarks
+        from app.routes import upload
+
+        def boom(db, **frames):
+            raise RuntimeError("aggregate write failed")
+
+        monkeypatch.setattr(upload, "update_features_incremental", boom)
+
+        with pytest.raises(HTTPException) as excinfo:
+            upload._ingest_marks(self._upload(), db)
+
+        assert excinfo.value.status_code == 500
+        assert "after 0 rows" in excinfo.value.detail
+        assert db.query(StudentRawMarks).count() == 0
+
+
+def _wait_for_job(client, job_id, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = client.get(f"/api/jobs/{job_id}").json()
+        if job["status"] in ("succeeded", "failed"):
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+class TestJobRoutes:
+    def test_unknown_job_returns_404(self, client):
+        response = client.get("/api/jobs/does-not-exist")
+        assert response.status_code == 404
+
 
 class TestAnalyticsRoutes:
     def test_analytics_overview(self, client, sample_student):
@@ -203,6 +450,128 @@ class TestAnalyticsRoutes:
         assert "total_students" in data
         assert "risk_distribution" in data
 
+    def test_department_views_agree_in_at_most_two_queries(self, client, db, sample_student, count_queries):
+        _add_scored_students(db, sample_student, 14, score=lambda i: 80.0 if i % 3 == 0 else 20.0)
+        expected = {}
+        for student in db.query(Student).all():
+            total, high = expected.get(student.department.value, (0, 0))
+            expected[student.department.value] = (
+                total + 1, high + (student.risk_score.risk_level == RiskLevel.HIGH),
+            )
+
+        with count_queries() as statements:
+            faculty = client.get("/api/faculty/analytics/department").json()
+            faculty_queries = len(statements)
+            analytics = client.get("/api/analytics/department-breakdown").json()
+            performance = client.get("/api/performance/department-breakdown").json()
+
+        assert faculty_queries == 2
+        assert len(statements) == 4
+        assert {d["department"]: (d["total_students"], d["high_risk_count"]) for d in faculty} == expected
+        assert {d["department"]: (d["total_students"], d["high_risk_count"]) for d in analytics} == expected
+        assert {d["department"]: d["total_students"] for d in performance} == {
+            dept: total for dept, (total, _) in expected.items()
+        }
+
+    def test_department_stats_compile_for_mysql(self):
+        from sqlalchemy.dialects import mysql
+
+        from app.services.department_analytics import _department_stats_select
+
+        sql = str(_department_stats_select().compile(dialect=mysql.dialect())).upper()
+
+        assert "FILTER" not in sql  # MySQL has no aggregate FILTER clause
+
+
+def _add_interventions(db, student_ids, count):
+    """Interventions one minute apart (newest last), cycling statuses and students."""
+    from datetime import datetime, timedelta
+
+    statuses = [InterventionStatus.PENDING, InterventionStatus.IN_PROGRESS, InterventionStatus.COMPLETED]
+    start = datetime(2026, 1, 1)
+    for i in range(count):
+        db.add(Intervention(
+            student_id=student_ids[i % len(student_ids)],
+            intervention_type=InterventionType.COUNSELING,
+            status=statuses[i % len(statuses)],
+            notes=f"note {i}",
+            created_at=start + timedelta(minutes=i),
+        ))
+    db.commit()
+
+
+class TestInterventionListingRoutes:
+    def test_board_pages_through_all_interventions(self, client, db, sample_student):
+        _add_scored_students(db, sample_student, 4)
+        _add_interventions(db, ["ST0001", "SC000", "SC001", "SC002", "SC003"], 12)
+
+        seen, cursor = [], None
+        while True:
+            params = {"limit": 5, **({"cursor": cursor} if cursor else {})}
+            data = client.get("/api/analytics/interventions", params=params).json()
+            page = data["pending"] + data["in_progress"] + data["completed"]
+            assert len(page) <= 5
+            seen += [card["alertDescription"] for card in sorted(page, key=lambda c: c["createdAt"], reverse=True)]
+            cursor = data["next_cursor"]
+            if cursor is None:
+                break
+
+        assert seen == [f"note {i}" for i in range(11, -1, -1)]
+
+    def test_board_status_filter_and_joined_columns(self, client, db, sample_student):
+        _add_interventions(db, ["ST0001"], 6)
+
+        data = client.get("/api/analytics/interventions", params={"status": "pending,in progress"}).json()
+
+        assert len(data["pending"]) == 2 and len(data["in_progress"]) == 2
+        assert data["completed"] == []
+        card = data["pending"][0]
+        assert card["studentName"] == sample_student.name
+        assert card["riskLevel"] == sample_student.risk_score.risk_level.value
+
+    def test_page_is_one_query_plus_totals(self, client, db, sample_student, count_queries):
+        _add_scored_students(db, sample_student, 10)
+        _add_interventions(db, [f"SC{i:03d}" for i in range(10)], 30)
+
+        with count_queries() as statements:
+            board = client.get("/api/analytics/interventions").json()
+            performance = client.get("/api/performance/interventions", params={"limit": 10}).json()
+
+        # the page select and the GROUP BY status count, per endpoint
+        assert len(statements) == 2 * 2
+        assert sum("GROUP BY" in s for s in statements) == 2
+        assert sum(len(board[k]) for k in ("pending", "in_progress", "completed")) == 30
+        assert len(performance["interventions"]) == 10
+        assert performance["next_cursor"] is not None
+
+    def test_totals_cover_every_page(self, client, db, sample_student):
+        _add_interventions(db, ["ST0001"], 11)
+        db.add(Intervention(student_id="ST0001", intervention_type=InterventionType.TUTORING,
+                            status=InterventionStatus.CANCELLED))
+        db.commit()
+
+        board = client.get("/api/analytics/interventions", params={"limit": 2}).json()
+        performance = client.get("/api/performance/interventions", params={"limit": 2}).json()
+
+        assert board["totals"] == {"pending": 4, "in_progress": 4, "completed": 4}
+        assert len(performance["interventions"]) == 2
+        assert (performance["total"], performance["pending"], performance["in_progress"],
+                performance["completed"]) == (12, 4, 4, 3)
+
+    def test_performance_department_filter(self, client, db, sample_student):
+        _add_scored_students(db, sample_student, 7)
+        _add_interventions(db, [f"SC{i:03d}" for i in range(7)], 7)
+
+        data = client.get("/api/performance/interventions", params={"department": "CSE"}).json()
+
+        cse = {s.id for s in db.query(Student).filter(Student.department == Department.CSE)}
+        assert data["total"] == len(data["interventions"]) >= 1
+        assert {iv["student_id"] for iv in data["interventions"]} <= cse
+
+    def test_invalid_cursor_is_400(self, client):
+        response = client.get("/api/analytics/interventions", params={"cursor": "garbage"})
+        assert response.status_code == 400
+
 
 class TestStudentDashboardRoutes:
     def test_student_overview(self, client, sample_student):
@@ -246,6 +615,40 @@ class TestEngagementRoutes:
         assert "weeks" in data
 
 
+class TestPredictionRoutes:
+    PAYLOAD = {
+        "student_id": "NEW001",
+        "metrics": {
+            "attendance_rate": 55.0,
+            "engagement_score": 40.0,
+            "academic_performance_index": 4.5,
+            "login_gap_days": 9,
+            "failure_ratio": 0.7,
+            "financial_risk_flag": True,
+            "commute_risk_score": 3,
+            "semester_performance_trend": -5.0,
+            "last_interaction": "2026-01-15T10:00:00",
+        },
+    }
+
+    def test_predict_uses_registered_model(self, client, prediction_service, monkeypatch):
+        from app.services.risk_model import RiskModel
+
+        def _fail_load(self, filepath):
+            raise AssertionError("model reloaded from disk")
+
+        monkeypatch.setattr(RiskModel, "load", _fail_load)
+
+        first = client.post("/api/predict", json=self.PAYLOAD)
+        second = client.post("/api/predict", json=self.PAYLOAD)
+
+        assert first.status_code == 200
+        assert second.json() == first.json()
+        assert 0 <= first.json()["risk_score"] <= 100
+        assert first.json()["top_factors"]
+        assert prediction_service.get_shap_cache_stats()["hits"] == 1
+
+
 class TestFrontendRoute:
     def test_get_all_students_frontend(self, client, sample_student):
         response = client.get("/api/students/all")
@@ -0,0 +1,103 @@
+"""Tests for the SHAP explainability service."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.shap_cache import SHAPExplanationCache
+from app.services.shap_explainer import SHAPExplainer
+
+
+@pytest.fixture(scope="module")
+def feature_rows():
+    rng = np.random.default_rng(7)
+    n = 25
+    return pd.DataFrame({
+        "attendance_rate": rng.uniform(40, 100, n),
+        "engagement_score": rng.uniform(20, 100, n),
+        "academic_performance_index": rng.uniform(2, 10, n),
+        "login_gap_days": rng.integers(0, 15, n),
+        "failure_ratio": rng.uniform(0, 1, n),
+        "financial_risk_flag": rng.integers(0, 2, n),
+        "commute_risk_score": rng.integers(1, 5, n),
+        "semester_performance_trend": rng.uniform(-20, 20, n),
+    })
+
+
+@pytest.fixture(scope="module")
+def explainer(trained_risk_model):
+    return SHAPExplainer(trained_risk_model.calibrated_model)
+
+
+class TestExplainBatch:
+    def test_rows_match_single_row_explain(self, explainer, feature_rows):
+        batch = explainer.explain_batch(feature_rows, top_n=5)
+
+        assert len(batch) == len(feature_rows)
+        for i in range(len(feature_rows)):
+            single = explainer.explain(feature_rows.iloc[[i]], top_n=5)
+            assert batch.to_storage(i)["top_factors"] == [f.model_dump() for f in single]
+
+    def test_factors_sorted_by_impact(self, explainer, feature_rows):
+        batch = explainer.explain_batch(feature_rows, top_n=3)
+
+        assert batch.indices.shape == (len(feature_rows), 3)
+        assert np.all(np.diff(batch.impacts, axis=1) <= 0)
+
+    def test_top_n_larger_than_feature_count(self, explainer, feature_rows):
+        batch = explainer.explain_batch(feature_rows.iloc[:2], top_n=50)
+
+        assert batch.indices.shape == (2, feature_rows.shape[1])
+        assert sorted(batch.indices[0]) == list(range(feature_rows.shape[1]))
+
+    def test_uninitialized_explainer_returns_none(self, feature_rows):
+        explainer = SHAPExplainer.__new__(SHAPExplainer)
+        explainer.explainer = None
+
+        assert explainer.explain_batch(feature_rows) is None
+        assert explainer.explain(feature_rows) == []
+
+
+class TestSHAPExplanationCache:
+    EXPLANATION = {"top_factors": [{"feature": "Attendance Rate", "impact": 0.2, "direction": "positive"}]}
+
+    def test_key_quantises_feature_values(self):
+        cache = SHAPExplanationCache(10, decimals=3)
+
+        assert cache.key(1, 5, np.array([1.00001, 2.0])) == cache.key(1, 5, np.array([1.0, 2.0]))
+        assert cache.key(1, 5, np.array([1.0, 2.0])) != cache.key(2, 5, np.array([1.0, 2.0]))
+        assert cache.key(1, 5, np.array([1.0, 2.0])) != cache.key(1, 3, np.array([1.0, 2.0]))
+
+    def test_hit_miss_and_lru_eviction(self):
+        cache = SHAPExplanationCache(2)
+        a, b, c = (cache.key(1, 5, np.array([float(v)])) for v in range(3))
+
+        assert cache.get(a) is None
+        cache.put(a, self.EXPLANATION)
+        cache.put(b, self.EXPLANATION)
+        assert cache.get(a) == self.EXPLANATION   # a is now most recent
+        cache.put(c, self.EXPLANATION)            # evicts b
+
+        assert cache.get(b) is None
+        assert cache.get(a) is not None
+        assert cache.stats() == {
+            "size": 2, "max_size": 2, "hits": 2, "misses": 2,
+            "evictions": 1, "hit_rate": 0.5,
+        }
+
+    def test_returned_entries_are_copies(self):
+        cache = SHAPExplanationCache(2)
+        key = cache.key(1, 5, np.array([1.0]))
+        cache.put(key, self.EXPLANATION)
+
+        cache.get(key)["top_factors"][0]["impact"] = 99
+
+        assert cache.get(key) == self.EXPLANATION
+
+    def test_zero_size_disables_caching(self):
+        cache = SHAPExplanationCache(0)
+        key = cache.key(1, 5, np.array([1.0]))
+        cache.put(key, self.EXPLANATION)
+
+        assert cache.get(key) is None
+        assert cache.stats()["size"] == 0
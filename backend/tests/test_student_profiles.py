@@ -0,0 +1,122 @@
+"""Tests for the precomputed faculty profile documents."""
+
+from datetime import datetime, timedelta
+
+from app.models import (
+    Department, Intervention, InterventionStatus, InterventionType, RiskHistory, RiskLevel,
+    Section, Student, StudentProfileDocument,
+)
+from app.services import student_profiles
+from app.services.student_profiles import (
+    PROFILE_HISTORY_LIMIT, get_profile_document, invalidate_profiles, refresh_profiles,
+)
+
+
+class TestProfileDocuments:
+    def test_document_matches_profile(self, db, sample_student):
+        db.add(Intervention(student_id="ST0001", intervention_type=InterventionType.TUTORING,
+                            status=InterventionStatus.PENDING, assigned_to="FAC001"))
+        db.commit()
+
+        document = get_profile_document(db, "ST0001")
+
+        assert document["id"] == "ST0001"
+        assert document["advisor"] == "FAC001"
+        assert document["risk_score"] == 35.2
+        assert document["attendance_rate"] == 82.5
+        assert [f["feature"] for f in document["shap_factors"]] == ["Attendance Rate", "Engagement Score"]
+        assert document["interventions"][0]["intervention_type"] == InterventionType.TUTORING.value
+        assert db.query(StudentProfileDocument).count() == 1
+
+    def test_history_is_capped_newest_first(self, db, sample_student, sample_model_version):
+        start = datetime(2026, 1, 1)
+        for day in range(PROFILE_HISTORY_LIMIT + 5):
+            db.add(RiskHistory(student_id="ST0001", risk_score=float(day), risk_level=RiskLevel.SAFE,
+                               model_version_id=sample_model_version.id,
+                               recorded_at=start + timedelta(days=day)))
+        db.commit()
+
+        history = get_profile_document(db, "ST0001")["risk_history"]
+
+        assert len(history) == PROFILE_HISTORY_LIMIT
+        assert history[0]["risk_score"] == PROFILE_HISTORY_LIMIT + 4
+
+    def test_stored_document_is_one_read(self, db, sample_student, count_queries):
+        get_profile_document(db, "ST0001")
+
+        with count_queries() as statements:
+            document = get_profile_document(db, "ST0001")
+
+        assert document["id"] == "ST0001"
+        assert len(statements) == 1
+        assert "student_profiles" in statements[0]
+
+    def test_batch_refresh_query_count_is_flat(self, db, sample_student, monkeypatch, count_queries):
+        monkeypatch.setattr(student_profiles, "PROFILE_BATCH", 10)
+        for i in range(25):
+            db.add(Student(id=f"PD{i:02d}", name=f"Doc {i}", course="B.Tech",
+                           department=Department.CIVIL, section=Section.B))
+        db.commit()
+        ids = [f"PD{i:02d}" for i in range(25)]
+
+        with count_queries() as statements:
+            written = refresh_profiles(db, ids)
+
+        # per batch of 10: students, metrics, risk scores, history, interventions, upsert
+        assert written == 25
+        assert len(statements) == 3 * 6
+
+    def test_unknown_student(self, db):
+        assert get_profile_document(db, "NOPE") is None
+        assert db.query(StudentProfileDocument).count() == 0
+
+    def test_invalidate_drops_documents(self, db, sample_student):
+        refresh_profiles(db, ["ST0001"])
+        invalidate_profiles(db, ["ST0001"])
+        db.commit()
+
+        assert db.query(StudentProfileDocument).count() == 0
+
+    def test_batch_scoring_invalidates_single_scoring_refreshes(self, db, sample_student, prediction_service):
+        get_profile_document(db, "ST0001")
+
+        prediction_service.compute_risk_scores_batch(db)
+        assert db.query(StudentProfileDocument).count() == 0
+
+        result = prediction_service.compute_student_risk("ST0001", db)
+        stored = db.query(StudentProfileDocument).one().document
+        assert stored["risk_score"] == result["risk_score"]
+        assert stored["risk_level"] == result["risk_level"]
+
+
+class TestProfileRoutes:
+    def test_profile_view_builds_then_reads_document(self, client, sample_student, count_queries):
+        first = client.get("/api/faculty/students/ST0001")
+        with count_queries() as statements:
+            second = client.get("/api/faculty/students/ST0001")
+
+        assert first.status_code == 200
+        assert second.json() == first.json()
+        assert len(statements) == 1
+
+    def test_missing_student_is_404(self, client):
+        assert client.get("/api/faculty/students/NOPE").status_code == 404
+
+    def test_recalculation_rebuilds_document(self, client, db, sample_student, prediction_service):
+        client.get("/api/faculty/students/ST0001")
+
+        result = client.post("/api/faculty/recalculate", json={"student_id": "ST0001"}).json()
+        profile = client.get("/api/faculty/students/ST0001").json()
+
+        assert profile["risk_score"] == result["risk_score"]
+        assert profile["risk_level"] == result["risk_level"]
+        assert len(profile["risk_history"]) == 1
+
+    def test_new_intervention_rebuilds_document(self, client, sample_student):
+        client.get("/api/faculty/students/ST0001")
+
+        response = client.post("/api/students/ST0001/escalate")
+        profile = client.get("/api/faculty/students/ST0001").json()
+
+        assert [i["id"] for i in profile["interventions"]] == [response.json()["intervention_id"]]
+        assert profile["interventions"][0]["assigned_to"] == "Dean of Students"
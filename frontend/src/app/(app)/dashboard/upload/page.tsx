@@ -5,7 +5,7 @@ import {
     Upload, FileText, CheckCircle, AlertCircle, Loader2, Database,
     Users, BookOpen, ClipboardList, X
 } from "lucide-react";
-import apiClient from "@/lib/api";
+import { facultyService } from "@/services/faculty";
 
 type DataType = "attendance" | "marks" | "assignments";
 
@@ -61,18 +61,24 @@ export default function UploadDataPage() {
         setUploading(true);
         setResult(null);
 
-        const formData = new FormData();
-        formData.append("file", file);
-
         try {
-            const res = await apiClient.post(`/faculty/upload/${type}`, formData);
-            const json = res.data;
+            const { job_id } = await facultyService.uploadData(type, file);
+            const job = await facultyService.waitForJob(job_id);
+
+            if (job.status === "failed" || !job.result) {
+                setResult({
+                    status: "error",
+                    message: "Upload failed",
+                    detail: job.error || "Background processing failed.",
+                });
+                return;
+            }
 
             setResult({
                 status: "success",
-                message: json.message || "Upload successful!",
-                inserted: json.rows_processed,
-                skipped: json.errors?.length || 0,
+                message: job.result.message || "Upload successful!",
+                inserted: job.result.rows_processed,
+                skipped: job.result.rejected_rows.length,
             });
             setFile(null);
         } catch (err: unknown) {
@@ -9,28 +9,39 @@ import { InterventionCardProps } from "@/components/interventions/InterventionCa
 import { AssignFacultyModal } from "@/components/interventions/AssignFacultyModal";
 import { SuccessAnimation } from "@/components/interventions/SuccessAnimation";
 import { NewInterventionModal } from "@/components/interventions/NewInterventionModal";
-import apiClient from "@/lib/api";
+import { facultyService } from "@/services/faculty";
 
 export default function InterventionsPage() {
   const [pending, setPending] = useState<InterventionCardProps[]>([]);
   const [inProgress, setInProgress] = useState<InterventionCardProps[]>([]);
   const [completed, setCompleted] = useState<InterventionCardProps[]>([]);
   const [loading, setLoading] = useState(true);
-
-  useEffect(() => {
-    apiClient.get('/analytics/interventions')
-      .then((res) => {
-        const data = res.data;
-        setPending(data.pending || []);
-        setInProgress(data.in_progress || []);
-        setCompleted(data.completed || []);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+
+  // Appends one page of older interventions to the columns.
+  const loadPage = (cursor: string | null) =>
+    facultyService.getInterventionPage<InterventionCardProps>(cursor)
+      .then((page) => {
+        setPending(prev => [...prev, ...page.pending]);
+        setInProgress(prev => [...prev, ...page.in_progress]);
+        setCompleted(prev => [...prev, ...page.completed]);
+        setNextCursor(page.next_cursor);
       })
       .catch((err) => {
         console.error('Failed to fetch interventions:', err);
-      })
-      .finally(() => setLoading(false));
+      });
+
+  useEffect(() => {
+    loadPage(null).finally(() => setLoading(false));
   }, []);
 
+  const handleLoadMore = () => {
+    if (!nextCursor || loadingMore) return;
+    setLoadingMore(true);
+    loadPage(nextCursor).finally(() => setLoadingMore(false));
+  };
+
   const [isAssignModalOpen, setIsAssignModalOpen] = useState(false);
   const [isNewInterventionOpen, setIsNewInterventionOpen] = useState(false);
   const [selectedInterventionId, setSelectedInterventionId] = useState<string | null>(null);
@@ -112,13 +123,24 @@ export default function InterventionsPage() {
             Manage and track student support actions based on risk predictions.
           </p>
         </div>
-        <button
-          onClick={() => setIsNewInterventionOpen(true)}
-          className="flex items-center gap-2 rounded-lg bg-blue-600 px-4 py-2 text-sm font-semibold text-white hover:bg-blue-700 transition-colors"
-        >
-          <Plus size={16} />
-          New Intervention
-        </button>
+        <div className="flex items-center gap-2">
+          {nextCursor && (
+            <button
+              onClick={handleLoadMore}
+              disabled={loadingMore}
+              className="rounded-lg border border-gray-200 bg-white px-4 py-2 text-sm font-semibold text-gray-700 hover:bg-gray-50 transition-colors disabled:opacity-50"
+            >
+              {loadingMore ? "Loading..." : "Load older interventions"}
+            </button>
+          )}
+          <button
+            onClick={() => setIsNewInterventionOpen(true)}
+            className="flex items-center gap-2 rounded-lg bg-blue-600 px-4 py-2 text-sm font-semibold text-white hover:bg-blue-700 transition-colors"
+          >
+            <Plus size={16} />
+            New Intervention
+          </button>
+        </div>
       </section>
 
       {/* Filters */}
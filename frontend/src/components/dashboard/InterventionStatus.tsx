@@ -3,7 +3,7 @@
 import { ArrowRight, Loader2 } from "lucide-react";
 import Link from "next/link";
 import { useState, useEffect } from "react";
-import apiClient from "@/lib/api";
+import { facultyService } from "@/services/faculty";
 
 interface InterventionItemProps {
     label: string;
@@ -33,10 +33,9 @@ export function InterventionStatus() {
     const [loading, setLoading] = useState(true);
 
     useEffect(() => {
-        apiClient.get('/analytics/interventions')
-            .then(res => {
-                const { pending = [], in_progress = [], completed = [] } = res.data;
-                const total = pending.length + in_progress.length + completed.length;
+        facultyService.getInterventionTotals()
+            .then(({ pending, in_progress, completed }) => {
+                const total = pending + in_progress + completed;
                 if (total === 0) {
                     setMetrics([
                         { label: "Pending", percentage: 0, color: "bg-amber-500" },
@@ -45,9 +44,9 @@ export function InterventionStatus() {
                     ]);
                 } else {
                     setMetrics([
-                        { label: "Pending", percentage: Math.round((pending.length / total) * 100), color: "bg-amber-500" },
-                        { label: "In Progress", percentage: Math.round((in_progress.length / total) * 100), color: "bg-blue-600" },
-                        { label: "Completed", percentage: Math.round((completed.length / total) * 100), color: "bg-emerald-500" },
+                        { label: "Pending", percentage: Math.round((pending / total) * 100), color: "bg-amber-500" },
+                        { label: "In Progress", percentage: Math.round((in_progress / total) * 100), color: "bg-blue-600" },
+                        { label: "Completed", percentage: Math.round((completed / total) * 100), color: "bg-emerald-500" },
                     ]);
                 }
             })
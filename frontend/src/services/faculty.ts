@@ -11,6 +11,26 @@ export interface FacultyOverview {
     risk_distribution: Record<string, number>;
 }
 
+export interface UploadSummary {
+    rows_processed: number;
+    students_affected: number;
+    recalculations_triggered: number;
+    errors: string[];
+    rejected_rows: number[];
+    message: string;
+}
+
+export interface JobStatus {
+    id: string;
+    job_type: string;
+    status: 'queued' | 'running' | 'succeeded' | 'failed';
+    progress: Record<string, number>;
+    stage_timings: Record<string, number>;
+    errors: string[];
+    error: string | null;
+    result: UploadSummary | null;
+}
+
 export interface StudentSummary {
     id: string;
     name: string;
@@ -21,6 +41,23 @@ export interface StudentSummary {
     engagement: number;
 }
 
+export interface InterventionTotals {
+    pending: number;
+    in_progress: number;
+    completed: number;
+}
+
+export interface InterventionBoardPage<T = Record<string, unknown>> {
+    pending: T[];
+    in_progress: T[];
+    completed: T[];
+    next_cursor: string | null;
+    // Per-column counts over every page, not just this one
+    totals: InterventionTotals;
+}
+
+const INTERVENTION_PAGE_SIZE = 100;
+
 export interface AnalyticsData {
     department_risks: {
         department: string;
@@ -60,13 +97,48 @@ export const facultyService = {
         return { department_risks: response.data };
     },
 
-    uploadData: async (dataType: 'attendance' | 'marks' | 'assignments', file: File): Promise<{ message: string }> => {
+    // One page of the intervention board, newest first; pass next_cursor for the next one.
+    getInterventionPage: async <T = Record<string, unknown>>(cursor?: string | null): Promise<InterventionBoardPage<T>> => {
+        const params: Record<string, string | number> = { limit: INTERVENTION_PAGE_SIZE };
+        if (cursor) params.cursor = cursor;
+        const response = await apiClient.get('/analytics/interventions', { params });
+        return {
+            pending: response.data.pending || [],
+            in_progress: response.data.in_progress || [],
+            completed: response.data.completed || [],
+            next_cursor: response.data.next_cursor ?? null,
+            totals: response.data.totals,
+        };
+    },
+
+    // Per-status counts only (a one-card page carries the same totals).
+    getInterventionTotals: async (): Promise<InterventionTotals> => {
+        const response = await apiClient.get('/analytics/interventions', { params: { limit: 1 } });
+        return response.data.totals;
+    },
+
+    uploadData: async (dataType: 'attendance' | 'marks' | 'assignments', file: File): Promise<{ job_id: string; status_url: string }> => {
         const formData = new FormData();
         formData.append('file', file);
         const response = await apiClient.post(`/faculty/upload/${dataType}`, formData);
         return response.data;
     },
 
+    getJob: async (jobId: string): Promise<JobStatus> => {
+        const response = await apiClient.get(`/jobs/${jobId}`);
+        return response.data;
+    },
+
+    // Poll a background job until it succeeds or fails.
+    waitForJob: async (jobId: string, onProgress?: (job: JobStatus) => void, intervalMs = 1000): Promise<JobStatus> => {
+        for (;;) {
+            const job = await facultyService.getJob(jobId);
+            onProgress?.(job);
+            if (job.status === 'succeeded' || job.status === 'failed') return job;
+            await new Promise((resolve) => setTimeout(resolve, intervalMs));
+        }
+    },
+
     recalculateRisk: async (): Promise<{ message: string }> => {
         const response = await apiClient.post('/faculty/recalculate');
         return response.data;
@@ -30,6 +30,49 @@ export async function fetchStudents(): Promise<Student[]> {
     }
 }
 
+export interface StudentListItem {
+    id: string;
+    name: string;
+    avatar: string;
+    department: string;
+    course: string;
+    section: string;
+    advisor: string | null;
+    risk_score: number;
+    risk_level: string;
+    risk_trend: string;
+    risk_value: string;
+    attendance_rate: number;
+    engagement_score: number;
+    academic_performance_index: number;
+    last_updated: string | null;
+}
+
+export interface StudentPage {
+    items: StudentListItem[];
+    next_cursor: string | null;
+    limit: number;
+}
+
+export interface StudentPageQuery {
+    department?: string;
+    section?: string;
+    risk_level?: string;
+    advisor?: string;
+    order?: 'asc' | 'desc';
+    cursor?: string;
+    limit?: number;
+}
+
+/**
+ * Fetch one keyset-paginated page of students (highest risk first).
+ * Pass the returned next_cursor as `cursor` to get the following page.
+ */
+export async function fetchStudentsPage(query: StudentPageQuery = {}): Promise<StudentPage> {
+    const response = await apiClient.get('/students/page', { params: query });
+    return response.data;
+}
+
 /**
  * Fetch a single student by ID.
  */